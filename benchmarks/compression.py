@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark compressing the InChIs and definitions on generated data about the size of ChEBI.
+
+Run it with ``python benchmarks/compression.py``. It checks the InChIs it looks up, so it also fails when a codec
+garbles them.
+"""
+
+import gzip
+import os
+import random
+import tempfile
+import time
+
+import click
+from sqlalchemy import bindparam
+from synthetic import COMPOUNDS_HEADER
+
+from bio2bel_chebi import Manager
+from bio2bel_chebi.models import Chemical
+
+ATORVASTATIN = (
+    'InChI=1S/C33H35FN2O5/c1-21(2)31-30(33(41)35-25-11-7-4-8-12-25)29(22-9-5-3-6-10-22)32(23-13-15-24(34)'
+    '16-14-23)36(31)18-17-26(37)19-27(38)20-28(39)40/h3-16,21,26-27,37-38H,17-20H2,1-2H3,(H,35,41)(H,39,40)'
+    '/t26-,27-/m1/s1'
+)
+FLUVASTATIN = (
+    'InChI=1S/C24H26FNO4/c1-15(2)26-21-6-4-3-5-20(21)24(16-7-9-17(25)10-8-16)22(26)12-11-18(27)13-19(28)'
+    '14-23(29)30/h3-12,15,18-19,27-28H,13-14H2,1-2H3,(H,29,30)/b12-11+'
+)
+
+
+def benchmark_compression(directory: str, size: int = 150_000, sample_size: int = 5000) -> None:
+    """Benchmark the database size, populate time, and cold lookups of a database about the size of ChEBI."""
+    compounds = os.path.join(directory, 'compounds.tsv.gz')
+    inchis = os.path.join(directory, 'chebiId_inchi.tsv')
+
+    rng = random.Random(0)
+    words = 'a an the is of in acid group which compound member class hydroxy substituted that with'.split()
+    with gzip.open(compounds, 'wt') as file:
+        print(COMPOUNDS_HEADER, file=file)
+        for i in range(1, size + 1):
+            definition = ' '.join(rng.choice(words) for _ in range(rng.randint(10, 40)))
+            print(f'{i}\tC\tCHEBI:{i}\tChEBI\t\tchemical {i}\t{definition}\t2017-02-22\tCHEBI\t3', file=file)
+
+    with open(inchis, 'w') as file:
+        print('CHEBI_ID\tInChI', file=file)
+        for i in range(1, size + 1):
+            layers = (ATORVASTATIN if i % 2 else FLUVASTATIN).split('/')
+            layers[2] = '-'.join(str(rng.randint(1, 40)) for _ in range(rng.randint(10, 40)))
+            print(f'{i}\t' + '/'.join(layers), file=file)
+
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        codecs = [None, 'zlib']
+    else:
+        codecs = [None, 'zlib', 'zstd']
+
+    sample = random.Random(1).sample(range(1, size + 1), sample_size)
+    lookup_path = os.path.join(directory, 'missing')
+
+    for codec in codecs:
+        path = os.path.join(directory, f'{codec}.db')
+        manager = Manager(connection=f'sqlite:///{path}', lookup_path=lookup_path)
+
+        start = time.time()
+        manager._populate_compounds(url=compounds, compression=codec)
+        manager._load_inchis(url=inchis, compression=codec)
+        populate_seconds = time.time() - start
+
+        manager.session.execute('VACUUM')
+        database_size = os.path.getsize(path)
+
+        manager = Manager(connection=f'sqlite:///{path}', lookup_path=lookup_path)
+        query = manager.session.query(Chemical.inchi, Chemical.definition).filter(Chemical.id == bindparam('id'))
+        start = time.time()
+        for i in sample:
+            inchi, _ = query.params(id=i).one()
+            assert inchi.startswith('InChI=1S/'), f'{codec} compression garbled the InChI of {i}'
+        lookup_seconds = time.time() - start
+
+        click.echo(
+            f'{codec or "no"} compression: {database_size / 2 ** 20:.1f} MB, populated the chemicals and InChIs in '
+            f'{populate_seconds:.2f} seconds, and looked up {sample_size} chemicals in a fresh connection in '
+            f'{lookup_seconds:.2f} seconds',
+        )
+
+
+@click.command()
+def main():
+    """Run the benchmark in a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark_compression(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark enriching BEL graphs with the chemical hierarchy on generated data about the size of ChEBI.
+
+Run it with ``python benchmarks/enrich.py``. It checks that every relation is added exactly once, so it also fails
+when an optimization breaks enriching.
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import click
+from pybel import BELGraph
+from pybel.dsl import Abundance
+
+from bio2bel_chebi import Manager
+from bio2bel_chebi.models import Chemical, Relation
+
+
+def benchmark_enrich(directory: str, size: int = 50_000, sample_size: int = 500) -> None:
+    """Benchmark enriching a graph of chemicals from an ontology of the same size.
+
+    The ontology is about as deep as ChEBI's and a third of the chemicals have a second parent, so most
+    ancestries share most of their edges.
+    """
+    manager = Manager(connection='sqlite:///' + os.path.join(directory, 'chebi.db'))
+    manager.create_all()
+
+    rng = random.Random(0)
+    relations = []
+    for i in range(1, size):
+        parents = {(i - 1) // 10}
+        if rng.random() < 0.3:
+            parents.add(rng.randrange(max(0, (i - 1) // 10 - 100), (i - 1) // 10 + 1))
+        relations.extend(
+            dict(type='is_a', status='C', source_id=parent + 1, target_id=i + 1)
+            for parent in parents
+        )
+
+    manager.session.execute(Chemical.__table__.insert(), [
+        dict(id=i + 1, chebi_id=str(i + 1), name=f'chemical {i + 1}')
+        for i in range(size)
+    ])
+    manager.session.execute(Relation.__table__.insert(), relations)
+    manager.session.commit()
+
+    graph = BELGraph()
+    for i in range(size):
+        graph.add_node_from_data(Abundance(namespace='chebi', name=f'chemical {i + 1}', identifier=str(i + 1)))
+
+    start = time.time()
+    manager.enrich_chemical_hierarchy(graph)
+    seconds = time.time() - start
+    assert len(relations) == graph.number_of_edges(), 'every relation should be added exactly once'
+    click.echo(f'enriched {size} nodes with {graph.number_of_edges()} edges in {seconds:.2f} seconds')
+
+    # compare to looking up each node and walking its ancestry one by one on a sample
+    start = time.time()
+    for node in list(graph)[-sample_size:]:
+        manager.get_ancestors(manager.get_chemical_from_data(node))
+    seconds = time.time() - start
+    click.echo(f'looked up the ancestries of {sample_size} nodes one by one in {seconds:.2f} seconds')
+
+    manager.session.close()
+
+
+@click.command()
+def main():
+    """Run the benchmark in a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark_enrich(directory)
+
+
+if __name__ == '__main__':
+    main()
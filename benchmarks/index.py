@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark reading a names file about three times the size of ChEBI's with and without its block index.
+
+Run it with ``python benchmarks/index.py``. It checks the rows it reads, so it also fails when the index changes
+them.
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import click
+import pandas as pd
+from synthetic import write_names
+
+from bio2bel_chebi.parser.index import build_block_index
+from bio2bel_chebi.parser.names import get_names_df, get_names_df_by_compound_ids
+
+
+def _read_names(path: str, chunksize: int) -> int:
+    """Read the names file in chunks and count its rows."""
+    return sum(len(df.index) for df in get_names_df(url=path, chunksize=chunksize))
+
+
+def benchmark_index(directory: str, size: int = 3_000_000, chunksize: int = 100_000, sample_size: int = 100) -> None:
+    """Benchmark reading a names file about three times the size of ChEBI's with and without the index."""
+    path = os.path.join(directory, 'names.tsv.gz')
+    write_names(path, size, lambda i: i // 3 + 1)
+    sample = random.Random(0).sample(range(1, size // 3), sample_size)
+
+    start = time.time()
+    assert size == _read_names(path, chunksize)
+    plain_seconds = time.time() - start
+
+    start = time.time()
+    df = pd.concat(list(get_names_df(url=path, chunksize=chunksize)), ignore_index=True)
+    df = df[df['COMPOUND_ID'].isin(sample)]
+    plain_lookup_seconds = time.time() - start
+
+    start = time.time()
+    build_block_index(path, 'COMPOUND_ID')
+    index_seconds = time.time() - start
+
+    start = time.time()
+    assert size == _read_names(path, chunksize), 'the index should not change the rows'
+    indexed_seconds = time.time() - start
+
+    start = time.time()
+    indexed_df = get_names_df_by_compound_ids(sample, url=path)
+    indexed_lookup_seconds = time.time() - start
+    assert len(df.index) == len(indexed_df.index), 'the index should find the same names'
+
+    click.echo(
+        f'indexed {size} names in {index_seconds:.2f} seconds. Read them in chunks in {plain_seconds:.2f} seconds '
+        f'without the index and {indexed_seconds:.2f} seconds with it on {os.cpu_count()} CPUs. Got the names of '
+        f'{sample_size} compounds in {plain_lookup_seconds:.2f} seconds without the index and '
+        f'{indexed_lookup_seconds:.3f} seconds with it.',
+    )
+
+
+@click.command()
+def main():
+    """Run the benchmark in a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark_index(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark the lookups with and without the lookup store on generated data about the size of ChEBI.
+
+Run it with ``python benchmarks/lookup.py``. It checks the names it looks up, so it also fails when the lookup store
+gives wrong answers.
+"""
+
+import os
+import tempfile
+import time
+
+import click
+
+from bio2bel_chebi import Manager
+from bio2bel_chebi.models import Chemical
+
+
+def benchmark_lookup(directory: str, size: int = 200_000, sample_size: int = 20_000) -> None:
+    """Benchmark the lookups of a database about the size of ChEBI with and without the lookup store."""
+    connection = 'sqlite:///' + os.path.join(directory, 'chebi.db')
+    manager = Manager(connection=connection)
+    manager.create_all()
+    manager.session.execute(Chemical.__table__.insert(), [
+        dict(id=i, chebi_id=str(i), name=f'chemical {i}', parent_id=i - 1 if i % 10 == 0 else None)
+        for i in range(1, size + 1)
+    ])
+    manager.session.commit()
+
+    start = time.time()
+    manager.build_lookup()
+    click.echo(f'built the lookup store of {size} chemicals in {time.time() - start:.2f} seconds')
+
+    for label, lookup_path in [('with', None), ('without', os.path.join(directory, 'missing'))]:
+        manager = Manager(connection=connection, lookup_path=lookup_path)
+
+        start = time.time()
+        mapping = manager.build_chebi_id_name_mapping()
+        mapping_seconds = time.time() - start
+
+        start = time.time()
+        for i in range(1, sample_size + 1):
+            assert f'chemical {i}' == mapping[str(i)], f'wrong name for {i} {label} the lookup store'
+            manager.get_chemical_by_chebi_id(str(i))
+        seconds = time.time() - start
+
+        click.echo(
+            f'{label} the lookup store: got the name mapping in {mapping_seconds:.3f} seconds and looked up '
+            f'{sample_size} chemicals in {seconds:.2f} seconds',
+        )
+
+
+@click.command()
+def main():
+    """Run the benchmark in a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark_lookup(directory)
+
+
+if __name__ == '__main__':
+    main()
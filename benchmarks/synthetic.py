@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""Write generated ChEBI flat files for the benchmarks."""
+
+import gzip
+from typing import Callable
+
+__all__ = [
+    'COMPOUNDS_HEADER',
+    'NAMES_HEADER',
+    'write_names',
+]
+
+#: The header of the ChEBI compounds file
+COMPOUNDS_HEADER = 'ID\tSTATUS\tCHEBI_ACCESSION\tSOURCE\tPARENT_ID\tNAME\tDEFINITION\tMODIFIED_ON\tCREATED_BY\tSTAR'
+
+#: The header of the ChEBI names file
+NAMES_HEADER = 'ID\tCOMPOUND_ID\tTYPE\tSOURCE\tNAME\tADAPTED\tLANGUAGE'
+
+
+def write_names(path: str, size: int, get_compound_id: Callable[[int], int]) -> None:
+    """Write a gzipped names file with the given number of synonyms.
+
+    :param get_compound_id: Gets the compound ID of the synonym from its index
+    """
+    with gzip.open(path, 'wt') as file:
+        print(NAMES_HEADER, file=file)
+        for i in range(size):
+            print(f'{i + 1}\t{get_compound_id(i)}\tSYNONYM\tChEBI\tsynonym {i + 1}\tF\ten', file=file)
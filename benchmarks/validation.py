@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark validating compounds and names files about three times the sizes of ChEBI's.
+
+Run it with ``python benchmarks/validation.py``. It checks that the generated files are valid, so it also fails when
+the validator reports problems that aren't there.
+"""
+
+import gzip
+import os
+import tempfile
+import time
+
+import click
+from synthetic import COMPOUNDS_HEADER, write_names
+
+from bio2bel_chebi.constants import COMPOUNDS_DTYPES, NAMES_DTYPES
+from bio2bel_chebi.parser.utils import read_chebi_tsv
+from bio2bel_chebi.parser.validation import validate_release
+
+HERE = os.path.dirname(os.path.realpath(__file__))
+RESOURCES = os.path.join(HERE, os.pardir, 'tests', 'resources')
+
+
+def benchmark_validation(directory: str, compounds_size: int = 600_000, names_size: int = 3_000_000) -> None:
+    """Benchmark validating compounds and names files about three times the sizes of ChEBI's."""
+    compounds = os.path.join(directory, 'compounds.tsv.gz')
+    names = os.path.join(directory, 'names.tsv.gz')
+
+    with gzip.open(compounds, 'wt') as file:
+        print(COMPOUNDS_HEADER, file=file)
+        for i in range(1, compounds_size + 1):
+            parent = i - 1 if i % 4 == 0 else ''
+            print(f'{i}\tC\tCHEBI:{i}\tChEBI\t{parent}\tchemical {i}\t\t\t\t3', file=file)
+    write_names(names, names_size, lambda i: i // 5 + 1)
+
+    for chunksize in (None, 100_000):
+        start = time.time()
+        for path, dtype in [(compounds, COMPOUNDS_DTYPES), (names, NAMES_DTYPES)]:
+            rv = read_chebi_tsv(path, dtype, use_cache=False, chunksize=chunksize, compression='gzip',
+                                na_values=['null'])
+            for _ in ([rv] if chunksize is None else rv):
+                pass
+        read_seconds = time.time() - start
+
+        start = time.time()
+        validator = validate_release(
+            inchis_url=os.path.join(RESOURCES, 'chebiId_inchi.tsv'),
+            compounds_url=compounds,
+            relations_url=os.path.join(RESOURCES, 'relation.tsv'),
+            names_url=names,
+            accessions_url=os.path.join(RESOURCES, 'database_accession.tsv'),
+            chunksize=chunksize,
+        )
+        validate_seconds = time.time() - start
+        assert 0 == validator.report.errors, validator.report.to_dict()
+        assert names_size == validator.report.rows['names']
+
+        click.echo(
+            f'read {compounds_size} compounds and {names_size} names in {read_seconds:.2f} seconds and read and '
+            f'validated them in {validate_seconds:.2f} seconds, in chunks of {chunksize or "whole files"}',
+        )
+
+
+@click.command()
+def main():
+    """Run the benchmark in a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark_validation(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -19,7 +19,6 @@ CLASSIFIERS = [
     'Operating System :: OS Independent',
     'Programming Language :: Python',
     'Programming Language :: Python :: 3 :: Only',
-    'Programming Language :: Python :: 3.6',
     'Programming Language :: Python :: 3.7',
     'Topic :: Scientific/Engineering :: Bio-Informatics',
     'License :: OSI Approved :: MIT License',
@@ -33,9 +32,21 @@ INSTALL_REQUIRES = [
     'pybel>=0.13.1,<0.14.0',
 ]
 EXTRAS_REQUIRE = {
+    'arrow': [
+        'pyarrow',
+    ],
+    'graph': [
+        'scipy',
+    ],
+    'json': [
+        'orjson',
+    ],
+    'zstd': [
+        'zstandard',
+    ],
     'web': [
         'flask',
-        'flask-admin',
+        'flask-admin>=1.5,<2',
     ],
     'docs': [
         'sphinx',
@@ -99,6 +110,8 @@ if __name__ == '__main__':
         keywords=KEYWORDS,
         packages=PACKAGES,
         package_dir={'': 'src'},
+        include_package_data=True,
+        python_requires='>=3.7',
         install_requires=INSTALL_REQUIRES,
         extras_require=EXTRAS_REQUIRE,
         entry_points=ENTRY_POINTS,
@@ -38,9 +38,51 @@ Command Line Utility
 
 """
 
-from .manager import *
-from .models import *
-from .utils import get_version
+from importlib import import_module
+
+__all__ = [
+    'Manager',
+    'Base',
+    'Chemical',
+    'Synonym',
+    'Accession',
+    'Relation',
+    'Release',
+    'Statistic',
+    'Compression',
+    'get_version',
+]
+
+#: The submodule each public name is loaded from on first access, so importing the package doesn't
+#: import SQLAlchemy, PyBEL, pandas, or Bio2BEL until they're needed
+_LAZY_IMPORTS = {
+    'Manager': 'manager',
+    'Base': 'models',
+    'Chemical': 'models',
+    'Synonym': 'models',
+    'Accession': 'models',
+    'Relation': 'models',
+    'Release': 'models',
+    'Statistic': 'models',
+    'Compression': 'models',
+    'get_version': 'utils',
+}
+
+
+def __getattr__(name):
+    """Import the public classes and functions from their modules the first time they're used."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(import_module(f'.{_LAZY_IMPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the public names, including the ones that haven't been imported yet."""
+    return sorted(set(globals()) | set(__all__))
+
 
 __version__ = '0.2.2-dev'
 
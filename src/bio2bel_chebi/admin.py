@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""Flask-Admin views of the large ChEBI tables that render in constant time, no matter how big the tables are.
+
+The default Flask-Admin views page with ``OFFSET`` and run ``COUNT(*)`` on every page load, which on the synonym
+and relation tables takes seconds and gets slower the deeper you page. These views instead:
+
+1. page on the primary key (keyset pagination), so every page is a range scan of the primary key index,
+2. show the count from the statistics table (see :meth:`bio2bel_chebi.Manager.update_statistics`) instead of
+   counting, and don't count at all when filtering,
+3. only filter on indexed columns and can't be sorted or searched, since those would scan the whole table, and
+4. load the related chemicals in the same query as the page.
+
+Pages are linked with ``after`` and ``before`` query arguments holding the last or first primary key of the
+neighbouring page.
+
+.. warning:: Requires ``flask-admin``. Install with ``pip install bio2bel_chebi[web]``.
+"""
+
+import logging
+from typing import Mapping, Optional
+
+from flask import request
+from flask_admin.contrib.sqla import ModelView
+from flask_admin.contrib.sqla.filters import FilterEqual, FilterInList, FilterNotInList
+
+from .models import Statistic
+from .statistics import TOTAL
+from .utils import get_keyset_neighbors, sort_keyset_page
+
+__all__ = [
+    'KeysetModelView',
+    'ChemicalView',
+    'RelationView',
+    'SynonymView',
+    'AccessionView',
+]
+
+log = logging.getLogger(__name__)
+
+
+class KeysetModelView(ModelView):
+    """A read-only model view that pages on the primary key and never counts its table."""
+
+    can_create = False
+    can_edit = False
+    can_delete = False
+
+    can_set_page_size = False
+    simple_list_pager = True
+    column_sortable_list = ()
+    column_default_sort = None
+    column_display_pk = True
+
+    list_template = 'bio2bel_chebi/keyset_list.html'
+
+    #: The key of the total of this table in the statistics table
+    estimated_count_key: Optional[str] = None
+
+    def scaffold_filters(self, name):
+        """Only filter on equality, which can use an index, and not with ``LIKE`` or negations."""
+        return [
+            flt
+            for flt in super().scaffold_filters(name)
+            if isinstance(flt, (FilterEqual, FilterInList)) and not isinstance(flt, FilterNotInList)
+        ]
+
+    def _get_keyset_args(self):
+        """Get the ``after`` and ``before`` arguments of the request."""
+        return request.args.get('after', type=int), request.args.get('before', type=int)
+
+    def _apply_pagination(self, query, page, page_size):
+        """Get the page after or before the given primary key instead of skipping to it with ``OFFSET``."""
+        if page_size is None:
+            page_size = self.page_size
+
+        primary_key = getattr(self.model, self._primary_key)
+        after, before = self._get_keyset_args()
+
+        if before is not None:
+            query = query.filter(primary_key < before).order_by(primary_key.desc())
+        else:
+            if after is not None:
+                query = query.filter(primary_key > after)
+            query = query.order_by(primary_key)
+
+        if page_size:
+            query = query.limit(page_size)
+
+        return query
+
+    def get_list(self, page, sort_column, sort_desc, search, filters, execute=True, page_size=None):
+        """Get a page of the list view and the estimated size of the table."""
+        _, query = super().get_list(
+            page, None, False, search, filters,
+            execute=execute, page_size=page_size,
+        )
+
+        count = None if search or filters else self.get_estimated_count()
+
+        if not execute:
+            return count, query
+
+        _, before = self._get_keyset_args()
+        return count, sort_keyset_page(query, before=before)
+
+    def get_estimated_count(self) -> Optional[int]:
+        """Get the size of the table from the statistics table, or None if it wasn't filled."""
+        if self.estimated_count_key is None:
+            return None
+        return self.session.query(Statistic.count).filter(
+            Statistic.category == TOTAL,
+            Statistic.key == self.estimated_count_key,
+        ).scalar()
+
+    def get_keyset_urls(self, data) -> Mapping[str, Optional[str]]:
+        """Get the URLs of the first, previous, and next pages, or None for pages that don't exist."""
+        view_args = self._get_list_extra_args()
+        extra_args = {
+            key: value
+            for key, value in view_args.extra_args.items()
+            if key not in ('after', 'before')
+        }
+        after, before = self._get_keyset_args()
+        previous_before, next_after = get_keyset_neighbors(
+            [self.get_pk_value(model) for model in data],
+            page_size=view_args.page_size or self.page_size,
+            after=after,
+            before=before,
+        )
+
+        def _get_url(**kwargs) -> str:
+            return self._get_list_url(view_args.clone(page=None, extra_args=dict(extra_args, **kwargs)))
+
+        return {
+            'first': _get_url(),
+            'previous': None if previous_before is None else _get_url(before=previous_before),
+            'next': None if next_after is None else _get_url(after=next_after),
+        }
+
+
+class ChemicalView(KeysetModelView):
+    """A view of the chemicals."""
+
+    estimated_count_key = 'chemicals'
+    column_exclude_list = ['definition', 'inchi']
+    column_filters = ['chebi_id']
+    column_select_related_list = ['parent']
+
+
+class RelationView(KeysetModelView):
+    """A view of the relations between chemicals."""
+
+    estimated_count_key = 'relations'
+    column_filters = ['type', 'status', 'source.chebi_id', 'target.chebi_id']
+    column_select_related_list = ['source', 'target']
+
+
+class SynonymView(KeysetModelView):
+    """A view of the synonyms of the chemicals."""
+
+    estimated_count_key = 'synonyms'
+    column_filters = ['chemical.chebi_id']
+    column_select_related_list = ['chemical']
+
+
+class AccessionView(KeysetModelView):
+    """A view of the cross-references of the chemicals."""
+
+    estimated_count_key = 'xrefs'
+    column_filters = ['chemical.chebi_id']
+    column_select_related_list = ['chemical']
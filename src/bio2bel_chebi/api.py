@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+"""A read-only JSON API for resolving ChEBI identifiers, names, and cross-references.
+
+The API is a :class:`flask.Blueprint` that can be registered on any :class:`flask.Flask` application with
+:func:`register_api`. It never writes to the database, so several worker processes can serve the same
+SQLite file.
+
+Batch endpoints take a JSON list in the body of a ``POST`` request. If the request accepts
+``application/x-ndjson`` (or has ``?format=ndjson``), the results are streamed back one JSON object per line
+and looked up chunk by chunk, so large batches never need to be held in memory. Responses are gzipped when
+the client accepts it.
+"""
+
+import json
+import zlib
+from typing import Any, Iterable, List, Mapping, Optional
+
+from flask import Blueprint, Flask, Response, abort, current_app, jsonify, request, stream_with_context
+
+from .manager import Manager
+from .utils import iter_chunks
+
+__all__ = [
+    'api',
+    'register_api',
+]
+
+EXTENSION_KEY = 'bio2bel_chebi'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+#: Responses smaller than this many bytes aren't worth compressing
+GZIP_MINIMUM_SIZE = 512
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+
+def register_api(app: Flask, manager: Manager) -> None:
+    """Register the API on the application, serving from the given manager."""
+    app.extensions[EXTENSION_KEY] = manager
+    app.register_blueprint(api)
+
+
+def _get_manager() -> Manager:
+    return current_app.extensions[EXTENSION_KEY]
+
+
+def _get_chemical_json_by_chebi_id(manager: Manager, chebi_id: str) -> Optional[Mapping[str, Any]]:
+    return manager.json_cache.get(('id', chebi_id), lambda: _to_json(manager.get_chemical_by_chebi_id(chebi_id)))
+
+
+def _get_chemical_json_by_chebi_name(manager: Manager, name: str) -> Optional[Mapping[str, Any]]:
+    return manager.json_cache.get(('name', name), lambda: _to_json(manager.get_chemical_by_chebi_name(name)))
+
+
+def _to_json(chemical) -> Optional[Mapping[str, Any]]:
+    if chemical is not None:
+        return chemical.to_json()
+
+
+def _get_chemical_or_404(chebi_id: str):
+    chemical = _get_manager().get_chemical_by_chebi_id(chebi_id)
+    if chemical is None:
+        abort(404, f'chemical not found: {chebi_id}')
+    return chemical
+
+
+def _get_batch_keys() -> List[str]:
+    keys = request.get_json(force=True, silent=True)
+    if not isinstance(keys, list) or not all(isinstance(key, str) for key in keys):
+        abort(400, 'body should be a JSON list of strings')
+    return keys
+
+
+def _wants_ndjson() -> bool:
+    if request.args.get('format') == 'ndjson':
+        return True
+    best = request.accept_mimetypes.best_match([NDJSON_MIMETYPE, 'application/json'])
+    return best == NDJSON_MIMETYPE
+
+
+def _iter_gzip(chunks: Iterable[str]) -> Iterable[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _stream_ndjson(lines: Iterable[str]) -> Response:
+    """Stream the lines, gzipped if the client accepts it."""
+    lines = stream_with_context(lines)
+
+    if 'gzip' not in request.accept_encodings:
+        return Response(lines, mimetype=NDJSON_MIMETYPE)
+
+    response = Response(_iter_gzip(lines), mimetype=NDJSON_MIMETYPE)
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _batch_response(keys: List[str], lookup) -> Response:
+    """Respond with the results of running the lookup over the keys, chunk by chunk.
+
+    :param keys: The keys to look up
+    :param lookup: A function from a list of keys to a dictionary of keys to JSON-serializable results
+    """
+    if not _wants_ndjson():
+        rv = {}
+        for chunk in iter_chunks(keys):
+            rv.update(lookup(chunk))
+        return jsonify(rv)
+
+    def _iter_lines():
+        for chunk in iter_chunks(keys):
+            results = lookup(chunk)
+            for key in chunk:
+                yield json.dumps({'query': key, 'result': results.get(key)}) + '\n'
+
+    return _stream_ndjson(_iter_lines())
+
+
+@api.after_request
+def gzip_response(response: Response) -> Response:
+    """Compress large responses if the client accepts gzip."""
+    if any((
+        response.direct_passthrough,
+        response.is_streamed,
+        'Content-Encoding' in response.headers,
+        response.status_code != 200,
+        'gzip' not in request.accept_encodings,
+    )):
+        return response
+
+    data = response.get_data()
+    if len(data) < GZIP_MINIMUM_SIZE:
+        return response
+
+    response.set_data(zlib.compress(data, wbits=16 + zlib.MAX_WBITS))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@api.route('/chemical/<chebi_id>')
+def get_chemical_by_chebi_id(chebi_id: str):
+    """Get a chemical by its ChEBI identifier."""
+    rv = _get_chemical_json_by_chebi_id(_get_manager(), chebi_id)
+    if rv is None:
+        abort(404, f'chemical not found: {chebi_id}')
+    return jsonify(rv)
+
+
+@api.route('/chemical/name/<path:name>')
+def get_chemical_by_chebi_name(name: str):
+    """Get a chemical by its ChEBI name."""
+    rv = _get_chemical_json_by_chebi_name(_get_manager(), name)
+    if rv is None:
+        abort(404, f'chemical not found: {name}')
+    return jsonify(rv)
+
+
+@api.route('/xref/<path:accession>')
+def get_chemicals_by_xref(accession: str):
+    """Get the chemicals cross-referencing the accession number, optionally only from the given ``?source=``."""
+    chemicals = _get_manager().get_chemicals_by_xref(accession, source=request.args.get('source'))
+    return jsonify([chemical.to_json() for chemical in chemicals])
+
+
+@api.route('/chemical/<chebi_id>/ancestors')
+def get_ancestors(chebi_id: str):
+    """Get the ancestors of a chemical following the relations of the given ``?type=`` (``is_a`` by default)."""
+    chemical = _get_chemical_or_404(chebi_id)
+    ancestors = _get_manager().get_ancestors(chemical, relation_type=request.args.get('type', 'is_a'))
+    return jsonify([ancestor.to_json() for ancestor in ancestors])
+
+
+@api.route('/chemical/<chebi_id>/descendants')
+def get_descendants(chebi_id: str):
+    """Get the descendants of a chemical following the relations of the given ``?type=`` (``is_a`` by default)."""
+    chemical = _get_chemical_or_404(chebi_id)
+    descendants = _get_manager().get_descendants(chemical, relation_type=request.args.get('type', 'is_a'))
+    return jsonify([descendant.to_json() for descendant in descendants])
+
+
+@api.route('/batch/chemical', methods=['POST'])
+def get_chemicals_by_chebi_ids():
+    """Get chemicals for a JSON list of ChEBI identifiers."""
+    manager = _get_manager()
+
+    def _lookup(chebi_ids):
+        return {
+            chebi_id: chemical.to_json()
+            for chebi_id, chemical in manager.get_chemicals_by_chebi_ids(chebi_ids).items()
+        }
+
+    return _batch_response(_get_batch_keys(), _lookup)
+
+
+@api.route('/batch/name', methods=['POST'])
+def get_chemicals_by_chebi_names():
+    """Get chemicals for a JSON list of ChEBI names."""
+    manager = _get_manager()
+
+    def _lookup(names):
+        return {
+            name: chemical.to_json()
+            for name, chemical in manager.get_chemicals_by_chebi_names(names).items()
+        }
+
+    return _batch_response(_get_batch_keys(), _lookup)
+
+
+@api.route('/batch/xref', methods=['POST'])
+def get_chemicals_by_xrefs():
+    """Get chemicals for a JSON list of accession numbers, optionally only from the given ``?source=``."""
+    manager = _get_manager()
+    source = request.args.get('source')
+
+    def _lookup(accessions):
+        return {
+            accession: [chemical.to_json() for chemical in chemicals]
+            for accession, chemicals in manager.get_chemicals_by_accessions(accessions, source=source).items()
+        }
+
+    return _batch_response(_get_batch_keys(), _lookup)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""An :mod:`asyncio` façade over the read paths of the Bio2BEL ChEBI manager.
+
+The queries are run by a bounded pool of worker threads, each with its own session from the manager's
+:func:`sqlalchemy.orm.scoped_session`, so the number of simultaneously open connections never exceeds the
+number of workers. Concurrent identical lookups are coalesced into a single query.
+
+.. code-block:: python
+
+    >>> import asyncio
+    >>> from bio2bel_chebi.async_manager import AsyncManager
+    >>> async def main():
+    ...     async with AsyncManager() as async_manager:
+    ...         return await async_manager.get_chemicals_by_chebi_ids(['38545', '32020'])
+    >>> asyncio.run(main())
+
+Since the ORM models are bound to the session of the worker thread that loaded them, results are returned as
+dictionaries from :meth:`bio2bel_chebi.models.Chemical.to_json`.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional
+
+from .manager import Manager
+from .models import Chemical
+
+__all__ = [
+    'AsyncManager',
+]
+
+log = logging.getLogger(__name__)
+
+JSON = Mapping[str, Any]
+
+
+def _to_json(chemical: Optional[Chemical]) -> Optional[JSON]:
+    return chemical.to_json() if chemical is not None else None
+
+
+class AsyncManager:
+    """Answers lookups against a :class:`bio2bel_chebi.Manager` from coroutines."""
+
+    def __init__(self, manager: Optional[Manager] = None, max_workers: int = 4, **kwargs):
+        """Build an asynchronous manager.
+
+        :param manager: A manager. If none given, one is built with the remaining keyword arguments.
+        :param max_workers: The number of worker threads, which bounds the number of open connections.
+         Should not be larger than the size of the engine's connection pool.
+        """
+        self.manager = manager if manager is not None else Manager(**kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bio2bel_chebi')
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def __aenter__(self) -> 'AsyncManager':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Wait for the running queries to finish and stop the worker threads."""
+        self._executor.shutdown(wait=True)
+
+    def _call(self, func: Callable, *args):
+        """Run the function in a worker thread, then release that thread's session."""
+        try:
+            return func(*args)
+        finally:
+            self.manager.session.remove()
+
+    async def _run(self, key: Hashable, func: Callable, *args):
+        """Run the function in the thread pool, sharing the result with concurrent calls with the same key."""
+        future = self._in_flight.get(key)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._in_flight[key] = loop.run_in_executor(self._executor, self._call, func, *args)
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            log.debug('coalescing %s', key)
+
+        # one waiter being cancelled shouldn't cancel the query for the others
+        return await asyncio.shield(future)
+
+    async def get_chemical_by_chebi_id(self, chebi_id: str) -> Optional[JSON]:
+        """Get a chemical by its ChEBI identifier."""
+        return await self._run(('id', chebi_id), self._get_chemical_by_chebi_id, chebi_id)
+
+    def _get_chemical_by_chebi_id(self, chebi_id: str) -> Optional[JSON]:
+        return _to_json(self.manager.get_chemical_by_chebi_id(chebi_id))
+
+    async def get_chemical_by_chebi_name(self, name: str) -> Optional[JSON]:
+        """Get a chemical by its ChEBI name."""
+        return await self._run(('name', name), self._get_chemical_by_chebi_name, name)
+
+    def _get_chemical_by_chebi_name(self, name: str) -> Optional[JSON]:
+        return _to_json(self.manager.get_chemical_by_chebi_name(name))
+
+    async def get_chemical_by_inchi(self, inchi: str) -> Optional[JSON]:
+        """Get a chemical by its InChI string."""
+        return await self._run(('inchi', inchi), self._get_chemical_by_inchi, inchi)
+
+    def _get_chemical_by_inchi(self, inchi: str) -> Optional[JSON]:
+        return _to_json(self.manager.get_chemical_by_inchi(inchi))
+
+    async def get_chemicals_by_xref(self, accession: str, source: Optional[str] = None) -> List[JSON]:
+        """Get the chemicals with the given database cross-reference."""
+        return await self._run(('xref', accession, source), self._get_chemicals_by_xref, accession, source)
+
+    def _get_chemicals_by_xref(self, accession: str, source: Optional[str]) -> List[JSON]:
+        return [
+            chemical.to_json()
+            for chemical in self.manager.get_chemicals_by_xref(accession, source=source)
+        ]
+
+    async def get_chemicals_by_chebi_ids(self, chebi_ids: Iterable[str]) -> Mapping[str, JSON]:
+        """Get a dictionary from ChEBI identifiers to chemicals, omitting the ones that aren't found."""
+        chebi_ids = frozenset(chebi_ids)
+        return await self._run(('ids', chebi_ids), self._get_chemicals_by_chebi_ids, chebi_ids)
+
+    def _get_chemicals_by_chebi_ids(self, chebi_ids: Iterable[str]) -> Mapping[str, JSON]:
+        return {
+            chebi_id: chemical.to_json()
+            for chebi_id, chemical in self.manager.get_chemicals_by_chebi_ids(chebi_ids).items()
+        }
+
+    async def get_chemicals_by_chebi_names(self, names: Iterable[str]) -> Mapping[str, JSON]:
+        """Get a dictionary from ChEBI names to chemicals, omitting the ones that aren't found."""
+        names = frozenset(names)
+        return await self._run(('names', names), self._get_chemicals_by_chebi_names, names)
+
+    def _get_chemicals_by_chebi_names(self, names: Iterable[str]) -> Mapping[str, JSON]:
+        return {
+            name: chemical.to_json()
+            for name, chemical in self.manager.get_chemicals_by_chebi_names(names).items()
+        }
+
+    async def get_ancestors(self, chebi_id: str, relation_type: str = 'is_a') -> Optional[List[JSON]]:
+        """Get the ancestors of the chemical with the given ChEBI identifier, or None if it doesn't exist."""
+        key = ('ancestors', chebi_id, relation_type)
+        return await self._run(key, self._get_relatives, self.manager.get_ancestors, chebi_id, relation_type)
+
+    async def get_descendants(self, chebi_id: str, relation_type: str = 'is_a') -> Optional[List[JSON]]:
+        """Get the descendants of the chemical with the given ChEBI identifier, or None if it doesn't exist."""
+        key = ('descendants', chebi_id, relation_type)
+        return await self._run(key, self._get_relatives, self.manager.get_descendants, chebi_id, relation_type)
+
+    def _get_relatives(self, func: Callable, chebi_id: str, relation_type: str) -> Optional[List[JSON]]:
+        chemical = self.manager.get_chemical_by_chebi_id(chebi_id)
+
+        if chemical is None:
+            return
+
+        return [
+            relative.to_json()
+            for relative in func(chemical, relation_type=relation_type)
+        ]
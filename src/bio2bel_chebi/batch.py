@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+"""Normalize and enrich the ChEBI chemicals in many BEL graphs in parallel.
+
+Unlike calling :meth:`bio2bel_chebi.Manager.normalize_chemicals` and
+:meth:`bio2bel_chebi.Manager.enrich_chemical_hierarchy` on each graph, :func:`annotate_graphs` looks up the union
+of the ChEBI nodes of all graphs in the database once and builds a :class:`ChemicalSnapshot` from them. The snapshot
+only holds BEL nodes, so it is handed to each worker process once and the workers never touch the database.
+
+Graphs can be given as :class:`pybel.BELGraph` objects or as paths to BEL scripts (``.bel``), Node-Link JSON
+(``.json``), or pickles. Graphs given by path are read in the worker processes, once to find their ChEBI nodes and
+once to annotate them, so they are never all held in memory by the main process.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
+
+import click
+import pybel
+from pybel import BELGraph
+from pybel.dsl import BaseEntity
+from tqdm import tqdm
+
+from .utils import get_chebi_reference
+
+__all__ = [
+    'ChemicalSnapshot',
+    'AnnotatedGraph',
+    'get_chebi_nodes',
+    'build_snapshot',
+    'read_graph',
+    'annotate_graphs',
+]
+
+log = logging.getLogger(__name__)
+
+GraphOrPath = Union[BELGraph, str]
+
+#: The snapshot used by :func:`_annotate` in each worker process, set by :func:`_initialize_worker`
+_worker_snapshot: Optional['ChemicalSnapshot'] = None
+
+
+class ChemicalSnapshot:
+    """A read-only lookup from the ChEBI nodes of a set of graphs to their normalized nodes and hierarchies."""
+
+    def __init__(
+            self,
+            nodes: Mapping[BaseEntity, BaseEntity],
+            edges: Mapping[BaseEntity, List[Tuple[BaseEntity, BaseEntity]]],
+    ) -> None:
+        """Initialize the snapshot.
+
+        :param nodes: A dictionary from ChEBI nodes to their normalized nodes
+        :param edges: A dictionary from ChEBI nodes to the ``is_a`` edges to add for them
+        """
+        self.nodes = nodes
+        self.edges = edges
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.nodes)
+
+    def annotate(self, graph: BELGraph, normalize: bool = True, enrich: bool = True) -> None:
+        """Enrich then normalize the ChEBI nodes in the graph in place."""
+        nodes = [node for node in graph if node in self.nodes]
+
+        if enrich:
+            for node in nodes:
+                for child, parent in self.edges.get(node, []):
+                    # a secondary chemical's edge to its parent would become a self-loop after normalization
+                    if normalize and self.nodes.get(child) == parent:
+                        continue
+                    graph.add_is_a(child, parent)
+
+        if normalize:
+            from networkx import relabel_nodes
+
+            mapping = {node: self.nodes[node] for node in nodes if self.nodes[node] != node}
+            relabel_nodes(graph, mapping, copy=False)
+
+
+class AnnotatedGraph(NamedTuple):
+    """A graph from :func:`annotate_graphs` and the number of seconds it took to read and annotate."""
+
+    graph: BELGraph
+    seconds: float
+
+
+def get_chebi_nodes(graph: BELGraph) -> Set[BaseEntity]:
+    """Get the nodes in the graph that reference ChEBI."""
+    return {
+        node
+        for node in graph
+        if get_chebi_reference(node) is not None
+    }
+
+
+def build_snapshot(manager, nodes: Iterable[BaseEntity]) -> ChemicalSnapshot:
+    """Look up ChEBI nodes and their hierarchies with one query per chunk of identifiers and names.
+
+    :param bio2bel_chebi.Manager manager: A manager
+    :param nodes: ChEBI nodes, like from :func:`get_chebi_nodes`
+    """
+    node_to_chemical = manager.get_chemicals_from_nodes(nodes, collapse_parents=False)
+    edges = manager.get_node_hierarchy_edges(node_to_chemical)
+
+    return ChemicalSnapshot(
+        nodes={node: chemical.to_bel() for node, chemical in node_to_chemical.items()},
+        edges={node: node_edges for node, node_edges in edges.items() if node_edges},
+    )
+
+
+def read_graph(path: str) -> BELGraph:
+    """Read a graph from a BEL script, a Node-Link JSON file, or a pickle, based on the path's extension."""
+    if path.endswith('.bel'):
+        return pybel.from_path(path)
+    if path.endswith('.json'):
+        return pybel.from_json_path(path)
+    return pybel.from_pickle(path)
+
+
+def _get_graph(graph: GraphOrPath) -> BELGraph:
+    return read_graph(graph) if isinstance(graph, str) else graph
+
+
+def _get_graph_label(graph: GraphOrPath) -> str:
+    return graph if isinstance(graph, str) else (graph.name or repr(graph))
+
+
+def _get_chebi_nodes_from_path(path: str) -> Set[BaseEntity]:
+    return get_chebi_nodes(read_graph(path))
+
+
+def _initialize_worker(snapshot: ChemicalSnapshot) -> None:
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+
+
+def _annotate(snapshot: ChemicalSnapshot, graph: GraphOrPath, normalize: bool, enrich: bool) -> AnnotatedGraph:
+    start = time.time()
+    graph = _get_graph(graph)
+    snapshot.annotate(graph, normalize=normalize, enrich=enrich)
+    return AnnotatedGraph(graph, time.time() - start)
+
+
+def _annotate_in_worker(args) -> AnnotatedGraph:
+    return _annotate(_worker_snapshot, *args)
+
+
+def annotate_graphs(
+        manager,
+        graphs: Iterable[GraphOrPath],
+        normalize: bool = True,
+        enrich: bool = True,
+        processes: Optional[int] = None,
+        use_tqdm: bool = False,
+) -> Iterable[AnnotatedGraph]:
+    """Normalize and enrich the ChEBI chemicals in many graphs, using a pool of processes.
+
+    The annotated graphs are yielded in the same order as they are given. Graphs annotated by worker processes are
+    copies, so the given graphs are only modified in place if ``processes`` is 1.
+
+    :param bio2bel_chebi.Manager manager: A manager
+    :param graphs: BEL graphs or paths to them. See :func:`read_graph` for the supported formats.
+    :param normalize: Replace the ChEBI nodes with their normalized nodes, like
+     :meth:`bio2bel_chebi.Manager.normalize_chemicals`
+    :param enrich: Add the hierarchies of the ChEBI nodes, like :meth:`bio2bel_chebi.Manager.enrich_chemical_hierarchy`
+    :param processes: The number of worker processes. Defaults to the number of CPUs. If 1, the graphs are annotated
+     in this process.
+    :param use_tqdm: Show a progress bar
+    """
+    graphs = list(graphs)
+    processes = processes or os.cpu_count() or 1
+    paths = [graph for graph in graphs if isinstance(graph, str)]
+
+    nodes = set()
+    for graph in graphs:
+        if not isinstance(graph, str):
+            nodes.update(get_chebi_nodes(graph))
+
+    if paths and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for path_nodes in executor.map(_get_chebi_nodes_from_path, paths):
+                nodes.update(path_nodes)
+    else:
+        for path in paths:
+            nodes.update(_get_chebi_nodes_from_path(path))
+
+    start = time.time()
+    snapshot = build_snapshot(manager, nodes)
+    log.info('looked up %d of %d ChEBI nodes in %.2f seconds', len(snapshot), len(nodes), time.time() - start)
+
+    if processes == 1:
+        results = (_annotate(snapshot, graph, normalize, enrich) for graph in graphs)
+        yield from _log_results(graphs, results, use_tqdm=use_tqdm)
+        return
+
+    # the snapshot is sent to each worker once instead of with every graph
+    with ProcessPoolExecutor(max_workers=processes, initializer=_initialize_worker, initargs=(snapshot,)) as executor:
+        results = executor.map(_annotate_in_worker, ((graph, normalize, enrich) for graph in graphs))
+        yield from _log_results(graphs, results, use_tqdm=use_tqdm)
+
+
+def _log_results(
+        graphs: List[GraphOrPath],
+        results: Iterable[AnnotatedGraph],
+        use_tqdm: bool = False,
+) -> Iterable[AnnotatedGraph]:
+    if use_tqdm:
+        results = tqdm(results, total=len(graphs), desc='Annotating graphs')
+
+    for graph, result in zip(graphs, results):
+        log.info('annotated %s in %.2f seconds', _get_graph_label(graph), result.seconds)
+        yield result
+
+
+def add_cli_annotate(main: click.Group) -> click.Group:  # noqa: D202
+    """Add an ``annotate`` command to main :mod:`click` function."""
+
+    @main.command()
+    @click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+    @click.option('-o', '--directory', required=True, type=click.Path(file_okay=False),
+                  help='The directory in which the annotated graphs are written as pickles')
+    @click.option('-p', '--processes', type=int, help='The number of worker processes. Defaults to the number of CPUs.')
+    @click.option('--no-normalize', is_flag=True, help="Don't normalize the ChEBI nodes")
+    @click.option('--no-enrich', is_flag=True, help="Don't enrich the hierarchies of the ChEBI nodes")
+    @click.pass_obj
+    def annotate(manager, paths, directory, processes, no_normalize, no_enrich):
+        """Normalize and enrich the ChEBI chemicals in BEL graphs."""
+        os.makedirs(directory, exist_ok=True)
+
+        results = annotate_graphs(
+            manager,
+            paths,
+            normalize=not no_normalize,
+            enrich=not no_enrich,
+            processes=processes,
+            use_tqdm=True,
+        )
+
+        for path, result in zip(paths, results):
+            name = os.path.splitext(os.path.basename(path))[0]
+            pybel.to_pickle(result.graph, os.path.join(directory, f'{name}.gpickle'))
+            click.echo(f'{path}\t{result.seconds:.2f}')
+
+    return main
@@ -1,10 +1,118 @@
 # -*- coding: utf-8 -*-
 
-"""The CLI for Bio2BEL ChEBI."""
+"""The CLI for Bio2BEL ChEBI.
 
-from .manager import Manager
+Importing the manager imports Bio2BEL, PyBEL, and pandas, which takes seconds, so the main group lists the
+commands of :meth:`bio2bel_chebi.Manager.get_cli` without it and only imports it to run one of them. The
+``summarize`` command reads the statistics table with :mod:`bio2bel_chebi.statistics` and only falls back to the
+manager if the table wasn't filled.
+"""
+
+import logging
+import os
+
+import click
+
+__all__ = [
+    'main',
+]
+
+#: The environment variable Bio2BEL checks for the connection before its configuration files
+CONNECTION_ENVIRONMENT_VARIABLE = 'BIO2BEL_CHEBI_CONNECTION'
+
+#: The commands of the manager's CLI with their short help, so they're listed without importing it
+COMMANDS = {
+    'annotate': 'Normalize and enrich the ChEBI chemicals in BEL graphs.',
+    'belns': 'Manage BEL namespace.',
+    'build-lookup': 'Rebuild the lookup store from the database.',
+    'cache': 'Manage cached data.',
+    'drop': 'Drop the database.',
+    'dump': 'Dump the chemicals as (gzipped) newline-delimited JSON or JSON-LD.',
+    'export': 'Export the relation graph.',
+    'populate': 'Populate the database.',
+    'releases': 'Manage side-by-side ChEBI releases.',
+    'summarize': 'Summarize the contents of the database.',
+    'validate': 'Validate the ChEBI flat files and report their problems.',
+    'web': 'Run the web app.',
+}
+
+
+class LazyGroup(click.Group):
+    """A group that gets the commands from the manager's CLI only when they're run."""
+
+    def list_commands(self, ctx):
+        """List the names of the commands without importing the manager."""
+        return sorted(set(COMMANDS) | set(self.commands))
+
+    def get_command(self, ctx, name):
+        """Get the command defined here, or else import the manager's CLI and get it from there."""
+        command = self.commands.get(name)
+        if command is None and name in COMMANDS:
+            from .manager import Manager
+
+            command = Manager.get_cli().get_command(ctx, name)
+        return command
+
+    def format_commands(self, ctx, formatter):
+        """List the commands with their short help from :data:`COMMANDS`, without importing the manager."""
+        limit = formatter.width - 6 - max(len(name) for name in COMMANDS)
+        rows = [
+            (name, click.utils.make_default_short_help(COMMANDS[name], limit))
+            for name in self.list_commands(ctx)
+        ]
+        with formatter.section('Commands'):
+            formatter.write_dl(rows)
+
+
+def _get_connection(connection=None) -> str:
+    """Get the connection like Bio2BEL, only importing it if it's not given or in the environment."""
+    if connection is not None:
+        return connection
+
+    if os.environ.get(CONNECTION_ENVIRONMENT_VARIABLE):
+        return os.environ[CONNECTION_ENVIRONMENT_VARIABLE]
+
+    from bio2bel.utils import get_connection
+    from .constants import MODULE_NAME
+
+    return get_connection(MODULE_NAME)
+
+
+@click.group(cls=LazyGroup, help='The connection defaults to the Bio2BEL configuration.')
+@click.option('-c', '--connection', help='Defaults to the Bio2BEL configuration')
+@click.pass_context
+def main(ctx, connection):
+    """Bio2BEL ChEBI."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logging.getLogger('bio2bel.utils').setLevel(logging.WARNING)
+
+    if ctx.invoked_subcommand not in main.commands:
+        from .manager import Manager
+
+        ctx.obj = Manager(connection=connection)
+
+
+@main.command()
+@click.option('-d', '--detailed', is_flag=True, help='Include the breakdowns by type, source, status, etc.')
+@click.option('--update', is_flag=True, help='Recount the contents of the database first')
+@click.pass_context
+def summarize(ctx, detailed, update):
+    """Summarize the contents of the database."""
+    from .statistics import echo_summary, summarize_database
+
+    connection = _get_connection(ctx.parent.params['connection'])
+    summary = None if update else summarize_database(connection, detailed=detailed)
+
+    if summary is None:
+        from .manager import Manager
+
+        manager = Manager(connection=connection)
+        if update:
+            manager.update_statistics()
+        summary = manager.summarize(detailed=detailed)
+
+    echo_summary(summary)
 
-main = Manager.get_cli()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+"""Optional compression of the large text columns of the chemicals: their InChIs and definitions.
+
+InChIs and definitions make up most of a ChEBI database. When populating with a codec, e.g.,
+``bio2bel_chebi populate --compression zstd``, each value is compressed on its own against a dictionary
+trained on the first values of its column, so short values compress well too. The dictionaries are stored in
+the database. Compressed values are stored as blobs, which SQLite keeps in any column, and are decoded
+transparently when read, so a database can mix compressed and plain values. Values that don't get smaller
+are stored plain.
+
+Two codecs are available:
+
+1. ``zlib`` from the standard library, with a preset dictionary of the most common substrings
+2. ``zstd`` from :mod:`zstandard`, with a dictionary trained by :func:`zstandard.train_dictionary`
+
+Compression is only available for SQLite.
+
+.. warning:: ``zstd`` requires :mod:`zstandard`. Install with ``pip install bio2bel_chebi[zstd]``.
+"""
+
+import logging
+import struct
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+__all__ = [
+    'CompressedText',
+    'TextCodec',
+    'decompress',
+    'register_dictionary',
+    'train_dictionary',
+    'CODECS',
+    'COMPRESSED_COLUMNS',
+]
+
+log = logging.getLogger(__name__)
+
+ZLIB = 'zlib'
+ZSTD = 'zstd'
+
+#: The available codecs
+CODECS = (ZLIB, ZSTD)
+
+#: The columns of the chemical table that are compressed
+COMPRESSED_COLUMNS = ('definition', 'inchi')
+
+#: The default compression levels of the codecs. Higher levels barely shrink values this short but are much slower.
+DEFAULT_LEVELS = {ZLIB: 6, ZSTD: 6}
+
+#: The size of the dictionaries in bytes. zlib only uses the last 32 KB.
+DICTIONARY_SIZE = 16 * 1024
+
+#: The number of values a dictionary is trained on
+DICTIONARY_SAMPLES = 10000
+
+#: The length of the substrings counted when building a zlib dictionary
+ZLIB_SEGMENT_LENGTH = 8
+
+#: The first byte of a compressed value, by codec. It's followed by the identifier of the dictionary.
+_CODEC_TAGS = {ZLIB: 1, ZSTD: 2}
+_HEADER = struct.Struct('>BI')
+
+#: The dictionaries that have been registered, by their identifiers
+_dictionaries: Dict[int, bytes] = {}
+
+_local = threading.local()
+
+
+def _get_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError('the zstd codec requires zstandard. Install with pip install bio2bel_chebi[zstd]')
+    return zstandard
+
+
+def register_dictionary(dictionary: Optional[bytes]) -> int:
+    """Register a dictionary so values compressed with it can be decoded, and get its identifier.
+
+    :return: The CRC32 checksum of the dictionary, or 0 if there's no dictionary
+    """
+    if not dictionary:
+        return 0
+    dictionary_id = zlib.crc32(dictionary) or 1
+    _dictionaries[dictionary_id] = dictionary
+    return dictionary_id
+
+
+def _get_dictionary(dictionary_id: int) -> Optional[bytes]:
+    if not dictionary_id:
+        return None
+    try:
+        return _dictionaries[dictionary_id]
+    except KeyError:
+        raise ValueError(f'unknown compression dictionary: {dictionary_id}. Open the database with a manager first')
+
+
+def _get_zstd_decompressor(dictionary_id: int):
+    """Get this thread's zstd decompressor for the dictionary, since they can't be shared between threads."""
+    decompressors = getattr(_local, 'decompressors', None)
+    if decompressors is None:
+        decompressors = _local.decompressors = {}
+
+    decompressor = decompressors.get(dictionary_id)
+    if decompressor is None:
+        zstandard = _get_zstandard()
+        dictionary = _get_dictionary(dictionary_id)
+        decompressor = decompressors[dictionary_id] = zstandard.ZstdDecompressor(
+            dict_data=zstandard.ZstdCompressionDict(dictionary) if dictionary else None,
+        )
+    return decompressor
+
+
+def decompress(value: bytes) -> str:
+    """Decode a value compressed with :meth:`TextCodec.encode`."""
+    tag, dictionary_id = _HEADER.unpack_from(value)
+    data = value[_HEADER.size:]
+
+    if tag == _CODEC_TAGS[ZLIB]:
+        dictionary = _get_dictionary(dictionary_id)
+        if dictionary:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS, zdict=dictionary)
+        else:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        data = decompressor.decompress(data) + decompressor.flush()
+    elif tag == _CODEC_TAGS[ZSTD]:
+        data = _get_zstd_decompressor(dictionary_id).decompress(data)
+    else:
+        raise ValueError(f'unknown compression codec: {tag}')
+
+    return data.decode('utf-8')
+
+
+class CompressedText(TypeDecorator):
+    """A text column whose values may be compressed with :class:`TextCodec`, and are decoded when read.
+
+    Values are stored as they're given, so plain strings stay plain and compressed blobs stay compressed.
+    """
+
+    impl = Text
+
+    def process_result_value(self, value, dialect):  # noqa: D102
+        if isinstance(value, bytes):
+            return decompress(value)
+        return value
+
+
+def _train_zlib_dictionary(samples: Sequence[bytes], size: int) -> bytes:
+    """Build a zlib preset dictionary from the substrings that appear in the most samples.
+
+    The most common substrings go last, since zlib encodes nearby matches more cheaply.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update({
+            sample[i:i + ZLIB_SEGMENT_LENGTH]
+            for i in range(0, len(sample) - ZLIB_SEGMENT_LENGTH + 1)
+        })
+
+    segments = []
+    total = 0
+    for segment, count in counts.most_common():
+        if count < 2 or total + len(segment) > size:
+            break
+        segments.append(segment)
+        total += len(segment)
+
+    return b''.join(reversed(segments))
+
+
+def train_dictionary(values: Sequence[str], codec: str, size: int = DICTIONARY_SIZE) -> Optional[bytes]:
+    """Train a compression dictionary on the values.
+
+    :param values: The values of a column
+    :param codec: One of :data:`CODECS`
+    :param size: The maximum size of the dictionary in bytes
+    :return: The dictionary, or None if there weren't enough values to train one
+    """
+    step = max(1, len(values) // DICTIONARY_SAMPLES)
+    samples = [value.encode('utf-8') for value in values[::step]]
+
+    if codec == ZLIB:
+        dictionary = _train_zlib_dictionary(samples, min(size, 1 << zlib.MAX_WBITS))
+        return dictionary or None
+
+    zstandard = _get_zstandard()
+    try:
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    except zstandard.ZstdError as e:  # too few samples
+        log.warning('not training a zstd dictionary on %d values: %s', len(samples), e)
+        return None
+
+
+class TextCodec:
+    """Compresses the values of a column, each on its own, against an optional dictionary."""
+
+    def __init__(self, codec: str, level: Optional[int] = None, dictionary: Optional[bytes] = None) -> None:
+        """Initialize the codec and register its dictionary.
+
+        :param codec: One of :data:`CODECS`
+        :param level: The compression level. Defaults to the codec's entry in :data:`DEFAULT_LEVELS`.
+        :param dictionary: A dictionary from :func:`train_dictionary`
+        """
+        if codec not in CODECS:
+            raise ValueError(f'invalid codec: {codec}. Use one of {CODECS}')
+
+        self.codec = codec
+        self.level = DEFAULT_LEVELS[codec] if level is None else level
+        self.dictionary = dictionary
+        self.dictionary_id = register_dictionary(dictionary)
+        self._header = _HEADER.pack(_CODEC_TAGS[codec], self.dictionary_id)
+
+        if codec == ZLIB:
+            if dictionary:
+                self._compressobj = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+            else:
+                self._compressobj = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        else:
+            #: zstd compressors can't be shared between threads, so each thread makes its own when it needs one
+            self._zstd = threading.local()
+
+    def __repr__(self):
+        return f'<TextCodec codec={self.codec} level={self.level} dictionary_id={self.dictionary_id}>'
+
+    def compress(self, value: str) -> bytes:
+        """Compress the value."""
+        data = value.encode('utf-8')
+
+        if self.codec == ZLIB:
+            compressobj = self._compressobj.copy()  # skips loading the dictionary again
+            return self._header + compressobj.compress(data) + compressobj.flush()
+
+        compressor = getattr(self._zstd, 'compressor', None)
+        if compressor is None:
+            zstandard = _get_zstandard()
+            compressor = self._zstd.compressor = zstandard.ZstdCompressor(
+                level=self.level,
+                dict_data=zstandard.ZstdCompressionDict(self.dictionary) if self.dictionary else None,
+                write_checksum=False,
+                write_dict_id=False,
+            )
+        return self._header + compressor.compress(data)
+
+    def encode(self, value: str) -> Union[str, bytes]:
+        """Compress the value if that makes it smaller, otherwise leave it as it is.
+
+        The same value is always encoded the same way, so encoded values can be compared for equality.
+        """
+        compressed = self.compress(value)
+        if len(compressed) < len(value.encode('utf-8')):
+            return compressed
+        return value
+
+    def encode_all(self, values: Sequence[Optional[str]]) -> List[Union[None, str, bytes]]:
+        """Encode the values, skipping missing ones."""
+        return [
+            value if value is None else self.encode(value)
+            for value in values
+        ]
@@ -25,13 +25,84 @@ COMPOUNDS_COLUMNS = [
     'STAR',
 ]
 
+#: The columns read from the compounds file and their types. MODIFIED_ON and CREATED_BY are skipped.
+COMPOUNDS_DTYPES = {
+    'ID': 'Int64',
+    'STATUS': 'category',
+    'CHEBI_ACCESSION': 'object',
+    'SOURCE': 'category',
+    'PARENT_ID': 'Int64',
+    'NAME': 'object',
+    'DEFINITION': 'object',
+    'STAR': 'Int64',
+}
+
 NAMES_URL = 'ftp://ftp.ebi.ac.uk/pub/databases/chebi/Flat_file_tab_delimited/names.tsv.gz'
 ACCESSION_URL = 'ftp://ftp.ebi.ac.uk/pub/databases/chebi/Flat_file_tab_delimited/database_accession.tsv'
 INCHIS_URL = 'ftp://ftp.ebi.ac.uk/pub/databases/chebi/Flat_file_tab_delimited/chebiId_inchi.tsv'
 RELATIONS_URL = 'ftp://ftp.ebi.ac.uk/pub/databases/chebi/Flat_file_tab_delimited/relation.tsv'
 
+#: The columns read from the names file and their types. ADAPTED is skipped.
+NAMES_DTYPES = {
+    'ID': 'Int64',
+    'COMPOUND_ID': 'Int64',
+    'TYPE': 'category',
+    'SOURCE': 'category',
+    'NAME': 'object',
+    'LANGUAGE': 'category',
+}
+
+#: The columns read from the database accession file and their types
+ACCESSION_DTYPES = {
+    'ID': 'Int64',
+    'COMPOUND_ID': 'Int64',
+    'SOURCE': 'category',
+    'TYPE': 'category',
+    'ACCESSION_NUMBER': 'object',
+}
+
+#: The columns read from the InChI file and their types
+INCHIS_DTYPES = {
+    'CHEBI_ID': 'Int64',
+    'InChI': 'object',
+}
+
+#: The columns read from the relations file and their types
+RELATIONS_DTYPES = {
+    'ID': 'Int64',
+    'TYPE': 'category',
+    'INIT_ID': 'Int64',
+    'FINAL_ID': 'Int64',
+    'STATUS': 'category',
+}
+
 COMPOUNDS_DATA_PATH = os.path.join(DATA_DIR, 'compounds.tsv.gz')
 NAMES_DATA_PATH = os.path.join(DATA_DIR, 'names.tsv.gz')
 ACCESSION_DATA_PATH = os.path.join(DATA_DIR, 'database_accession.tsv')
 INCHIS_DATA_PATH = os.path.join(DATA_DIR, 'chebiId_inchi.tsv')
 RELATIONS_DATA_PATH = os.path.join(DATA_DIR, 'relation.tsv')
+
+#: The column the compounds file is indexed by, for :mod:`bio2bel_chebi.parser.index`
+COMPOUNDS_INDEX_KEY = 'ID'
+#: The column the names file is indexed by, for :mod:`bio2bel_chebi.parser.index`
+NAMES_INDEX_KEY = 'COMPOUND_ID'
+
+#: The directory where each ChEBI release is stored in its own SQLite database
+RELEASES_DIRECTORY = os.path.join(DATA_DIR, 'releases')
+
+#: The ontology file whose ``data-version`` header gives the number of the current ChEBI release
+RELEASE_URL = 'ftp://ftp.ebi.ac.uk/pub/databases/chebi/ontology/chebi_lite.obo'
+
+#: The directory of the flat files of past ChEBI releases. Format with the release number.
+ARCHIVE_URL_FMT = 'ftp://ftp.ebi.ac.uk/pub/databases/chebi/archive/rel{release}/Flat_file_tab_delimited'
+
+#: The lookup stores of databases other than SQLite, which keep theirs next to the database file, formatted with a
+#: hash of the connection string without its password
+LOOKUP_PATH_FORMAT = os.path.join(DATA_DIR, 'lookup-{}.db')
+
+#: The directory where parsed flat files are cached in a binary format, keyed by the sizes and modification times
+#: of the originals
+PARSED_CACHE_DIRECTORY = os.path.join(DATA_DIR, 'parsed')
+
+#: The maximum total size in bytes of the parsed cache. The least recently used tables are evicted beyond it.
+PARSED_CACHE_MAX_SIZE = 2 ** 30
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""Dump every chemical with its synonyms, cross-references, InChI, and parent as newline-delimited JSON or JSON-LD.
+
+Instead of calling :meth:`bio2bel_chebi.models.Chemical.to_json` on each chemical and loading its synonyms and
+cross-references one chemical at a time, the chemicals, synonyms, and cross-references are each streamed in a
+single query ordered by chemical and joined while they're read. The records are serialized in batches and written
+as they're made, so a full release is dumped in bounded memory. Paths ending in ``.gz`` are gzipped.
+
+Records are serialized with :mod:`orjson` if it's installed and with :mod:`json` otherwise.
+
+.. code-block:: sh
+
+    bio2bel_chebi dump chebi.jsonl.gz
+    bio2bel_chebi dump --format jsonld chebi.jsonld.gz
+"""
+
+import gzip
+import json
+import logging
+from itertools import groupby
+from operator import itemgetter
+from typing import BinaryIO, Callable, Iterable, List, Mapping, Optional
+
+import click
+from sqlalchemy.orm import aliased
+
+from .models import Accession, Chemical, Synonym
+
+__all__ = [
+    'iter_chemical_records',
+    'write_ndjson',
+    'write_jsonld',
+    'dump_chemicals',
+    'JSONLD_CONTEXT',
+]
+
+log = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    def _dumps(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+else:
+    _dumps = orjson.dumps
+
+#: The number of rows fetched from the database at a time
+YIELD_PER = 10000
+
+#: The number of records serialized and written at a time
+BATCH_SIZE = 1000
+
+#: The formats of :func:`dump_chemicals`
+FORMATS = ('ndjson', 'jsonld')
+
+#: The JSON-LD context of the records, mostly with OBO terms
+JSONLD_CONTEXT = {
+    'CHEBI': 'http://purl.obolibrary.org/obo/CHEBI_',
+    'oboInOwl': 'http://www.geneontology.org/formats/oboInOwl#',
+    'dcterms': 'http://purl.org/dc/terms/',
+    'chebi_id': 'dcterms:identifier',
+    'name': 'http://www.w3.org/2000/01/rdf-schema#label',
+    'definition': 'http://purl.obolibrary.org/obo/IAO_0000115',
+    'source': 'dcterms:source',
+    'inchi': 'http://purl.obolibrary.org/obo/chebi/inchi',
+    'parent': {'@id': 'http://purl.obolibrary.org/obo/IAO_0100001', '@type': '@id'},
+    'synonyms': 'oboInOwl:hasSynonym',
+    'type': 'oboInOwl:hasSynonymType',
+    'language': 'dcterms:language',
+    'xrefs': 'oboInOwl:hasDbXref',
+    'accession': 'oboInOwl:id',
+}
+
+
+def _get_rows_getter(rows: Iterable) -> Callable[[int], List]:
+    """Make a function that gets the rows of a chemical from rows ordered by chemical, for increasing chemicals."""
+    groups = groupby(rows, key=itemgetter(0))
+    current = next(groups, None)
+
+    def _get_rows(chemical_id: int) -> List:
+        nonlocal current
+        while current is not None and current[0] < chemical_id:
+            current = next(groups, None)
+        if current is None or current[0] != chemical_id:
+            return []
+        rv = list(current[1])
+        current = next(groups, None)
+        return rv
+
+    return _get_rows
+
+
+def iter_chemical_records(manager) -> Iterable[Mapping]:
+    """Iterate over dictionaries of the chemicals in order of their identifiers.
+
+    The dictionaries are like :meth:`bio2bel_chebi.models.Chemical.to_json` with the chemicals' parents, synonyms,
+    and cross-references.
+
+    :param bio2bel_chebi.Manager manager: A manager
+    """
+    parent = aliased(Chemical)
+    chemicals = manager.session.query(
+        Chemical.id,
+        Chemical.chebi_id,
+        Chemical.name,
+        Chemical.definition,
+        Chemical.source,
+        Chemical.inchi,
+        parent.chebi_id,
+    ).outerjoin(parent, Chemical.parent_id == parent.id).order_by(Chemical.id).yield_per(YIELD_PER)
+
+    synonyms = manager.session.query(
+        Synonym.chemical_id,
+        Synonym.name,
+        Synonym.type,
+        Synonym.language,
+        Synonym.source,
+    ).order_by(Synonym.chemical_id, Synonym.id).yield_per(YIELD_PER)
+
+    xrefs = manager.session.query(
+        Accession.chemical_id,
+        Accession.source,
+        Accession.type,
+        Accession.accession,
+    ).order_by(Accession.chemical_id, Accession.id).yield_per(YIELD_PER)
+
+    get_synonyms = _get_rows_getter(synonyms)
+    get_xrefs = _get_rows_getter(xrefs)
+
+    for chemical_id, chebi_id, name, definition, source, inchi, parent_chebi_id in chemicals:
+        yield {
+            'chebi_id': chebi_id,
+            'name': name,
+            'definition': definition,
+            'source': source,
+            'inchi': inchi,
+            'parent': parent_chebi_id,
+            'synonyms': [
+                {'name': name, 'type': type_, 'language': language, 'source': source}
+                for _, name, type_, language, source in get_synonyms(chemical_id)
+            ],
+            'xrefs': [
+                {'source': source, 'type': type_, 'accession': accession}
+                for _, source, type_, accession in get_xrefs(chemical_id)
+            ],
+        }
+
+
+def _to_jsonld(record: Mapping) -> Mapping:
+    """Give a record its JSON-LD node identifier and turn its parent into a reference."""
+    rv = {'@id': f"CHEBI:{record['chebi_id']}"}
+    rv.update(record)
+    if record['parent'] is not None:
+        rv['parent'] = f"CHEBI:{record['parent']}"
+    return rv
+
+
+def _iter_batches(records: Iterable[Mapping]) -> Iterable[List[bytes]]:
+    """Serialize the records in batches."""
+    batch = []
+    for record in records:
+        batch.append(_dumps(record))
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_ndjson(manager, file: BinaryIO) -> int:
+    """Write the chemicals as newline-delimited JSON, one record per line.
+
+    :param bio2bel_chebi.Manager manager: A manager
+    :param file: A file opened in binary mode
+    :return: The number of chemicals written
+    """
+    rv = 0
+    for batch in _iter_batches(iter_chemical_records(manager)):
+        file.write(b'\n'.join(batch))
+        file.write(b'\n')
+        rv += len(batch)
+    return rv
+
+
+def write_jsonld(manager, file: BinaryIO) -> int:
+    """Write the chemicals as a JSON-LD document whose ``@graph`` has a node per chemical.
+
+    :param bio2bel_chebi.Manager manager: A manager
+    :param file: A file opened in binary mode
+    :return: The number of chemicals written
+    """
+    file.write(b'{"@context":' + _dumps(JSONLD_CONTEXT) + b',"@graph":[\n')
+    rv = 0
+    for batch in _iter_batches(map(_to_jsonld, iter_chemical_records(manager))):
+        if rv:
+            file.write(b',\n')
+        file.write(b',\n'.join(batch))
+        rv += len(batch)
+    file.write(b'\n]}\n')
+    return rv
+
+
+def dump_chemicals(manager, path: str, fmt: str = 'ndjson', compresslevel: Optional[int] = None) -> int:
+    """Dump the chemicals to a file, which is gzipped if the path ends in ``.gz``.
+
+    :param bio2bel_chebi.Manager manager: A manager
+    :param path: The path of the file
+    :param fmt: Either ``ndjson`` or ``jsonld``
+    :param compresslevel: The gzip compression level. Defaults to 6, which is much faster than the maximum
+     and not much bigger.
+    :return: The number of chemicals written
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'invalid format: {fmt}. Use one of {FORMATS}')
+
+    write = write_ndjson if fmt == 'ndjson' else write_jsonld
+
+    if path.endswith('.gz'):
+        with gzip.open(path, 'wb', compresslevel=6 if compresslevel is None else compresslevel) as file:
+            rv = write(manager, file)
+    else:
+        with open(path, 'wb') as file:
+            rv = write(manager, file)
+
+    log.info('dumped %d chemicals to %s', rv, path)
+    return rv
+
+
+def add_cli_dump(main: click.Group) -> click.Group:  # noqa: D202
+    """Add a ``dump`` command to main :mod:`click` function."""
+
+    @main.command()
+    @click.argument('path')
+    @click.option('-f', '--format', 'fmt', type=click.Choice(FORMATS), default='ndjson', show_default=True)
+    @click.option('--compresslevel', type=click.IntRange(0, 9), help='The gzip compression level for .gz paths')
+    @click.pass_obj
+    def dump(manager, path, fmt, compresslevel):
+        """Dump the chemicals as (gzipped) newline-delimited JSON or JSON-LD."""
+        count = dump_chemicals(manager, path, fmt=fmt, compresslevel=compresslevel)
+        click.echo(f'dumped {count} chemicals to {path}')
+
+    return main
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+"""Export the ChEBI relation graph to compact formats for graph analytics.
+
+Unlike :meth:`bio2bel_chebi.Manager.to_bel`, these exports stream rows from the database without building
+ORM objects or a :class:`pybel.BELGraph`, so they stay fast and small for the full ontology.
+
+Nodes are identified by the ChEBI numeric identifiers and edges read as *subject relation object*, like
+``38545 is_a 87631`` for rosuvastatin is a statin. If ``collapse_parents`` is given, secondary ChEBI identifiers
+are replaced by their parents.
+
+The CSR export can be read back as a :mod:`scipy.sparse` adjacency matrix with :func:`read_csr`, which needs
+:mod:`scipy` to be installed.
+"""
+
+import json
+import logging
+from array import array
+from typing import Iterable, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape
+
+import click
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+
+from .models import Chemical, Relation
+from .utils import iter_chunks
+
+__all__ = [
+    'iter_edges',
+    'write_edgelist',
+    'get_csr',
+    'write_csr',
+    'read_csr',
+    'write_graphml',
+    'write_nodelink',
+]
+
+log = logging.getLogger(__name__)
+
+#: The number of rows fetched from the database at a time
+YIELD_PER = 10000
+
+
+def iter_edges(
+        manager,
+        relation_types: Optional[Iterable[str]] = None,
+        collapse_parents: bool = False,
+) -> Iterable[Tuple[int, str, int]]:
+    """Iterate over the (subject, relation, object) triples of the relation graph.
+
+    :param bio2bel_chebi.Manager manager: A manager
+    :param relation_types: Only include relations of these types, like ``['is_a']``
+    :param collapse_parents: Replace secondary ChEBI identifiers by their parents
+    """
+    if collapse_parents:
+        source, target = aliased(Chemical), aliased(Chemical)
+        query = manager.session.query(
+            func.coalesce(target.parent_id, target.id),
+            Relation.type,
+            func.coalesce(source.parent_id, source.id),
+        ).join(target, Relation.target_id == target.id).join(source, Relation.source_id == source.id)
+    else:
+        query = manager.session.query(Relation.target_id, Relation.type, Relation.source_id)
+
+    if relation_types is not None:
+        query = query.filter(Relation.type.in_(list(relation_types)))
+
+    return query.yield_per(YIELD_PER)
+
+
+def write_edgelist(
+        manager,
+        file: TextIO,
+        relation_types: Optional[Iterable[str]] = None,
+        collapse_parents: bool = False,
+) -> None:
+    """Write the relation graph as a tab-separated edge list with a header."""
+    print('subject', 'relation', 'object', sep='\t', file=file)
+    for subject, relation, obj in iter_edges(manager, relation_types=relation_types, collapse_parents=collapse_parents):
+        print(subject, relation, obj, sep='\t', file=file)
+
+
+def get_csr(
+        manager,
+        relation_types: Optional[Iterable[str]] = None,
+        collapse_parents: bool = False,
+):
+    """Get the relation graph in compressed sparse row format as :mod:`numpy` arrays.
+
+    Returns a dictionary with:
+
+    - ``nodes``: the sorted ChEBI identifiers. The position of a node in this array is its index.
+    - ``indptr`` and ``indices``: the edges from the nodes at each row to the nodes at the indices
+    - ``data``: the position of each edge's type in ``relation_types``
+    - ``relation_types``: the types of relations
+
+    :rtype: dict[str,numpy.ndarray]
+    """
+    import numpy as np
+
+    subjects, objects, codes = array('q'), array('q'), array('B')
+    type_to_code = {}
+    for subject, relation, obj in iter_edges(manager, relation_types=relation_types, collapse_parents=collapse_parents):
+        subjects.append(subject)
+        objects.append(obj)
+        code = type_to_code.get(relation)
+        if code is None:
+            code = type_to_code[relation] = len(type_to_code)
+        codes.append(code)
+
+    subjects = np.frombuffer(subjects, dtype=np.int64) if subjects else np.empty(0, dtype=np.int64)
+    objects = np.frombuffer(objects, dtype=np.int64) if objects else np.empty(0, dtype=np.int64)
+    codes = np.frombuffer(codes, dtype=np.uint8) if codes else np.empty(0, dtype=np.uint8)
+
+    nodes = np.union1d(subjects, objects)
+    rows = np.searchsorted(nodes, subjects)
+    columns = np.searchsorted(nodes, objects)
+
+    order = np.lexsort((columns, rows))
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(nodes)), out=indptr[1:])
+
+    return dict(
+        nodes=nodes,
+        indptr=indptr,
+        indices=columns[order],
+        data=codes[order],
+        relation_types=np.array(sorted(type_to_code, key=type_to_code.get), dtype=str),
+    )
+
+
+def write_csr(
+        manager,
+        path: str,
+        relation_types: Optional[Iterable[str]] = None,
+        collapse_parents: bool = False,
+) -> None:
+    """Write the relation graph in compressed sparse row format to a :func:`numpy.savez_compressed` file."""
+    import numpy as np
+
+    np.savez_compressed(path, **get_csr(manager, relation_types=relation_types, collapse_parents=collapse_parents))
+
+
+def read_csr(path: str, relation_type: Optional[str] = None):
+    """Read a file from :func:`write_csr` as a sparse adjacency matrix.
+
+    :param path: The path to a file written by :func:`write_csr`
+    :param relation_type: Only include relations of this type
+    :return: A pair of the adjacency matrix, whose entries count the edges between each pair of nodes, and the
+     array of the ChEBI identifiers of its rows and columns
+    :rtype: tuple[scipy.sparse.csr_matrix,numpy.ndarray]
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    with np.load(path) as arrays:
+        nodes, indptr, indices, data = arrays['nodes'], arrays['indptr'], arrays['indices'], arrays['data']
+        relation_types = list(arrays['relation_types'])
+
+    weights = np.ones(len(indices), dtype=np.float32)
+    if relation_type is not None:
+        code = relation_types.index(relation_type) if relation_type in relation_types else -1
+        weights[data != code] = 0
+
+    matrix = csr_matrix((weights, indices, indptr), shape=(len(nodes), len(nodes)))
+    matrix.eliminate_zeros()
+    matrix.sum_duplicates()
+    return matrix, nodes
+
+
+def _get_nodes(manager, edges: Iterable[Tuple[int, str, int]]) -> List[Tuple[int, Optional[str]]]:
+    """Get the sorted identifiers and names of the nodes in the edges."""
+    node_ids = set()
+    for subject, _, obj in edges:
+        node_ids.add(subject)
+        node_ids.add(obj)
+
+    rv = []
+    for chunk in iter_chunks(sorted(node_ids)):
+        rv.extend(manager.session.query(Chemical.id, Chemical.name).filter(Chemical.id.in_(chunk)))
+    return sorted(rv)
+
+
+def write_graphml(
+        manager,
+        file: TextIO,
+        relation_types: Optional[Iterable[str]] = None,
+        collapse_parents: bool = False,
+) -> None:
+    """Write the relation graph as GraphML, streaming the edges twice: once for the nodes and once to write."""
+    kwargs = dict(relation_types=relation_types, collapse_parents=collapse_parents)
+
+    print('<?xml version="1.0" encoding="UTF-8"?>', file=file)
+    print('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">', file=file)
+    print('<key id="name" for="node" attr.name="name" attr.type="string"/>', file=file)
+    print('<key id="relation" for="edge" attr.name="relation" attr.type="string"/>', file=file)
+    print('<graph edgedefault="directed">', file=file)
+
+    for node_id, name in _get_nodes(manager, iter_edges(manager, **kwargs)):
+        if name is None:
+            print(f'<node id="{node_id}"/>', file=file)
+        else:
+            print(f'<node id="{node_id}"><data key="name">{escape(name)}</data></node>', file=file)
+
+    for subject, relation, obj in iter_edges(manager, **kwargs):
+        print(
+            f'<edge source="{subject}" target="{obj}"><data key="relation">{escape(relation)}</data></edge>',
+            file=file,
+        )
+
+    print('</graph>', file=file)
+    print('</graphml>', file=file)
+
+
+def write_nodelink(
+        manager,
+        file: TextIO,
+        relation_types: Optional[Iterable[str]] = None,
+        collapse_parents: bool = False,
+) -> None:
+    """Write the relation graph as node-link JSON like :func:`networkx.node_link_data`, one node or link per line."""
+    kwargs = dict(relation_types=relation_types, collapse_parents=collapse_parents)
+
+    print('{"directed": true, "multigraph": true, "graph": {}, "nodes": [', file=file)
+    for i, (node_id, name) in enumerate(_get_nodes(manager, iter_edges(manager, **kwargs))):
+        print(',' if i else '', json.dumps({'id': node_id, 'name': name}), sep='', file=file)
+
+    print('], "links": [', file=file)
+    for i, (subject, relation, obj) in enumerate(iter_edges(manager, **kwargs)):
+        print(',' if i else '', json.dumps({'source': subject, 'target': obj, 'relation': relation}), sep='', file=file)
+
+    print(']}', file=file)
+
+
+def add_cli_export(main: click.Group) -> click.Group:  # noqa: D202
+    """Add an ``export`` command group to main :mod:`click` function."""
+
+    @main.group()
+    def export():
+        """Export the relation graph."""
+
+    def _add_options(f):
+        f = click.option('-t', '--relation-type', 'relation_types', multiple=True,
+                         help='Only export relations of this type. Can be given several times.')(f)
+        f = click.option('--collapse-parents', is_flag=True, help='Replace secondary identifiers by their parents')(f)
+        return f
+
+    @export.command()
+    @click.argument('file', type=click.File('w'))
+    @_add_options
+    @click.pass_obj
+    def edgelist(manager, file, relation_types, collapse_parents):
+        """Write a tab-separated edge list."""
+        write_edgelist(manager, file, relation_types=relation_types or None, collapse_parents=collapse_parents)
+
+    @export.command()
+    @click.argument('path')
+    @_add_options
+    @click.pass_obj
+    def csr(manager, path, relation_types, collapse_parents):
+        """Write compressed sparse row arrays to a NumPy .npz file."""
+        write_csr(manager, path, relation_types=relation_types or None, collapse_parents=collapse_parents)
+
+    @export.command()
+    @click.argument('file', type=click.File('w'))
+    @_add_options
+    @click.pass_obj
+    def graphml(manager, file, relation_types, collapse_parents):
+        """Write GraphML."""
+        write_graphml(manager, file, relation_types=relation_types or None, collapse_parents=collapse_parents)
+
+    @export.command()
+    @click.argument('file', type=click.File('w'))
+    @_add_options
+    @click.pass_obj
+    def nodelink(manager, file, relation_types, collapse_parents):
+        """Write node-link JSON."""
+        write_nodelink(manager, file, relation_types=relation_types or None, collapse_parents=collapse_parents)
+
+    return main
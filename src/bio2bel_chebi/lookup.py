@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+
+"""A read-optimized on-disk key-value store for the hot lookups of the manager.
+
+Looking up a chemical by its ChEBI identifier or building the identifier-to-name mapping queries the main
+database, and every new worker process has to rebuild its dictionaries from scratch. Instead, the manager builds
+a :class:`LookupStore` when it populates the database: a small SQLite file of ``WITHOUT ROWID`` tables, each
+clustered on its key, holding
+
+- ChEBI identifier to name, primary key, and parent,
+- name to ChEBI identifiers, ranked (see below), and
+- cross-reference to ChEBI identifiers.
+
+Workers open the file read-only and immutable with memory-mapped I/O, so they share the operating system's page
+cache, opening it is instant, and each lookup is a single B-tree search.
+
+Names are ambiguous: a name can be the name of several chemicals or a synonym of others. Each name maps to all of
+its chemicals, ranked by :func:`get_ranked_names`, so the best one is always the same.
+
+The store is a snapshot of the database when it was built. Populating the database rebuilds it, and it can be
+rebuilt by hand with:
+
+.. code-block:: sh
+
+    bio2bel_chebi build-lookup
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from collections.abc import ItemsView, Mapping as MappingABC
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.request import pathname2url
+
+import click
+from sqlalchemy import bindparam, case, func, literal, select, union_all
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import aliased
+
+from .constants import LOOKUP_PATH_FORMAT
+from .models import Accession, Chemical, Synonym
+from .utils import is_sqlite, iter_chunks
+
+__all__ = [
+    'LookupStore',
+    'get_lookup_path',
+    'get_ranked_names',
+]
+
+log = logging.getLogger(__name__)
+
+#: The number of rows fetched from the database at a time when building a store
+FETCH_SIZE = 10000
+
+#: The version of the layout of the store, which is checked when it's opened
+SCHEMA_VERSION = 2
+
+#: The ranks of the types of synonyms, most preferred first. The names of the chemicals themselves come before all.
+SYNONYM_TYPE_RANKS = {
+    'IUPAC NAME': 1,
+    'INN': 2,
+    'SYNONYM': 3,
+    'BRAND NAME': 4,
+}
+
+#: The source of synonyms that's preferred among synonyms of the same type
+PREFERRED_SYNONYM_SOURCE = 'ChEBI'
+
+_SCHEMA = [
+    """CREATE TABLE chemical (
+        chebi_id TEXT PRIMARY KEY,
+        id INTEGER NOT NULL,
+        name TEXT,
+        parent_id INTEGER,
+        parent_chebi_id TEXT
+    ) WITHOUT ROWID""",
+    """CREATE TABLE name (
+        name TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        chebi_id TEXT NOT NULL,
+        PRIMARY KEY (name, rank, id)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE xref (
+        accession TEXT NOT NULL,
+        source TEXT NOT NULL,
+        chebi_id TEXT NOT NULL,
+        PRIMARY KEY (accession, source, chebi_id)
+    ) WITHOUT ROWID""",
+]
+
+
+def get_lookup_path(connection: str) -> Optional[str]:
+    """Get the default path of the lookup store for a database.
+
+    A SQLite database gets its store next to it, so each database file, like each release in a
+    :class:`bio2bel_chebi.releases.ReleaseStore`, has its own. Other databases get theirs in the data directory,
+    named by a hash of the connection string without its password (see
+    :data:`bio2bel_chebi.constants.LOOKUP_PATH_FORMAT`), so each database has its own too. In-memory SQLite
+    databases don't get a store.
+    """
+    url = make_url(connection)
+
+    if not is_sqlite(connection):
+        url.password = None  # so changing the password keeps the store
+        return LOOKUP_PATH_FORMAT.format(hashlib.md5(str(url).encode('utf-8')).hexdigest())
+
+    path = url.database
+    if not path or path == ':memory:':
+        return None
+
+    return f'{path}.lookup'
+
+
+def get_ranked_names(names: bool = False):
+    """Build a query of the names and synonyms of the chemicals, ranked, like ``(name, rank, id, chebi_id)``.
+
+    The names of the chemicals have rank 0. Synonyms are ranked by their types with :data:`SYNONYM_TYPE_RANKS`,
+    then by their sources, preferring :data:`PREFERRED_SYNONYM_SOURCE`. A chemical with a name several times gets
+    its best rank. The rows are ordered by name, rank, then the chemical's numeric primary key, so ties are broken
+    the same way every time, and ChEBI:9 comes before ChEBI:10.
+
+    :param names: Only query the names in the expanding ``names`` parameter
+    """
+    type_rank = case(SYNONYM_TYPE_RANKS, value=Synonym.type, else_=len(SYNONYM_TYPE_RANKS) + 1)
+    source_rank = case([(Synonym.source == PREFERRED_SYNONYM_SOURCE, 0)], else_=1)
+
+    primary_names = select([
+        Chemical.name.label('name'),
+        literal(0).label('rank'),
+        Chemical.id.label('id'),
+        Chemical.chebi_id.label('chebi_id'),
+    ]).where(Chemical.name.isnot(None))
+
+    synonyms = select([
+        Synonym.name,
+        10 * type_rank + source_rank,
+        Chemical.id,
+        Chemical.chebi_id,
+    ]).select_from(Synonym.__table__.join(Chemical.__table__)).where(Synonym.name.isnot(None))
+
+    if names:
+        primary_names = primary_names.where(Chemical.name.in_(bindparam('names', expanding=True)))
+        synonyms = synonyms.where(Synonym.name.in_(bindparam('names', expanding=True)))
+
+    ranked = union_all(primary_names, synonyms).alias('ranked')
+    rank = func.min(ranked.c.rank).label('rank')
+    return select([ranked.c.name, rank, ranked.c.id, ranked.c.chebi_id]).group_by(
+        ranked.c.name, ranked.c.id, ranked.c.chebi_id,
+    ).order_by(ranked.c.name, rank, ranked.c.id)
+
+
+def _iter_rows(result) -> Iterable[Tuple]:
+    """Stream the rows of a result in batches."""
+    while True:
+        rows = result.fetchmany(FETCH_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+
+class LookupStore:
+    """A read-only key-value store of ChEBI identifiers, names, parents, and cross-references.
+
+    Each process and thread opens its own connection on its first lookup, so a store can be shared with worker
+    processes, forked or not.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open the store at the given path.
+
+        :param path: The path of a store built with :meth:`build`
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f'no lookup store at {path}')
+
+        self.path = path
+        self._local = threading.local()
+
+    @classmethod
+    def build(cls, manager, path: str) -> 'LookupStore':
+        """Build a store from the database of the manager.
+
+        The store is written to a temporary file and renamed into place, so processes that already opened the
+        previous store keep reading it.
+
+        :param bio2bel_chebi.Manager manager: A manager
+        :param path: The path of the store
+        """
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+        log.info('building lookup store at %s', path)
+        connection = sqlite3.connect(temporary_path)
+        try:
+            connection.execute('PRAGMA journal_mode = OFF')
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+            parent = aliased(Chemical)
+            chemicals = select([Chemical.chebi_id, Chemical.id, Chemical.name, Chemical.parent_id, parent.chebi_id])
+            chemicals = chemicals.select_from(Chemical.__table__.outerjoin(parent, Chemical.parent_id == parent.id))
+            connection.executemany(
+                'INSERT INTO chemical VALUES (?, ?, ?, ?, ?)',
+                _iter_rows(manager.session.execute(chemicals.order_by(Chemical.chebi_id))),
+            )
+
+            connection.executemany(
+                'INSERT INTO name VALUES (?, ?, ?, ?)',
+                _iter_rows(manager.session.execute(get_ranked_names())),
+            )
+
+            xrefs = select([Accession.accession, Accession.source, Chemical.chebi_id]).select_from(
+                Accession.__table__.join(Chemical.__table__),
+            ).where(Accession.accession.isnot(None) & Accession.source.isnot(None)).distinct()
+            connection.executemany(
+                'INSERT INTO xref VALUES (?, ?, ?)',
+                _iter_rows(manager.session.execute(xrefs.order_by(Accession.accession, Accession.source))),
+            )
+
+            connection.commit()
+        except Exception:
+            connection.close()
+            os.remove(temporary_path)
+            raise
+        else:
+            connection.close()
+
+        os.replace(temporary_path, path)
+        return cls(path)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the connection of this thread, opening it if this thread or process hasn't yet."""
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            connection = sqlite3.connect(
+                f'file:{pathname2url(os.path.abspath(self.path))}?mode=ro&immutable=1',
+                uri=True,
+                check_same_thread=False,
+            )
+            connection.execute(f'PRAGMA mmap_size = {os.path.getsize(self.path)}')
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+
+    def _get_one(self, sql: str, *parameters):
+        """Get the first row of a query, or None."""
+        return self._get_connection().execute(sql, parameters).fetchone()
+
+    def _get_column(self, sql: str, *parameters) -> List:
+        """Get the first column of the rows of a query."""
+        return [value for value, *_ in self._get_connection().execute(sql, parameters)]
+
+    @property
+    def version(self) -> int:
+        """The version of the layout of the store, which is :data:`SCHEMA_VERSION` for stores built by this version."""
+        return self._get_one('PRAGMA user_version')[0]
+
+    def __len__(self) -> int:
+        """Count the chemicals in the store."""
+        return self._get_one('SELECT count(*) FROM chemical')[0]
+
+    def __contains__(self, chebi_id: str) -> bool:
+        """Check if the ChEBI identifier is in the store."""
+        return self._get_one('SELECT 1 FROM chemical WHERE chebi_id = ?', chebi_id) is not None
+
+    def get_primary_keys(self, chebi_id: str) -> Optional[Tuple[int, Optional[int]]]:
+        """Get the primary keys of the chemical and of its parent in the database, or None if it's not stored."""
+        return self._get_one('SELECT id, parent_id FROM chemical WHERE chebi_id = ?', chebi_id)
+
+    def get_name(self, chebi_id: str) -> Optional[str]:
+        """Get the name of the chemical with the ChEBI identifier."""
+        row = self._get_one('SELECT name FROM chemical WHERE chebi_id = ?', chebi_id)
+        if row is not None:
+            return row[0]
+
+    def get_parent_chebi_id(self, chebi_id: str) -> Optional[str]:
+        """Get the ChEBI identifier of the parent of the secondary chemical with the ChEBI identifier."""
+        row = self._get_one('SELECT parent_chebi_id FROM chemical WHERE chebi_id = ?', chebi_id)
+        if row is not None:
+            return row[0]
+
+    def get_chebi_ids_by_name(self, name: str) -> List[str]:
+        """Get the ChEBI identifiers of the chemicals with the name or synonym, best first."""
+        return self._get_column('SELECT chebi_id FROM name WHERE name = ? ORDER BY rank, id', name)
+
+    def get_chebi_ids_by_names(self, names: Iterable[str]) -> Dict[str, List[str]]:
+        """Get a dictionary from the names to the ChEBI identifiers of the chemicals with them, best first.
+
+        Names that aren't in the store are omitted.
+        """
+        connection = self._get_connection()
+        rv = defaultdict(list)
+        for chunk in iter_chunks(set(names)):
+            placeholders = ', '.join('?' * len(chunk))
+            sql = f'SELECT name, chebi_id FROM name WHERE name IN ({placeholders}) ORDER BY name, rank, id'
+            for name, chebi_id in connection.execute(sql, chunk):
+                rv[name].append(chebi_id)
+        return dict(rv)
+
+    def get_chebi_ids_by_xref(self, accession: str, source: Optional[str] = None) -> List[str]:
+        """Get the ChEBI identifiers of the chemicals with the cross-reference.
+
+        :param accession: The accession number in the external database
+        :param source: The source database (like ``KEGG COMPOUND``). If not given, matches any source.
+        """
+        if source is None:
+            return self._get_column('SELECT DISTINCT chebi_id FROM xref WHERE accession = ?', accession)
+        return self._get_column('SELECT chebi_id FROM xref WHERE accession = ? AND source = ?', accession, source)
+
+    @property
+    def chebi_id_to_name(self) -> 'ChebiIdNameMapping':
+        """A read-only mapping from the ChEBI identifiers to the names, which is looked up in the store."""
+        return ChebiIdNameMapping(self)
+
+    def close(self) -> None:
+        """Close the connection of this thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            connection.close()
+        self._local = threading.local()
+
+
+class ChebiIdNameMapping(MappingABC):
+    """A read-only mapping from ChEBI identifiers to names, backed by a :class:`LookupStore`."""
+
+    def __init__(self, store: LookupStore) -> None:
+        """Wrap the lookup store."""
+        self.store = store
+
+    def __getitem__(self, chebi_id: str) -> Optional[str]:
+        """Get the name of the chemical with the given ChEBI identifier."""
+        row = self.store._get_one('SELECT name FROM chemical WHERE chebi_id = ?', chebi_id)
+        if row is None:
+            raise KeyError(chebi_id)
+        return row[0]
+
+    def __contains__(self, chebi_id) -> bool:
+        """Check if there's a chemical with the given ChEBI identifier."""
+        return chebi_id in self.store
+
+    def __iter__(self):
+        """Iterate over the ChEBI identifiers of all chemicals."""
+        for chebi_id, in self.store._get_connection().execute('SELECT chebi_id FROM chemical'):
+            yield chebi_id
+
+    def __len__(self) -> int:
+        """Count the chemicals."""
+        return len(self.store)
+
+    def items(self) -> '_ChebiIdNameItems':
+        """Get a view of the pairs of ChEBI identifiers and names."""
+        return _ChebiIdNameItems(self)
+
+
+class _ChebiIdNameItems(ItemsView):
+    """Iterate over the pairs of ChEBI identifiers and names in a single scan instead of a lookup per identifier."""
+
+    def __iter__(self):
+        """Iterate over the pairs of ChEBI identifiers and names."""
+        return iter(self._mapping.store._get_connection().execute('SELECT chebi_id, name FROM chemical'))
+
+
+def add_cli_build_lookup(main: click.Group) -> click.Group:  # noqa: D202
+    """Add a ``build-lookup`` command to main :mod:`click` function."""
+
+    @main.command(name='build-lookup')
+    @click.pass_obj
+    def build_lookup(manager):
+        """Rebuild the lookup store from the database."""
+        if manager.lookup_path is None:
+            click.echo('An in-memory database has no lookup store')
+            return
+        manager.build_lookup()
+        click.echo(f'built lookup store at {manager.lookup_path}')
+
+    return main
@@ -4,27 +4,35 @@
 
 import datetime
 import logging
+import os
+import sys
 import time
-from typing import Iterable, List, Mapping, Optional, Tuple
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterable, List, Mapping, Optional, Set, Tuple, Union
 
-import pandas as pd
-from networkx import relabel_nodes
+import click
 from pybel import BELGraph
-from pybel.constants import IDENTIFIER, NAME, NAMESPACE
-from pybel.dsl import BaseEntity
+from pybel.constants import IDENTIFIER, IS_A, NAME, NAMESPACE, RELATION
+from pybel.dsl import Abundance, BaseEntity
 from pybel.manager.models import Namespace, NamespaceEntry
+from pybel.utils import hash_edge
+from sqlalchemy import bindparam, event, func, inspect
+from sqlalchemy.orm import joinedload
 from tqdm import tqdm
 
 from bio2bel import AbstractManager
 from bio2bel.manager.flask_manager import FlaskMixin
 from bio2bel.manager.namespace_manager import BELNamespaceManagerMixin
+from .compression import CODECS, TextCodec, train_dictionary
 from .constants import MODULE_NAME
-from .models import Accession, Base, Chemical, Relation, Synonym
-from .parser.accession import get_accession_df
-from .parser.compounds import get_compounds_df
-from .parser.inchis import get_inchis_df
-from .parser.names import get_names_df
-from .parser.relation import get_relations_df
+from .lookup import LookupStore, SCHEMA_VERSION, get_lookup_path, get_ranked_names
+from .models import Accession, Base, Chemical, Compression, Relation, Release, Statistic, Synonym
+from .statistics import STATISTIC_BREAKDOWNS, TOTAL, echo_summary, get_statistics, summarize_statistics
+from .utils import (
+    LRUCache, build_engine, build_session, get_chebi_reference, is_sqlite, iter_chunks, iter_prefetched,
+    set_sqlite_fast_load_pragmas,
+)
 
 __all__ = ['Manager']
 
@@ -34,6 +42,22 @@ _chebi_bel_name = 'ChEBI Ontology'
 _chebi_bel_version = datetime.datetime.utcnow().strftime('%Y%m%d%H%M')
 _chebi_description = 'Relations between chemicals of biological interest'
 
+#: The maximum number of single lookups kept in the cache of the API
+JSON_CACHE_SIZE = 2 ** 14
+
+#: The number of chunks of a flat file that are read ahead of the database writes when populating in chunks
+MAX_BUFFERED_CHUNKS = 2
+
+
+def _get_admin_view(name: str):
+    """Get a factory of a view from :mod:`bio2bel_chebi.admin`, which needs Flask-Admin so is imported lazily."""
+
+    def _make_view(model, session):
+        from . import admin
+        return getattr(admin, name)(model, session)
+
+    return _make_view
+
 
 class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
     """Chemical multi-hierarchy."""
@@ -48,60 +72,257 @@ class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
     identifiers_namespace = 'chebi'
     identifiers_url = 'http://identifiers.org/chebi/'
 
-    flask_admin_models = [Chemical, Relation, Synonym, Accession]
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    flask_admin_models = [
+        (Chemical, _get_admin_view('ChemicalView')),
+        (Relation, _get_admin_view('RelationView')),
+        (Synonym, _get_admin_view('SynonymView')),
+        (Accession, _get_admin_view('AccessionView')),
+    ]
 
-        # a dictionary from CHEBI identifier (string CHEBI:\d+) to the model
-        self.id_chemical = {}
+    def __init__(
+            self,
+            connection: Optional[str] = None,
+            *args,
+            read_only: bool = False,
+            immutable: bool = False,
+            pool_size: Optional[int] = None,
+            max_overflow: Optional[int] = None,
+            pool_pre_ping: bool = False,
+            pool_recycle: Optional[int] = None,
+            scopefunc=None,
+            lookup_path: Optional[str] = None,
+            **kwargs
+    ):
+        """Build a ChEBI manager.
+
+        If any of the engine options are given, the engine and session are built with :func:`build_engine` and
+        :func:`build_session` instead of the Bio2BEL defaults.
+
+        :param connection: An RFC-1738 database connection string. Defaults to the Bio2BEL configuration.
+        :param read_only: Open a SQLite database read-only, e.g., to serve it from many worker processes
+        :param immutable: Tell SQLite the read-only database file never changes
+        :param pool_size: The number of connections to keep open in the pool
+        :param max_overflow: The number of connections to allow above the pool size at peak load
+        :param pool_pre_ping: Test connections for liveness when they're checked out of the pool
+        :param pool_recycle: Replace connections after this many seconds
+        :param scopefunc: Scoped function to pass to :func:`sqlalchemy.orm.scoped_session`
+        :param lookup_path: The path of the :class:`bio2bel_chebi.lookup.LookupStore` that's built when populating
+         and used for lookups by ChEBI identifier. Defaults to :func:`bio2bel_chebi.lookup.get_lookup_path`.
+        """
+        #: Read-only managers don't create the tables, so they can open databases built by older versions
+        self.read_only = read_only
+
+        engine_kwargs = dict(
+            read_only=read_only,
+            immutable=immutable,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=pool_pre_ping,
+            pool_recycle=pool_recycle,
+        )
+        if any(engine_kwargs.values()) or scopefunc is not None:
+            if kwargs.get('engine') is not None or kwargs.get('session') is not None:
+                raise ValueError('can not specify engine options with engine/session')
+
+            connection = connection or self._get_connection()
+            engine = build_engine(
+                connection,
+                echo=kwargs.pop('echo', False),
+                **engine_kwargs
+            )
+            kwargs.update(engine=engine, session=build_session(engine, scopefunc=scopefunc))
+            super().__init__(*args, **kwargs)
+        else:
+            super().__init__(connection, *args, **kwargs)
+            connection = str(self.engine.url)
+
+        #: The connection string as given, before any read-only rewriting
+        self._connection = connection
+        self._engine_kwargs = engine_kwargs
+        self._fast_loading = False
+
+        #: A cache of the chemicals from :meth:`get_or_create_chemical`, by their ChEBI identifiers
         self.chebi_id_to_chemical = {}
-        self.chebi_id_to_inchi = {}
+
+        #: A cache of the JSON of single lookups served by :mod:`bio2bel_chebi.api`, emptied when populating
+        self.json_cache = LRUCache(JSON_CACHE_SIZE)
+
+        self.lookup_path = lookup_path or get_lookup_path(connection)
+        self._lookup = None
+
+        #: The codecs the columns of the chemical table were compressed with when populating, by column. Getting
+        #: them registers their dictionaries, so the compressed values can be decoded. Databases built before
+        #: compression was added don't have the table, and read-only ones can't get it.
+        self.codecs = {}
+        if Compression.__tablename__ in inspect(self.engine).get_table_names():
+            self.codecs.update(
+                (compression.column, TextCodec(compression.codec, level=compression.level,
+                                               dictionary=compression.dictionary))
+                for compression in self.session.query(Compression)
+            )
+
+    @property
+    def lookup(self) -> Optional[LookupStore]:
+        """The lookup store of the database, or None if it hasn't been built or was built by an older version."""
+        if self._lookup is None and self.lookup_path is not None and os.path.exists(self.lookup_path):
+            lookup = LookupStore(self.lookup_path)
+            if lookup.version != SCHEMA_VERSION:
+                log.warning('ignoring outdated lookup store at %s. Rebuild it with build-lookup', self.lookup_path)
+                lookup.close()
+                return
+            self._lookup = lookup
+        return self._lookup
+
+    def build_lookup(self) -> LookupStore:
+        """Build the lookup store from the database, replacing the previous one."""
+        if self.lookup_path is None:
+            raise ValueError('can not build a lookup store for an in-memory database')
+
+        if self._lookup is not None:
+            self._lookup.close()
+        self._lookup = LookupStore.build(self, self.lookup_path)
+        return self._lookup
+
+    def create_all(self, check_first: bool = True) -> None:
+        """Create the tables that don't exist yet, unless the database is read-only."""
+        if not self.read_only:
+            super().create_all(check_first=check_first)
+
+    def drop_all(self, check_first: bool = True) -> None:
+        """Drop all tables from the database and remove the lookup store built from them."""
+        if self._lookup is not None:
+            self._lookup.close()
+            self._lookup = None
+        if self.lookup_path is not None and os.path.exists(self.lookup_path):
+            os.remove(self.lookup_path)
+
+        super().drop_all(check_first=check_first)
 
     def is_populated(self) -> bool:
         """Check if the database is already populated."""
         return 0 < self.count_chemicals()
 
+    def _get_total(self, key: str, query) -> int:
+        """Get a count from the statistics table, or run the query to count it if the table wasn't filled."""
+        count = self.session.query(Statistic.count).filter(Statistic.category == TOTAL, Statistic.key == key).scalar()
+        if count is None:
+            return query.count()
+        return count
+
     def count_chemicals(self) -> int:
         """Count the number of chemicals stored."""
-        return self.session.query(Chemical).count()
+        return self._get_total('chemicals', self.session.query(Chemical))
 
     def count_parent_chemicals(self) -> int:
         """Count the number of parent chemicals stored."""
-        return self.session.query(Chemical).filter(Chemical.parent_id.is_(None)).count()
+        return self._get_total('parent_chemicals', self.session.query(Chemical).filter(Chemical.parent_id.is_(None)))
 
     def count_child_chemicals(self) -> int:
         """Count the number of child chemicals stored."""
-        return self.session.query(Chemical).filter(Chemical.parent_id.isnot(None)).count()
+        return self._get_total('child_chemicals', self.session.query(Chemical).filter(Chemical.parent_id.isnot(None)))
 
     def count_xrefs(self) -> int:
         """Count the number of cross-references stored."""
-        return self.session.query(Accession).count()
+        return self._get_total('xrefs', self.session.query(Accession))
 
     def count_synonyms(self) -> int:
         """Count the number of synonyms stored."""
-        return self.session.query(Synonym).count()
+        return self._get_total('synonyms', self.session.query(Synonym))
 
     def count_inchis(self) -> int:
         """Count the number of inchis stored."""
-        return self.session.query(Chemical).filter(Chemical.inchi.isnot(None)).count()
+        return self._get_total('inchis', self.session.query(Chemical).filter(Chemical.inchi.isnot(None)))
 
     def count_relations(self) -> int:
         """Count the relations in the database."""
-        return self._count_model(Relation)
+        return self._get_total('relations', self._get_query(Relation))
 
     def list_relations(self) -> List[Relation]:
         """List the relations in the database."""
         return self.session.query(Relation).all()
 
-    def summarize(self) -> Mapping[str, int]:
-        """Return a summary dictionary over the content of the database."""
-        return dict(
-            chemicals=self.count_chemicals(),
-            xrefs=self.count_xrefs(),
-            relations=self.count_relations(),
-            synonyms=self.count_synonyms(),
-        )
+    def summarize(self, detailed: bool = False) -> Mapping[str, Union[int, Mapping[str, int]]]:
+        """Return a summary dictionary over the content of the database.
+
+        The counts are read from the statistics table that's filled when populating, so this is instant.
+
+        :param detailed: Also include the counts of parent and child chemicals and InChIs, and the breakdowns
+         from :data:`bio2bel_chebi.statistics.STATISTIC_BREAKDOWNS`, like ``synonym_type``, as dictionaries from
+         the values to their counts
+        """
+        if not detailed:
+            return dict(
+                chemicals=self.count_chemicals(),
+                xrefs=self.count_xrefs(),
+                relations=self.count_relations(),
+                synonyms=self.count_synonyms(),
+            )
+
+        return summarize_statistics(self.get_statistics(), detailed=True)
+
+    def get_statistics(self) -> Mapping[str, Mapping[str, int]]:
+        """Get the counts from the statistics table, by their categories.
+
+        If the statistics table wasn't filled, like for a database populated by an older version, the counts are
+        made with :meth:`count_statistics` instead.
+        """
+        return get_statistics(self.session) or self.count_statistics()
+
+    def count_statistics(self) -> Mapping[str, Mapping[str, int]]:
+        """Count the contents of the database, by the categories of the statistics table.
+
+        The chemicals are counted in a single scan and each breakdown with a single ``GROUP BY``. Missing values
+        aren't counted in the breakdowns.
+        """
+        chemicals, child_chemicals, inchis = self.session.query(
+            func.count(Chemical.id),
+            func.count(Chemical.parent_id),
+            func.count(Chemical.inchi),
+        ).one()
+
+        rv = {
+            TOTAL: dict(
+                chemicals=chemicals,
+                parent_chemicals=chemicals - child_chemicals,
+                child_chemicals=child_chemicals,
+                inchis=inchis,
+                synonyms=self.session.query(func.count(Synonym.id)).scalar(),
+                xrefs=self.session.query(func.count(Accession.id)).scalar(),
+                relations=self.session.query(func.count(Relation.id)).scalar(),
+            ),
+        }
+
+        for category, column in STATISTIC_BREAKDOWNS.items():
+            query = self.session.query(column, func.count()).filter(column.isnot(None)).group_by(column)
+            rv[category] = {
+                str(value): count
+                for value, count in query
+            }
+
+        return rv
+
+    def update_statistics(self) -> Mapping[str, Mapping[str, int]]:
+        """Count the contents of the database with :meth:`count_statistics` and replace the statistics table.
+
+        This is done when populating. Call it again after changing the database in other ways.
+        """
+        statistics = self.count_statistics()
+
+        self.session.query(Statistic).delete()
+        self.session.execute(Statistic.__table__.insert(), [
+            dict(category=category, key=key, count=count)
+            for category, counts in statistics.items()
+            for key, count in counts.items()
+        ])
+        self.session.commit()
+
+        return statistics
+
+    def get_release(self) -> Optional[str]:
+        """Get the number of the ChEBI release in the database, if it was recorded when populating."""
+        release = self.session.query(Release).order_by(Release.loaded_on.desc()).first()
+        if release is not None:
+            return release.release
 
     def get_or_create_chemical(self, chebi_id: str, **kwargs) -> Chemical:
         """Get a chemical from the database by ChEBI."""
@@ -119,7 +340,21 @@ class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
         return chemical
 
     def get_chemical_by_chebi_id(self, chebi_id: str) -> Optional[Chemical]:
-        """Get a chemical from the database."""
+        """Get a chemical from the database.
+
+        If the lookup store is built, the chemical and its parent are loaded by primary key, which doesn't query
+        the database if they're already in the session.
+        """
+        lookup = self.lookup
+        if lookup is not None:
+            primary_keys = lookup.get_primary_keys(chebi_id)
+            if primary_keys is not None:
+                chemical = self.session.query(Chemical).get(primary_keys[0])
+                if chemical is not None and chemical.chebi_id == chebi_id:
+                    return chemical.parent or chemical
+                log.warning('lookup store at %s is out of date. Rebuild it with build-lookup', self.lookup_path)
+            # otherwise, the chemical might have been added after the lookup store was built
+
         chemical = self.session.query(Chemical).filter(Chemical.chebi_id == chebi_id).one_or_none()
 
         if not chemical:
@@ -131,151 +366,567 @@ class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
         return chemical
 
     def get_chemical_by_chebi_name(self, name: str) -> Optional[Chemical]:
-        """Get a chemical from the database."""
-        return self.session.query(Chemical).filter(Chemical.name == name).one_or_none()
+        """Get the best chemical with the name, or with it as a synonym, from :meth:`get_chebi_ids_by_name`."""
+        chebi_ids = self.get_chebi_ids_by_name(name)
+        if chebi_ids:
+            return self.session.query(Chemical).filter(Chemical.chebi_id == chebi_ids[0]).one_or_none()
+
+    def get_chebi_ids_by_name(self, name: str) -> List[str]:
+        """Get the ChEBI identifiers of all chemicals with the name or with it as a synonym, best first.
+
+        See :func:`bio2bel_chebi.lookup.get_ranked_names` for the ranking.
+        """
+        return self.get_chebi_ids_by_names([name]).get(name, [])
+
+    def get_chebi_ids_by_names(self, names: Iterable[str]) -> Mapping[str, List[str]]:
+        """Get a dictionary from names to the ChEBI identifiers of all chemicals with them, best first.
+
+        Names are matched against both the names and the synonyms of the chemicals, and ranked with
+        :func:`bio2bel_chebi.lookup.get_ranked_names`. If the lookup store is built, they're looked up there.
+        Unlike identifiers, names missing from the store aren't looked up in the database, whose synonyms aren't
+        indexed. Names that aren't found are omitted.
+        """
+        if self.lookup is not None:
+            return self.lookup.get_chebi_ids_by_names(names)
+
+        query = get_ranked_names(names=True)
+        rv = defaultdict(list)
+        for chunk in iter_chunks(set(names)):
+            for name, _, _, chebi_id in self.session.execute(query, {'names': chunk}):
+                rv[name].append(chebi_id)
+        return dict(rv)
+
+    def get_chemicals_by_chebi_ids(
+            self,
+            chebi_ids: Iterable[str],
+            collapse_parents: bool = True,
+    ) -> Mapping[str, Chemical]:
+        """Get a dictionary from ChEBI identifiers to chemicals with a single query per chunk of identifiers.
+
+        Identifiers that aren't in the database are omitted.
+
+        :param chebi_ids: ChEBI identifiers
+        :param collapse_parents: Like :meth:`get_chemical_by_chebi_id`, resolve secondary identifiers to their
+         parent chemical
+        """
+        rv = {}
+        for chunk in iter_chunks(set(chebi_ids)):
+            query = self.session.query(Chemical).filter(Chemical.chebi_id.in_(chunk))
+            if collapse_parents:
+                query = query.options(joinedload(Chemical.parent))
+            for chemical in query:
+                rv[chemical.chebi_id] = (chemical.parent or chemical) if collapse_parents else chemical
+        return rv
+
+    def get_chemicals_by_chebi_names(self, names: Iterable[str]) -> Mapping[str, Chemical]:
+        """Get a dictionary from names to the best chemicals with them, like :meth:`get_chemical_by_chebi_name`.
+
+        The names are looked up in bulk with :meth:`get_chebi_ids_by_names`. Names that aren't found are omitted.
+        """
+        name_to_chebi_id = {
+            name: chebi_ids[0]
+            for name, chebi_ids in self.get_chebi_ids_by_names(names).items()
+        }
+        chemicals = self.get_chemicals_by_chebi_ids(name_to_chebi_id.values(), collapse_parents=False)
+        return {
+            name: chemicals[chebi_id]
+            for name, chebi_id in name_to_chebi_id.items()
+            if chebi_id in chemicals
+        }
+
+    def get_chemicals_by_xref(self, accession: str, source: Optional[str] = None) -> List[Chemical]:
+        """Get the chemicals with the given database cross-reference.
+
+        :param accession: The accession number in the external database
+        :param source: The source database (like ``KEGG COMPOUND``). If not given, matches any source.
+        """
+        query = self.session.query(Chemical).join(Accession).filter(Accession.accession == accession)
+
+        if source is not None:
+            query = query.filter(Accession.source == source)
+
+        return query.all()
+
+    def get_chemicals_by_accessions(
+            self,
+            accessions: Iterable[str],
+            source: Optional[str] = None,
+    ) -> Mapping[str, List[Chemical]]:
+        """Get a dictionary from accession numbers to the chemicals cross-referencing them.
+
+        :param accessions: Accession numbers in the external database
+        :param source: The source database (like ``KEGG COMPOUND``). If not given, matches any source.
+        """
+        rv = defaultdict(list)
+        for chunk in iter_chunks(set(accessions)):
+            query = self.session.query(Accession.accession, Chemical).join(Chemical.accessions).filter(
+                Accession.accession.in_(chunk)
+            )
+
+            if source is not None:
+                query = query.filter(Accession.source == source)
+
+            for accession, chemical in query:
+                rv[accession].append(chemical)
+
+        return dict(rv)
+
+    def get_chemical_by_inchi(self, inchi: str) -> Optional[Chemical]:
+        """Get a chemical from the database by its InChI string, which may be stored compressed."""
+        codec = self.codecs.get('inchi')
+        if codec is None:
+            return self.session.query(Chemical).filter(Chemical.inchi == inchi).first()
+        return self.session.query(Chemical).filter(Chemical.inchi.in_([inchi, codec.encode(inchi)])).first()
+
+    def get_ancestors(self, chemical: Chemical, relation_type: str = 'is_a') -> List[Chemical]:
+        """Get all ancestors of the chemical in the ontology, nearest first.
+
+        :param chemical: A chemical
+        :param relation_type: The type of relation to follow. Defaults to ``is_a``.
+        """
+        return self._walk_relations(chemical, relation_type, Relation.target_id, Relation.source_id)
+
+    def get_descendants(self, chemical: Chemical, relation_type: str = 'is_a') -> List[Chemical]:
+        """Get all descendants of the chemical in the ontology, nearest first.
+
+        :param chemical: A chemical
+        :param relation_type: The type of relation to follow. Defaults to ``is_a``.
+        """
+        return self._walk_relations(chemical, relation_type, Relation.source_id, Relation.target_id)
+
+    def _walk_relations(self, chemical: Chemical, relation_type: str, from_column, to_column) -> List[Chemical]:
+        """Breadth-first search through the relations, querying each layer at once."""
+        seen = {chemical.id}
+        layer = [chemical.id]
+        rv = []
+
+        while layer:
+            next_layer = set()
+            for chunk in iter_chunks(layer):
+                query = self.session.query(to_column).filter(
+                    Relation.type == relation_type,
+                    from_column.in_(chunk),
+                )
+                next_layer.update(pk for pk, in query if pk not in seen)
+
+            if not next_layer:
+                break
+
+            seen.update(next_layer)
+            layer = sorted(next_layer)
+            for chunk in iter_chunks(layer):
+                rv.extend(self.session.query(Chemical).filter(Chemical.id.in_(chunk)).order_by(Chemical.id))
+
+        return rv
 
     def build_chebi_id_name_mapping(self) -> Mapping[str, str]:
-        """Build a mapping from ChEBI identifier to ChEBI name."""
+        """Build a mapping from ChEBI identifier to ChEBI name.
+
+        If the lookup store is built, a read-only mapping that looks names up in it is returned instead of
+        loading every chemical.
+        """
         # FIXME handle secondary id to correct name mappings, since the name isn't stored with the secondary id entry
+        if self.lookup is not None:
+            return self.lookup.chebi_id_to_name
+
         return dict(self.session.query(Chemical.chebi_id, Chemical.name).all())
 
     def build_chebi_name_id_mapping(self) -> Mapping[str, str]:
-        """Build a mapping from ChEBI name to ChEBI identifier."""
-        return dict(self.session.query(Chemical.name, Chemical.chebi_id).all())
+        """Build a mapping from ChEBI name to ChEBI identifier.
 
-    def _load_inchis(self, url: Optional[str] = None) -> None:
-        """Download and insert the InChI strings.
+        A name shared by several chemicals maps to the one with the lowest identifier, and the number of shared
+        names is logged. Use :meth:`get_chebi_ids_by_names` to get all of them.
+        """
+        query = self.session.query(Chemical.name, Chemical.chebi_id).filter(Chemical.name.isnot(None))
 
-        :param url: The URL (or file path) to download. Defaults to the ChEBI data.
+        rv = {}
+        ambiguous = set()
+        for name, chebi_id in query.order_by(Chemical.name, Chemical.id):
+            if name in rv:
+                ambiguous.add(name)
+            else:
+                rv[name] = chebi_id
+
+        if ambiguous:
+            log.warning('%d names are shared by several chemicals, like %s', len(ambiguous), min(ambiguous))
+
+        return rv
+
+    def get_reader(self, connection: Optional[str] = None, **kwargs) -> 'Manager':
+        """Build a read-only manager for serving lookups, e.g., from a read replica.
+
+        :param connection: The connection string of the reader. Defaults to this manager's database.
+        :param kwargs: Engine options passed to :class:`Manager`. Defaults to this manager's pool configuration.
+        """
+        engine_kwargs = dict(self._engine_kwargs)
+        engine_kwargs.update(kwargs)
+        engine_kwargs['read_only'] = True
+        if connection is None:
+            engine_kwargs.setdefault('lookup_path', self.lookup_path)
+        return type(self)(connection=connection or self._connection, **engine_kwargs)
+
+    def get_flask_admin_app(self, url: Optional[str] = None, secret_key: Optional[str] = None):
+        """Create a Flask-Admin application that also serves the JSON API from :mod:`bio2bel_chebi.api`.
+
+        The tables are shown with the keyset-paginated views from :mod:`bio2bel_chebi.admin`.
+
+        :param url: Optional mount point of the admin application. Defaults to ``'/'``.
+        :rtype: flask.Flask
+        """
+        from flask import Blueprint
+        from .api import register_api
+
+        app = super().get_flask_admin_app(url=url, secret_key=secret_key)
+        app.register_blueprint(Blueprint('bio2bel_chebi', __name__, template_folder='templates'))
+        register_api(app, self)
+
+        @app.teardown_appcontext
+        def remove_session(_):
+            """Give each request its own session by discarding the thread's session when the request ends."""
+            self.session.remove()
+
+        return app
+
+    def _iter_dfs(self, get_df, url: Optional[str], chunksize: Optional[int]):
+        """Iterate over the data frames of a flat file: the whole file at once, or bounded chunks of it.
+
+        Chunks are read and parsed in a background thread at most :data:`MAX_BUFFERED_CHUNKS` ahead of the
+        database writes, so memory use doesn't depend on the size of the file.
+
+        :param get_df: A function from :mod:`bio2bel_chebi.parser`
+        :param url: The URL (or file path) of the file. Defaults to the ChEBI data.
+        :param chunksize: The number of rows per chunk. If None, read the whole file.
+        :rtype: Iterable[pandas.DataFrame]
         """
-        df = get_inchis_df(url=url)
+        if chunksize is None:
+            return [get_df(url=url)]
+        return iter_prefetched(get_df(url=url, chunksize=chunksize), max_buffered=MAX_BUFFERED_CHUNKS)
 
-        for _, (chebi_id, inchi) in tqdm(df.iterrows(), desc='InChIs', total=len(df.index)):
-            self.chebi_id_to_inchi[str(chebi_id)] = inchi
+    def _load_inchis(
+            self,
+            url: Optional[str] = None,
+            chunksize: Optional[int] = None,
+            compression: Optional[str] = None,
+            compression_level: Optional[int] = None,
+            validator=None,
+    ) -> None:
+        """Download the InChI strings and add them to the chemicals.
 
-    def _populate_compounds(self, url: Optional[str] = None) -> None:
+        :param url: The URL (or file path) to download. Defaults to the ChEBI data.
+        :param chunksize: The number of rows to read at a time. If None, read the whole file.
+        :param compression: The codec to compress the InChIs with. If None, store them plain.
+        :param compression_level: The compression level
+        :param Optional[bio2bel_chebi.parser.validation.Validator] validator: Drop the rows with problems found by
+         this validator. If None, load all rows.
+        """
+        from .parser.inchis import get_inchis_df
+
+        statement = Chemical.__table__.update().where(Chemical.id == bindparam('_id')).values(inchi=bindparam('_inchi'))
+
+        with tqdm(desc='InChIs', unit='row') as progress:
+            for df in self._iter_dfs(get_inchis_df, url, chunksize):
+                if validator is not None:
+                    df = validator.validate('inchis', df)
+                df = df[df['CHEBI_ID'].notna() & df['InChI'].notna()]
+                inchis = self._encode('inchi', df['InChI'], compression, compression_level)
+                records = [
+                    dict(_id=chebi_id, _inchi=inchi)
+                    for chebi_id, inchi in zip(df['CHEBI_ID'].astype('int64').tolist(), inchis)
+                ]
+                if records:
+                    self.session.execute(statement, records)
+                progress.update(len(df.index))
+
+        self._commit('InChIs')
+
+    def _populate_compounds(
+            self,
+            url: Optional[str] = None,
+            chunksize: Optional[int] = None,
+            compression: Optional[str] = None,
+            compression_level: Optional[int] = None,
+            validator=None,
+    ) -> None:
         """Download and populate the compounds.
 
+        ChEBI already sends out their data in relational format, so the compound identifiers are used as the
+        primary keys of the chemicals and the parent identifiers as their foreign keys.
+
         :param url: The URL (or file path) to download. Defaults to the ChEBI data.
+        :param chunksize: The number of rows to read at a time. If None, read the whole file.
+        :param compression: The codec to compress the definitions with. If None, store them plain.
+        :param compression_level: The compression level
+        :param Optional[bio2bel_chebi.parser.validation.Validator] validator: Drop the rows with problems found by
+         this validator. If None, load all rows.
         """
-        df = get_compounds_df(url=url)
-        df = df.where((pd.notnull(df)), None)
-
-        log.info('preparing Compounds')
-
-        parents = []
-        it = tqdm(df.iterrows(), desc='Compounds', total=len(df.index))
-        for _, (pk, status, chebi_id, source, parent_pk, name, definition, _, _, _) in it:
-            chebi_id = chebi_id.split(':')[1]
-
-            chemical = self.id_chemical[pk] = self.chebi_id_to_chemical[chebi_id] = Chemical(
-                id=pk,  # ChEBI already sends out their data in relational format
-                status=status,
-                chebi_id=chebi_id,
-                parent_id=parent_pk or None,
-                name=name,
-                source=source,
-                definition=definition,
-                inchi=self.chebi_id_to_inchi.get(chebi_id)
-            )
-            self.session.add(chemical)
+        from .parser.compounds import get_compounds_df
 
-            if parent_pk:
-                parents.append((pk, parent_pk))
+        with tqdm(desc='Compounds', unit='row') as progress:
+            for df in self._iter_dfs(get_compounds_df, url, chunksize):
+                if validator is not None:
+                    df = validator.validate('compounds', df)
+                df = df[df['ID'].notna()]
+                df = df.assign(CHEBI_ACCESSION=df['CHEBI_ACCESSION'].str.split(':', n=1).str[1])
+                df = df[['ID', 'STATUS', 'CHEBI_ACCESSION', 'PARENT_ID', 'NAME', 'SOURCE', 'DEFINITION', 'STAR']]
+                df.columns = ['id', 'status', 'chebi_id', 'parent_id', 'name', 'source', 'definition', 'stars']
+                df = df.assign(definition=self._encode('definition', df['definition'], compression, compression_level))
 
-        for child_id, parent_pk in tqdm(parents, desc='Secondaries'):
-            child = self.chebi_id_to_chemical.get(child_id)
-            parent = self.chebi_id_to_chemical.get(parent_pk)
+                self._insert_df(Chemical, df)
+                progress.update(len(df.index))
 
-            if child is not None and parent is not None:
-                child.parent = parent
+        self._commit('Compounds')
 
-        log.info('committing Compounds')
-        self.session.commit()
+    def _encode(self, column: str, values, compression: Optional[str], compression_level: Optional[int]) -> List:
+        """Compress the values of a column of the chemical table.
 
-    def _populate_names(self, url: Optional[str] = None) -> None:
-        """Download and insert the synonyms.
+        The first time a column is compressed, its codec's dictionary is trained on the values and stored.
 
-        :param url: The URL (or file path) to download. Defaults to the ChEBI data.
+        :param column: The name of the column
+        :param pandas.Series values: The values
+        :param compression: The codec. If None, the values are left plain.
+        :param compression_level: The compression level
         """
-        df = get_names_df(url=url)
+        values = values.astype(object).where(values.notna(), None).tolist()
+        if compression is None:
+            return values
 
-        log.info('preparing Synonyms')
-        grouped_df = df.groupby('COMPOUND_ID')
-        for chebi_id, sub_df in tqdm(grouped_df, desc='Synonyms', total=len(grouped_df)):
-            chebi_id = str(int(chebi_id))
-            chemical = self.get_or_create_chemical(chebi_id=chebi_id)
+        codec = self.codecs.get(column)
+        if codec is None:
+            dictionary = train_dictionary([value for value in values if value is not None], compression)
+            codec = self.codecs[column] = TextCodec(compression, level=compression_level, dictionary=dictionary)
+            self.session.add(Compression(column=column, codec=codec.codec, level=codec.level, dictionary=dictionary))
+            log.info('compressing the %s column with %r', column, codec)
 
-            for _, (pk, _, type_, source, name, adapted, language) in sub_df.iterrows():
+        return codec.encode_all(values)
 
-                if isinstance(name, float) or not name:
-                    continue
+    def _get_chemical_ids(self, compound_ids):
+        """Get the primary keys of the chemicals of ChEBI compound identifiers, which are the same.
 
-                synonym = Synonym(
-                    id=pk,
-                    chemical=chemical,
-                    type=type_,
-                    source=source,
-                    name=name,
-                    language=language
-                )
-                self.session.add(synonym)
+        Compounds that aren't in the database yet get placeholder chemicals, inserted in bulk. Only the distinct
+        identifiers are looked up, by primary key, so this works in bounded memory and with indexes deferred.
 
-        log.info('committing Synonyms')
-        self.session.commit()
+        :param pandas.Series compound_ids: A series of ChEBI compound identifiers, without missing values
+        :rtype: pandas.Series
+        """
+        chemical_ids = compound_ids.astype('int64')
 
-    def _populate_accession(self, url: Optional[str] = None) -> None:
+        missing = set(chemical_ids.unique().tolist()).difference(self._get_existing_chemical_ids(chemical_ids))
+        if missing:
+            log.info('creating %d placeholder chemicals', len(missing))
+            self.session.execute(Chemical.__table__.insert(), [
+                dict(id=chemical_id, chebi_id=str(chemical_id))
+                for chemical_id in sorted(missing)
+            ])
+
+        return chemical_ids
+
+    def _get_existing_chemical_ids(self, chemical_ids) -> Set[int]:
+        """Get the identifiers that are in the chemical table.
+
+        :param pandas.Series chemical_ids: A series of chemical primary keys, without missing values
+        """
+        query = self.session.query(Chemical.id).filter(Chemical.id.in_(bindparam('ids', expanding=True)))
+        return {
+            chemical_id
+            for chunk in iter_chunks(chemical_ids.unique().tolist())
+            for chemical_id, in query.params(ids=chunk)
+        }
+
+    def _insert_df(self, model, df, batch_size: int = 50000) -> None:
+        """Insert the rows of the data frame, whose columns are named after the model's, in batches."""
+        table = model.__table__
+        for start in range(0, len(df.index), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            batch = batch.astype(object).where(batch.notna(), None)
+            self.session.execute(table.insert(), batch.to_dict('records'))
+
+    def _populate_names(
+            self,
+            url: Optional[str] = None,
+            chunksize: Optional[int] = None,
+            validator=None,
+    ) -> None:
+        """Download and insert the synonyms.
+
+        :param url: The URL (or file path) to download. Defaults to the ChEBI data.
+        :param chunksize: The number of rows to read at a time. If None, read the whole file.
+        :param Optional[bio2bel_chebi.parser.validation.Validator] validator: Drop the rows with problems found by
+         this validator. If None, load all rows.
+        """
+        from .parser.names import get_names_df
+
+        with tqdm(desc='Synonyms', unit='row') as progress:
+            for df in self._iter_dfs(get_names_df, url, chunksize):
+                if validator is not None:
+                    df = validator.validate('names', df)
+                progress.update(len(df.index))
+                df = df[df['COMPOUND_ID'].notna() & df['NAME'].notna() & (df['NAME'] != '')]
+                df = df.assign(chemical_id=self._get_chemical_ids(df['COMPOUND_ID']))
+                df = df[['ID', 'chemical_id', 'TYPE', 'SOURCE', 'NAME', 'LANGUAGE']]
+                df.columns = ['id', 'chemical_id', 'type', 'source', 'name', 'language']
+
+                self._insert_df(Synonym, df)
+
+        self._commit('Synonyms')
+
+    def _populate_accession(
+            self,
+            url: Optional[str] = None,
+            chunksize: Optional[int] = None,
+            validator=None,
+    ) -> None:
         """Download and inserts the database cross references and accession numbers
 
         :param url: The URL (or file path) to download. Defaults to the ChEBI data.
+        :param chunksize: The number of rows to read at a time. If None, read the whole file.
+        :param Optional[bio2bel_chebi.parser.validation.Validator] validator: Drop the rows with problems found by
+         this validator. If None, load all rows.
         """
-        df = get_accession_df(url=url)
-        df = df.where((pd.notnull(df)), None)
-
-        log.info('preparing Accessions')
-
-        grouped_df = df.groupby('COMPOUND_ID')
-        for chebi_id, sub_df in tqdm(grouped_df, desc='Xrefs', total=len(grouped_df)):
-            chebi_id = str(int(chebi_id))
-            chemical = self.get_or_create_chemical(chebi_id=chebi_id)
-            for _, (pk, _, source, type_, accession) in sub_df.iterrows():
-                acc = Accession(
-                    id=pk,
-                    chemical=chemical,
-                    source=source,
-                    type=type_,
-                    accession=accession
-                )
-                self.session.add(acc)
+        from .parser.accession import get_accession_df
 
-        log.info('committing Accessions')
-        self.session.commit()
+        with tqdm(desc='Xrefs', unit='row') as progress:
+            for df in self._iter_dfs(get_accession_df, url, chunksize):
+                if validator is not None:
+                    df = validator.validate('accessions', df)
+                progress.update(len(df.index))
+                df = df[df['COMPOUND_ID'].notna()]
+                df = df.assign(chemical_id=self._get_chemical_ids(df['COMPOUND_ID']))
+                df = df[['ID', 'chemical_id', 'SOURCE', 'TYPE', 'ACCESSION_NUMBER']]
+                df.columns = ['id', 'chemical_id', 'source', 'type', 'accession']
 
-    def _populate_relations(self, url: Optional[str] = None) -> None:
-        df = get_relations_df(url=url)
-        for _, (pk, relation_type, source_id, target_id, status) in tqdm(df.iterrows(), total=len(df.index)):
+                self._insert_df(Accession, df)
 
-            source = self.id_chemical.get(f'CHEBI:{source_id}')
+        self._commit('Accessions')
 
-            if source is None:
-                continue
+    def _populate_relations(
+            self,
+            url: Optional[str] = None,
+            chunksize: Optional[int] = None,
+            validator=None,
+    ) -> None:
+        """Download and insert the relations between chemicals.
 
-            target = self.id_chemical.get(f'CHEBI:{target_id}')
+        Relations whose source or target isn't in the chemical table, or that are missing a type or status,
+        are dropped and counted in the log.
 
-            if target is None:
-                continue
+        :param url: The URL (or file path) to download. Defaults to the ChEBI data.
+        :param chunksize: The number of rows to read at a time. If None, read the whole file.
+        :param Optional[bio2bel_chebi.parser.validation.Validator] validator: Drop the rows with problems found by
+         this validator. If None, load all rows.
+        """
+        import pandas as pd
+
+        from .parser.relation import get_relations_df
 
-            relation = Relation(
-                id=pk,
-                type=relation_type,
-                source=source,
-                target=target,
-                status=status,
+        total = no_source = no_target = no_fields = dropped = 0
+
+        with tqdm(desc='Relations', unit='row') as progress:
+            for df in self._iter_dfs(get_relations_df, url, chunksize):
+                if validator is not None:
+                    df = validator.validate('relations', df)
+                progress.update(len(df.index))
+
+                chemical_ids = self._get_existing_chemical_ids(
+                    pd.concat([df['INIT_ID'].dropna(), df['FINAL_ID'].dropna()]).astype('int64'),
+                )
+                has_source = df['INIT_ID'].isin(chemical_ids)
+                has_target = df['FINAL_ID'].isin(chemical_ids)
+                has_fields = df['TYPE'].notna() & df['STATUS'].notna()
+                valid = has_source & has_target & has_fields
+
+                total += len(df.index)
+                no_source += (~has_source).sum()
+                no_target += (~has_target).sum()
+                no_fields += (~has_fields).sum()
+                dropped += (~valid).sum()
+
+                df = df.loc[valid, ['ID', 'TYPE', 'INIT_ID', 'FINAL_ID', 'STATUS']]
+                df.columns = ['id', 'type', 'source_id', 'target_id', 'status']
+
+                self._insert_df(Relation, df)
+
+        if dropped:
+            log.warning(
+                'dropping %d of %d relations: %d with unknown source, %d with unknown target, %d missing type/status',
+                dropped, total, no_source, no_target, no_fields,
             )
-            self.session.add(relation)
 
-        log.info('committing Relations')
-        self.session.commit()
+        self._commit('Relations')
+
+    def _commit(self, desc: str) -> None:
+        """Commit the session after loading a table, unless the whole fast load is a single transaction."""
+        if self._fast_loading:
+            log.info('flushing %s', desc)
+            self.session.flush()
+        else:
+            log.info('committing %s', desc)
+            self.session.commit()
+
+    @contextmanager
+    def _fast_load(self):
+        """Build a fresh SQLite database without journaling, synchronous writes, or secondary indexes.
+
+        The indexes are recreated and the tables analyzed after a successful load.
+        """
+        if not is_sqlite(self._connection):
+            log.warning('fast load is only implemented for SQLite')
+            yield
+            return
+
+        indexes = [
+            index
+            for table in self._metadata.sorted_tables
+            for index in table.indexes
+        ]
+
+        # release the connection the session already holds (e.g., from checking if the database is populated),
+        # so the load runs on a new connection that gets the pragmas
+        self.session.close()
+        self.engine.dispose()
+        event.listen(self.engine, 'connect', set_sqlite_fast_load_pragmas)
+        self._fast_loading = True
+
+        log.info('dropping %d indexes', len(indexes))
+        self._drop_indexes(indexes)
+
+        try:
+            yield
+            self.session.commit()
+        finally:
+            self._fast_loading = False
+            self.session.close()
+            event.remove(self.engine, 'connect', set_sqlite_fast_load_pragmas)
+            self.engine.dispose()
+
+            # also after a failed load, which is rolled back, so the next load doesn't start without indexes
+            log.info('recreating %d indexes', len(indexes))
+            self._create_indexes(indexes)
+
+        log.info('analyzing')
+        self.engine.execute('ANALYZE')
+
+    def _get_index_names(self, indexes) -> Set[str]:
+        """Get the names of the indexes on the tables of the given indexes that exist in the database."""
+        inspector = inspect(self.engine)
+        return {
+            index['name']
+            for table_name in {index.table.name for index in indexes}
+            for index in inspector.get_indexes(table_name)
+        }
+
+    def _drop_indexes(self, indexes) -> None:
+        """Drop the indexes that exist in the database."""
+        existing = self._get_index_names(indexes)
+        for index in indexes:
+            if index.name in existing:
+                index.drop(bind=self.engine)
+
+    def _create_indexes(self, indexes) -> None:
+        """Create the indexes that don't exist in the database."""
+        existing = self._get_index_names(indexes)
+        for index in indexes:
+            if index.name not in existing:
+                index.create(bind=self.engine)
 
     def populate(
             self,
@@ -284,23 +935,127 @@ class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
             relations_url: Optional[str] = None,
             names_url: Optional[str] = None,
             accessions_url: Optional[str] = None,
+            fast: bool = False,
+            release: Optional[str] = None,
+            chunksize: Optional[int] = None,
+            compression: Optional[str] = None,
+            compression_level: Optional[int] = None,
+            validate: bool = False,
+            strict: bool = False,
+            validation=None,
     ) -> None:
-        """Populate all tables."""
+        """Populate all tables.
+
+        :param fast: Build the database in a single transaction with SQLite's durability turned off and
+         secondary indexes deferred until the end. Only allowed when the database is empty.
+        :param release: The number of the ChEBI release the files come from, which is recorded in the database
+        :param chunksize: Read, transform, and insert the flat files this many rows at a time, so memory use
+         doesn't depend on their sizes. Use this for files that don't fit in memory. If None, each file is read
+         at once, which is faster for the ChEBI files and uses the parsed cache.
+        :param compression: Compress the InChIs and definitions with this codec from
+         :data:`bio2bel_chebi.compression.CODECS`, against dictionaries trained on the first chunk of each. They're
+         decoded transparently when they're read. Only for SQLite.
+        :param compression_level: The compression level. Defaults to the codec's entry in
+         :data:`bio2bel_chebi.compression.DEFAULT_LEVELS`.
+        :param validate: Validate the flat files with :func:`bio2bel_chebi.parser.validation.validate_release`
+         before writing anything, and skip the rows with problems. This reads each file one more time.
+        :param strict: Validate the flat files first and stop before writing anything if they have any errors. The
+         errors are logged and, like any other failure, bio2bel records a failed populate instead of raising the
+         :class:`bio2bel_chebi.parser.validation.ValidationError`. To handle the errors, call
+         :func:`bio2bel_chebi.parser.validation.validate_release` first and pass its result as ``validation``.
+        :param Optional[bio2bel_chebi.parser.validation.Validator] validation: The result of
+         :func:`bio2bel_chebi.parser.validation.validate_release` on the same flat files, which is used instead of
+         reading them again. Implies ``validate``.
+        """
+        if fast and self.is_populated():
+            log.error('fast load can only be used to build a fresh database')
+            raise ValueError('fast load can only be used to build a fresh database')
+
+        if compression is not None:
+            if compression not in CODECS:
+                raise ValueError(f'invalid compression: {compression}. Use one of {CODECS}')
+            if not is_sqlite(self._connection):
+                raise ValueError('compression is only implemented for SQLite')
+
         t = time.time()
 
-        self._load_inchis(url=inchis_url)
-        self._populate_compounds(url=compounds_url)
-        # self._populate_relations(url=relations_url)
-        # self._populate_names(url=names_url)
-        # self._populate_accession(url=accessions_url)
+        validator = None
+        if validate or strict or validation is not None:
+            from .parser.validation import Validator, validate_release
+
+            if validation is None:
+                validation = validate_release(
+                    inchis_url=inchis_url,
+                    compounds_url=compounds_url,
+                    relations_url=relations_url,
+                    names_url=names_url,
+                    accessions_url=accessions_url,
+                    chunksize=chunksize,
+                )
+                log.info('validated in %.2f seconds', time.time() - t)
+
+            if strict and validation.report.errors:
+                log.error('not populating because the flat files have errors\n%s', validation.report)
+                validation.report.raise_for_errors()
+
+            validator = Validator(compound_ids=validation.compound_ids)
+
+        if fast:
+            with self._fast_load():
+                self._populate_tables(
+                    inchis_url, compounds_url, relations_url, names_url, accessions_url, release, chunksize,
+                    compression, compression_level, validator,
+                )
+        else:
+            self._populate_tables(
+                inchis_url, compounds_url, relations_url, names_url, accessions_url, release, chunksize,
+                compression, compression_level, validator,
+            )
+
+        self.update_statistics()
+
+        if self.lookup_path is not None:
+            self.build_lookup()
+
+        self.json_cache.clear()
 
         log.info('populated in %.2f seconds', time.time() - t)
 
+    def _populate_tables(
+            self, inchis_url, compounds_url, relations_url, names_url, accessions_url, release, chunksize,
+            compression, compression_level, validator,
+    ) -> None:
+        self._populate_compounds(
+            url=compounds_url, chunksize=chunksize, compression=compression, compression_level=compression_level,
+            validator=validator,
+        )
+        self._load_inchis(
+            url=inchis_url, chunksize=chunksize, compression=compression, compression_level=compression_level,
+            validator=validator,
+        )
+        self._populate_relations(url=relations_url, chunksize=chunksize, validator=validator)
+        self._populate_names(url=names_url, chunksize=chunksize, validator=validator)
+        self._populate_accession(url=accessions_url, chunksize=chunksize, validator=validator)
+
+        if release is not None:
+            self._store_release(release)
+
+    def _store_release(self, release: str) -> None:
+        """Record the release, or update when it was loaded if it's already recorded."""
+        model = self.session.query(Release).filter(Release.release == release).one_or_none()
+        if model is None:
+            self.session.add(Release(release=release))
+        else:
+            model.loaded_on = datetime.datetime.utcnow()
+        self._commit('release')
+
     def normalize_chemicals(self, graph: BELGraph, use_tqdm: bool = False) -> None:
         mapping = {
             node: chemical.to_bel()
             for node, chemical in list(self.iter_chemicals(graph, use_tqdm=use_tqdm))
         }
+        from networkx import relabel_nodes
+
         relabel_nodes(graph, mapping, copy=False)
 
     def iter_chemicals(self, graph: BELGraph, use_tqdm: bool = False) -> Iterable[Tuple[BaseEntity, Chemical]]:
@@ -338,18 +1093,230 @@ class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
 
         log.warning('Could not find ChEBI node: %r', node)
 
-    def enrich_chemical_hierarchy(self, graph: BELGraph) -> None:
-        """Enrich the parents for all ChEBI chemicals in the graph."""
-        for _, data in graph.nodes(data=True):
-            chemical = self.get_chemical_from_data(data)
+    def get_chemicals_from_nodes(
+            self,
+            nodes: Iterable[BaseEntity],
+            collapse_parents: bool = True,
+    ) -> Mapping[BaseEntity, Chemical]:
+        """Get a dictionary from the ChEBI nodes to their chemicals with a single query per chunk of nodes.
+
+        Nodes are looked up like :meth:`get_chemical_from_data`. Nodes that aren't ChEBI nodes or that aren't in
+        the database are omitted.
+
+        :param nodes: BEL nodes, like the nodes of a graph
+        :param collapse_parents: Resolve secondary identifiers to their parent chemical
+        """
+        references = _get_references(nodes)
+        chemicals = {
+            'id': self.get_chemicals_by_chebi_ids(
+                (value for key, value in references.values() if key == 'id'),
+                collapse_parents=collapse_parents,
+            ),
+            'name': self.get_chemicals_by_chebi_names(value for key, value in references.values() if key == 'name'),
+        }
 
+        rv = {}
+        for node, (key, value) in references.items():
+            chemical = chemicals[key].get(value)
             if chemical is None:
+                log.warning('Could not find ChEBI node: %r', node)
+                continue
+            rv[node] = chemical
+        return rv
+
+    def enrich_chemical_hierarchy(
+            self,
+            graph: BELGraph,
+            include_parents: bool = True,
+    ) -> None:
+        """Enrich the ancestries of all ChEBI chemicals in the graph with ``is_a`` edges.
+
+        Secondary chemicals are connected to their parents and all chemicals to their ``is_a`` ancestors. Other ChEBI
+        relations, like ``has_role``, aren't followed because they aren't ``is_a`` relations in BEL. The
+        ancestries are looked up once for all chemicals in the graph and their edges are added in one batch. See
+        :meth:`get_hierarchy_edges` for the options.
+        """
+        node_to_id = self._get_chemical_ids_from_nodes(graph)
+
+        # the graph might write a chemical differently, so its first edges start at the node from the graph instead
+        written_nodes = defaultdict(list)
+        for node, chemical_id in node_to_id.items():
+            written_nodes[chemical_id].append(node)
+
+        parents = self._get_hierarchy_parents(written_nodes, include_parents)
+        nodes = self._get_nodes(parents)
+        ancestor_ids = {parent_id for parent_ids in parents.values() for parent_id in parent_ids}
+
+        edges = []
+        for chemical_id, parent_ids in parents.items():
+            children = written_nodes.get(chemical_id, [])
+            if chemical_id in ancestor_ids or chemical_id not in written_nodes:
+                if nodes[chemical_id] not in children:
+                    children = children + [nodes[chemical_id]]
+
+            edges.extend(
+                (child, nodes[parent_id])
+                for child in children
+                for parent_id in parent_ids
+            )
+
+        # the edges are keyed like pybel does, so they're added at once without duplicating edges already there
+        data = {RELATION: IS_A}
+        graph.add_edges_from(
+            (child, parent, hash_edge(child, parent, data), data)
+            for child, parent in edges
+        )
+
+    def get_node_hierarchy_edges(
+            self,
+            node_to_chemical: Mapping[BaseEntity, Chemical],
+            include_parents: bool = True,
+    ) -> Mapping[BaseEntity, List[Tuple[BaseEntity, BaseEntity]]]:
+        """Get a dictionary from BEL nodes to the ``is_a`` edges of the ancestries of their chemicals.
+
+        Chemicals shared by several nodes are only looked up once. See :meth:`get_hierarchy_edges` for the options.
+
+        :param node_to_chemical: A dictionary from BEL nodes to their chemicals, without collapsing parents, like
+         from :meth:`get_chemicals_from_nodes`
+        """
+        hierarchy = self.get_hierarchy_edges(
+            node_to_chemical.values(),
+            include_parents=include_parents,
+        )
+
+        rv = {}
+        for node, chemical in node_to_chemical.items():
+            # the first edges of the hierarchy start at the chemical, which might be written differently in the graph
+            chemical_node = chemical.to_bel(collapse_parent=False)
+            rv[node] = [
+                (node if child == chemical_node else child, parent)
+                for child, parent in hierarchy[chemical.id]
+            ]
+        return rv
+
+    def get_hierarchy_edges(
+            self,
+            chemicals: Iterable[Chemical],
+            include_parents: bool = True,
+    ) -> Mapping[int, Tuple[Tuple[BaseEntity, BaseEntity], ...]]:
+        """Get a dictionary from the database identifiers of the chemicals to the ``is_a`` edges of their ancestries.
+
+        The ancestries are looked up with one query per layer, and the edges above each ancestor are only
+        collected once no matter how many of the chemicals share it. Nodes aren't collapsed to their parents, so the
+        first edges of a secondary chemical connect it to its parent.
+
+        :param chemicals: Chemicals
+        :param include_parents: Follow the chain from secondary chemicals to their parents
+        """
+        chemical_ids = {chemical.id for chemical in chemicals}
+        parents = self._get_hierarchy_parents(chemical_ids, include_parents)
+        nodes = self._get_nodes(parents)
+
+        memo = {}
+
+        def _get_edges(chemical_id: int) -> Tuple[Tuple[BaseEntity, BaseEntity], ...]:
+            rv = memo.get(chemical_id)
+            if rv is None:
+                memo[chemical_id] = ()  # guards against cycles
+                edges = {}
+                for parent_id in parents[chemical_id]:
+                    edges[nodes[chemical_id], nodes[parent_id]] = None
+                    edges.update(dict.fromkeys(_get_edges(parent_id)))
+                rv = memo[chemical_id] = tuple(edges)
+            return rv
+
+        return {
+            chemical_id: _get_edges(chemical_id)
+            for chemical_id in chemical_ids
+        }
+
+    def _get_chemical_ids_from_nodes(self, nodes: Iterable[BaseEntity]) -> Mapping[BaseEntity, int]:
+        """Get a dictionary from the ChEBI nodes to the database identifiers of their chemicals, without collapsing.
+
+        Like :meth:`get_chemicals_from_nodes` but only queries the identifiers, which is much faster for large graphs.
+        """
+        references = _get_references(nodes)
+
+        # names are grounded to the best of their ChEBI identifiers
+        name_to_chebi_id = {
+            name: chebi_ids[0]
+            for name, chebi_ids in self.get_chebi_ids_by_names(
+                value for key, value in references.values() if key == 'name'
+            ).items()
+        }
+        chebi_ids = {
+            node: value if key == 'id' else name_to_chebi_id.get(value)
+            for node, (key, value) in references.items()
+        }
+
+        query = self.session.query(Chemical.chebi_id, Chemical.id).filter(
+            Chemical.chebi_id.in_(bindparam('values', expanding=True)),
+        )
+        chemical_ids = {
+            chebi_id: chemical_id
+            for chunk in iter_chunks({chebi_id for chebi_id in chebi_ids.values() if chebi_id is not None})
+            for chebi_id, chemical_id in query.params(values=chunk)
+        }
+
+        rv = {}
+        for node, chebi_id in chebi_ids.items():
+            chemical_id = chemical_ids.get(chebi_id)
+            if chemical_id is None:
+                log.warning('Could not find ChEBI node: %r', node)
                 continue
+            rv[node] = chemical_id
+        return rv
 
-            parent = chemical.parent
-            while parent is not None:
-                graph.add_is_a(chemical.as_bel(), parent.as_bel())
-                chemical, parent = parent, parent.parent
+    def _get_hierarchy_parents(
+            self,
+            chemical_ids: Iterable[int],
+            include_parents: bool,
+    ) -> Mapping[int, List[int]]:
+        """Get a dictionary from the chemicals and all of their ancestors to their direct parents, layer by layer."""
+        # expanding parameters are much cheaper to build than one parameter per identifier
+        parents_query = self.session.query(Chemical.id, Chemical.parent_id).filter(
+            Chemical.id.in_(bindparam('ids', expanding=True)),
+            Chemical.parent_id.isnot(None),
+        )
+        relations_query = self.session.query(Relation.target_id, Relation.source_id).filter(
+            Relation.type == 'is_a',
+            Relation.target_id.in_(bindparam('ids', expanding=True)),
+        ).order_by(Relation.target_id, Relation.source_id)
+
+        rv = {}
+        layer = set(chemical_ids)
+
+        while layer:
+            for chunk in iter_chunks(sorted(layer)):
+                rv.update((chemical_id, []) for chemical_id in chunk)
+
+                if include_parents:
+                    for chemical_id, parent_id in parents_query.params(ids=chunk):
+                        rv[chemical_id].append(parent_id)
+
+                for target_id, source_id in relations_query.params(ids=chunk):
+                    if source_id not in rv[target_id]:
+                        rv[target_id].append(source_id)
+
+            layer = {
+                parent_id
+                for chemical_id in layer
+                for parent_id in rv[chemical_id]
+                if parent_id not in rv
+            }
+
+        return rv
+
+    def _get_nodes(self, chemical_ids: Iterable[int]) -> Mapping[int, BaseEntity]:
+        """Get a dictionary from database identifiers to BEL nodes, like :meth:`Chemical.to_bel` without collapsing."""
+        query = self.session.query(Chemical.id, Chemical.chebi_id, Chemical.name).filter(
+            Chemical.id.in_(bindparam('ids', expanding=True)),
+        )
+        return {
+            chemical_id: Abundance(namespace='chebi', name=name, identifier=chebi_id)
+            for chunk in iter_chunks(chemical_ids)
+            for chemical_id, chebi_id, name in query.params(ids=chunk)
+        }
 
     def _list_equivalencies(self) -> List[Chemical]:
         return self.session.query(Chemical).filter(Chemical.parent_id.isnot(None))
@@ -362,7 +1329,7 @@ class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
         """Export BEL."""
         graph = BELGraph(
             name=_chebi_bel_name,
-            version=_chebi_bel_version,
+            version=self.get_release() or _chebi_bel_version,
             description=_chebi_description,
         )
 
@@ -383,6 +1350,35 @@ class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
                 namespace=namespace,
             )
 
+    @classmethod
+    def get_cli(cls) -> click.Group:
+        """Get a :mod:`click` main function with the export, dump, annotate, releases, lookup, and validate commands."""
+        from .batch import add_cli_annotate
+        from .dump import add_cli_dump
+        from .export import add_cli_export
+        from .lookup import add_cli_build_lookup
+        from .parser.validation import add_cli_validate
+        from .releases import add_cli_releases
+
+        main = super().get_cli()
+        add_cli_export(main)
+        add_cli_dump(main)
+        add_cli_annotate(main)
+        add_cli_releases(main)
+        add_cli_build_lookup(main)
+        add_cli_validate(main)
+        return main
+
+    @staticmethod
+    def _cli_add_populate(main: click.Group) -> click.Group:
+        """Add the populate command with the fast load option."""
+        return add_cli_populate(main)
+
+    @staticmethod
+    def _cli_add_summarize(main: click.Group) -> click.Group:
+        """Add the summarize command with the detailed statistics."""
+        return add_cli_summarize(main)
+
     @staticmethod
     def _get_identifier(chemical: Chemical) -> str:
         """Get the identifier from the chemical model."""
@@ -392,3 +1388,85 @@ class Manager(AbstractManager, FlaskMixin, BELNamespaceManagerMixin):
     def _get_name(chemical: Chemical) -> str:
         """Get the name of the chemical."""
         return chemical.safe_name
+
+
+def _get_references(nodes: Iterable[BaseEntity]) -> Mapping[BaseEntity, Tuple[str, str]]:
+    """Get a dictionary from the ChEBI nodes to their references from :func:`get_chebi_reference`."""
+    rv = {}
+    for node in nodes:
+        reference = get_chebi_reference(node)
+        if reference is not None:
+            rv[node] = reference
+    return rv
+
+
+def add_cli_populate(main: click.Group) -> click.Group:  # noqa: D202
+    """Add a ``populate`` command to main :mod:`click` function."""
+
+    @main.command()
+    @click.option('--reset', is_flag=True, help='Nuke database first')
+    @click.option('--force', is_flag=True, help='Force overwrite if already populated')
+    @click.option('--fast', is_flag=True, help='Build a fresh SQLite database with durability turned off')
+    @click.option('--release', help='Record the number of the ChEBI release being loaded')
+    @click.option('--chunksize', type=int, help='Load the flat files this many rows at a time to bound memory use')
+    @click.option('--compression', type=click.Choice(CODECS), help='Compress the InChIs and definitions')
+    @click.option('--compression-level', type=int, help='The compression level')
+    @click.option('--validate', is_flag=True, help='Validate the flat files first and skip the rows with problems')
+    @click.option('--strict', is_flag=True, help='Validate the flat files first and stop if they have errors')
+    @click.pass_obj
+    def populate(
+            manager: Manager, reset, force, fast, release, chunksize, compression, compression_level, validate,
+            strict,
+    ):
+        """Populate the database."""
+        if reset:
+            click.echo('Deleting the previous instance of the database')
+            manager.drop_all()
+            click.echo('Creating new models')
+            manager.create_all()
+
+        if manager.is_populated():
+            if fast:
+                click.echo('Fast load can only build a fresh database. Use --reset')
+                sys.exit(1)
+            if not force:
+                click.echo('Database already populated. Use --force to overwrite')
+                sys.exit(0)
+
+        validation = None
+        if strict:  # populate records errors instead of raising them, so check first and pass on the result
+            from .parser.validation import validate_release
+
+            validation = validate_release(chunksize=chunksize)
+            if validation.report.errors:
+                click.echo(str(validation.report))
+                sys.exit(1)
+
+        manager.populate(
+            fast=fast,
+            release=release,
+            chunksize=chunksize,
+            compression=compression,
+            compression_level=compression_level,
+            validate=validate,
+            validation=validation,
+        )
+
+    return main
+
+
+def add_cli_summarize(main: click.Group) -> click.Group:  # noqa: D202
+    """Add a ``summarize`` command to main :mod:`click` function."""
+
+    @main.command()
+    @click.option('-d', '--detailed', is_flag=True, help='Include the breakdowns by type, source, status, etc.')
+    @click.option('--update', is_flag=True, help='Recount the contents of the database first')
+    @click.pass_obj
+    def summarize(manager: Manager, detailed, update):
+        """Summarize the contents of the database."""
+        if update:
+            manager.update_statistics()
+
+        echo_summary(manager.summarize(detailed=detailed))
+
+    return main
@@ -2,14 +2,14 @@
 
 """SQLAlchemy models for Bio2BEL ChEBI."""
 
-from sqlalchemy import Column, Date, ForeignKey, Index, Integer, String, Text
+import datetime
+from typing import Mapping, Optional
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import backref, relationship
-from typing import Mapping, Optional
 
-import pybel.dsl
-from pybel import BELGraph
-from pybel.constants import NAME
+from .compression import CompressedText
 
 __all__ = [
     'Base',
@@ -17,6 +17,9 @@ __all__ = [
     'Synonym',
     'Accession',
     'Relation',
+    'Release',
+    'Statistic',
+    'Compression',
 ]
 
 Base = declarative_base()
@@ -26,6 +29,9 @@ CHEMICAL_TABLE_NAME = '{}_chemical'.format(TABLE_PREFIX)
 SYNONYM_TABLE_NAME = '{}_synonym'.format(TABLE_PREFIX)
 ACCESSION_TABLE_NAME = '{}_accession'.format(TABLE_PREFIX)
 RELATION_TABLE_NAME = '{}_relation'.format(TABLE_PREFIX)
+RELEASE_TABLE_NAME = '{}_release'.format(TABLE_PREFIX)
+STATISTIC_TABLE_NAME = '{}_statistic'.format(TABLE_PREFIX)
+COMPRESSION_TABLE_NAME = '{}_compression'.format(TABLE_PREFIX)
 
 
 class Chemical(Base):
@@ -40,10 +46,10 @@ class Chemical(Base):
     children = relationship('Chemical', backref=backref('parent', remote_side=[id]))
 
     name = Column(String(2000), doc='The name of the compound')
-    definition = Column(Text, doc='A description of the compound')
+    definition = Column(CompressedText, doc='A description of the compound')
     source = Column(Text, doc='The database source')
     status = Column(String(8))
-    inchi = Column(Text, doc='The InChI string for this compound')
+    inchi = Column(CompressedText, doc='The InChI string for this compound')
     modified_on = Column(Date)
     created_by = Column(String(255))
     stars = Column(Integer)
@@ -79,9 +85,15 @@ class Chemical(Base):
 
         return rv
 
-    def to_bel(self) -> pybel.dsl.Abundance:
-        """Make an abundance PyBEL data dictionary."""
-        if self.parent:
+    def to_bel(self, collapse_parent: bool = True):
+        """Make an abundance PyBEL data dictionary.
+
+        :param collapse_parent: If this is a secondary chemical, make its parent's abundance instead
+        :rtype: pybel.dsl.Abundance
+        """
+        import pybel.dsl
+
+        if collapse_parent and self.parent:
             return self.parent.to_bel()
 
         return pybel.dsl.Abundance(
@@ -106,12 +118,14 @@ class Relation(Base):
     target_id = Column(Integer, ForeignKey('{}.id'.format(CHEMICAL_TABLE_NAME)), nullable=False)
     target = relationship('Chemical', foreign_keys=[target_id], backref=backref('in_edges', lazy='dynamic'))
 
-    def add_to_graph(self, graph: BELGraph) -> Optional[str]:
+    def add_to_graph(self, graph) -> Optional[str]:
         """Add this relation to the graph.
 
         :param pybel.BELGraph graph:
         :rtype: Optional[str]
         """
+        from pybel.constants import NAME
+
         source = self.source.to_bel()
         target = self.target.to_bel()
 
@@ -135,7 +149,7 @@ class Synonym(Base):
     __tablename__ = SYNONYM_TABLE_NAME
     id = Column(Integer, primary_key=True)
 
-    chemical_id = Column(Integer, ForeignKey('{}.id'.format(CHEMICAL_TABLE_NAME)), nullable=False)
+    chemical_id = Column(Integer, ForeignKey('{}.id'.format(CHEMICAL_TABLE_NAME)), nullable=False, index=True)
     chemical = relationship('Chemical', backref=backref('synonyms'))
 
     type = Column(String(16), doc='One of: NAME, SYNONYM, IUPAC NAME, INN, BRAND NAME')
@@ -157,7 +171,7 @@ class Accession(Base):
     __tablename__ = ACCESSION_TABLE_NAME
     id = Column(Integer, primary_key=True)
 
-    chemical_id = Column(Integer, ForeignKey('{}.id'.format(CHEMICAL_TABLE_NAME)), nullable=False)
+    chemical_id = Column(Integer, ForeignKey('{}.id'.format(CHEMICAL_TABLE_NAME)), nullable=False, index=True)
     chemical = relationship('Chemical', backref=backref('accessions'))
 
     source = Column(String(255))
@@ -166,3 +180,49 @@ class Accession(Base):
 
     def __str__(self):
         return '{}:{}'.format(self.source, self.accession)
+
+
+class Release(Base):
+    """Represents the ChEBI release loaded in the database."""
+
+    __tablename__ = RELEASE_TABLE_NAME
+    id = Column(Integer, primary_key=True)
+
+    release = Column(String(32), nullable=False, unique=True, doc='The ChEBI release number, like 210')
+    loaded_on = Column(DateTime, default=datetime.datetime.utcnow, doc='When the release was loaded')
+
+    def __str__(self):
+        return self.release
+
+
+class Statistic(Base):
+    """Represents a count of the contents of the database, stored when populating so it can be read instantly."""
+
+    __tablename__ = STATISTIC_TABLE_NAME
+    id = Column(Integer, primary_key=True)
+
+    category = Column(String(32), nullable=False, doc='What is counted, like total or synonym_type')
+    key = Column(String(255), nullable=False, doc='The name of the count, like chemicals or IUPAC NAME')
+    count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(category, key),
+    )
+
+    def __str__(self):
+        return f'{self.category} {self.key}: {self.count}'
+
+
+class Compression(Base):
+    """Represents how a column of the chemical table was compressed, with :mod:`bio2bel_chebi.compression`."""
+
+    __tablename__ = COMPRESSION_TABLE_NAME
+    id = Column(Integer, primary_key=True)
+
+    column = Column(String(64), nullable=False, unique=True, doc='The name of the column, like inchi')
+    codec = Column(String(8), nullable=False, doc='Either zlib or zstd')
+    level = Column(Integer, nullable=False, doc='The compression level')
+    dictionary = Column(LargeBinary, doc='The dictionary the values were compressed against')
+
+    def __str__(self):
+        return f'{self.column}: {self.codec}'
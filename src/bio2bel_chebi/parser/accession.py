@@ -4,9 +4,8 @@ import logging
 import os
 from urllib.request import urlretrieve
 
-import pandas as pd
-
-from ..constants import ACCESSION_DATA_PATH, ACCESSION_URL
+from .utils import read_chebi_tsv
+from ..constants import ACCESSION_DATA_PATH, ACCESSION_DTYPES, ACCESSION_URL
 
 log = logging.getLogger(__name__)
 
@@ -26,7 +25,7 @@ def download_accessions(force_download=False):
     return ACCESSION_DATA_PATH
 
 
-def get_accession_df(url=None, cache=True, force_download=False):
+def get_accession_df(url=None, cache=True, force_download=False, engine=None, chunksize=None):
     """Gets the ChEBI accession flat file.
 
     This file contains five columns: ID, COMPOUND_ID, SOURCE, TYPE, and ACCESSION_NUMBER
@@ -34,12 +33,16 @@ def get_accession_df(url=None, cache=True, force_download=False):
     :param Optional[str] url: The URL (or file path) to download. Defaults to the ChEBI data.
     :param bool cache: If true, the data is downloaded to the file system, else it is loaded from the internet
     :param bool force_download: If true, overwrites a previously cached file
-    :rtype: pandas.DataFrame
+    :param Optional[str] engine: The parser engine for :func:`pandas.read_csv`, like ``'pyarrow'``
+    :param Optional[int] chunksize: If given, iterate over data frames with this many rows instead
+    :rtype: pandas.DataFrame or Iterable[pandas.DataFrame]
     """
     if url is None and cache:
         url = download_accessions(force_download=force_download)
 
-    return pd.read_csv(
+    return read_chebi_tsv(
         url or ACCESSION_URL,
-        sep='\t'
+        dtype=ACCESSION_DTYPES,
+        engine=engine,
+        chunksize=chunksize,
     )
@@ -4,9 +4,9 @@ import logging
 import os
 from urllib.request import urlretrieve
 
-import pandas as pd
-
-from ..constants import COMPOUNDS_DATA_PATH, COMPOUNDS_URL
+from .index import ensure_block_index, read_indexed_rows
+from .utils import read_chebi_tsv
+from ..constants import COMPOUNDS_DATA_PATH, COMPOUNDS_DTYPES, COMPOUNDS_INDEX_KEY, COMPOUNDS_URL
 
 log = logging.getLogger(__name__)
 
@@ -14,6 +14,8 @@ log = logging.getLogger(__name__)
 def download_compounds(force_download=False):
     """Downloads the compounds information
 
+    The file is indexed for random access with :func:`bio2bel_chebi.parser.index.build_block_index`.
+
     :param bool force_download: If true, overwrites a previously cached file
     :rtype: str
     """
@@ -23,26 +25,48 @@ def download_compounds(force_download=False):
         log.info('downloading %s to %s', COMPOUNDS_URL, COMPOUNDS_DATA_PATH)
         urlretrieve(COMPOUNDS_URL, COMPOUNDS_DATA_PATH)
 
+    ensure_block_index(COMPOUNDS_DATA_PATH, key=COMPOUNDS_INDEX_KEY)
     return COMPOUNDS_DATA_PATH
 
 
-def get_compounds_df(url=None, cache=True, force_download=False):
+def get_compounds_df(url=None, cache=True, force_download=False, engine=None, chunksize=None):
     """Gets the ChEBI accession flat file.
 
-    This file contains the columns: ID, STATUS, CHEBI_ACCESSION, PARENT_ID, NAME, DEFINITION
+    This file contains the columns: ID, STATUS, CHEBI_ACCESSION, SOURCE, PARENT_ID, NAME, DEFINITION, MODIFIED_ON,
+    CREATED_BY, and STAR. MODIFIED_ON and CREATED_BY are skipped.
 
     :param Optional[str] url: The URL (or file path) to download. Defaults to the ChEBI data.
     :param bool cache: If true, the data is downloaded to the file system, else it is loaded from the internet
     :param bool force_download: If true, overwrites a previously cached file
-    :rtype: pandas.DataFrame
+    :param Optional[str] engine: The parser engine for :func:`pandas.read_csv`, like ``'pyarrow'``
+    :param Optional[int] chunksize: If given, iterate over data frames with this many rows instead
+    :rtype: pandas.DataFrame or Iterable[pandas.DataFrame]
     """
     if url is None and cache:
         url = download_compounds(force_download=force_download)
 
-    return pd.read_csv(
+    return read_chebi_tsv(
         url or COMPOUNDS_URL,
-        sep='\t',
+        dtype=COMPOUNDS_DTYPES,
+        engine=engine,
+        chunksize=chunksize,
         compression='gzip',
         na_values=['null'],
-        low_memory=False
     )
+
+
+def get_compounds_df_by_ids(ids, url=None, force_download=False, engine=None):
+    """Gets the rows of the given compounds, only decompressing the parts of the indexed flat file that hold them.
+
+    :param Iterable[int] ids: The compound identifiers, like 38545 for CHEBI:38545
+    :param Optional[str] url: The path of a compounds file indexed with
+     :func:`bio2bel_chebi.parser.index.build_block_index`. Defaults to the ChEBI data, which is indexed when it's
+     downloaded.
+    :param bool force_download: If true, overwrites a previously cached file
+    :param Optional[str] engine: The parser engine for :func:`pandas.read_csv`, like ``'pyarrow'``
+    :rtype: pandas.DataFrame
+    """
+    if url is None:
+        url = download_compounds(force_download=force_download)
+
+    return read_indexed_rows(url, ids, dtype=COMPOUNDS_DTYPES, engine=engine, na_values=['null'])
@@ -5,9 +5,8 @@ import logging
 import os
 from urllib.request import urlretrieve
 
-import pandas as pd
-
-from ..constants import INCHIS_DATA_PATH, INCHIS_URL
+from .utils import read_chebi_tsv
+from ..constants import INCHIS_DATA_PATH, INCHIS_DTYPES, INCHIS_URL
 
 log = logging.getLogger(__name__)
 
@@ -27,18 +26,22 @@ def download_inchis(force_download=False):
     return INCHIS_DATA_PATH
 
 
-def get_inchis_df(url=None, cache=True, force_download=False):
+def get_inchis_df(url=None, cache=True, force_download=False, engine=None, chunksize=None):
     """Gets the compound's inchi keys
 
     :param Optional[str] url: The URL (or file path) to download. Defaults to the ChEBI data.
     :param bool cache: If true, the data is downloaded to the file system, else it is loaded from the internet
     :param bool force_download: If true, overwrites a previously cached file
-    :rtype: pandas.DataFrame
+    :param Optional[str] engine: The parser engine for :func:`pandas.read_csv`, like ``'pyarrow'``
+    :param Optional[int] chunksize: If given, iterate over data frames with this many rows instead
+    :rtype: pandas.DataFrame or Iterable[pandas.DataFrame]
     """
     if url is None and cache:
         url = download_inchis(force_download=force_download)
 
-    return pd.read_csv(
+    return read_chebi_tsv(
         url or INCHIS_URL,
-        sep='\t'
+        dtype=INCHIS_DTYPES,
+        engine=engine,
+        chunksize=chunksize,
     )
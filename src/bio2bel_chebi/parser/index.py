@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+"""Random access to the gzipped ChEBI flat files.
+
+A plain gzip file has to be decompressed from the start to read anything in it. :func:`build_block_index`
+recompresses a flat file as a series of independent gzip members (blocks) of about :data:`BLOCK_SIZE`
+uncompressed bytes that each hold whole rows, like BGZF. It's still a valid gzip file, so everything else reads it
+as before. Next to it, it writes an index of where each block starts and which blocks hold the rows of each
+identifier. With the index:
+
+1. :func:`read_indexed_rows` reads the rows of a few identifiers by decompressing only the blocks that hold them
+2. :func:`iter_indexed_chunks` reads the file in chunks that are decompressed and parsed on several cores at once,
+   which :func:`bio2bel_chebi.parser.utils.read_chebi_tsv` uses for chunked reads of indexed files
+
+The files downloaded by :func:`bio2bel_chebi.parser.compounds.download_compounds` and
+:func:`bio2bel_chebi.parser.names.download_names` are indexed by their compound identifiers.
+"""
+
+import gzip
+import io
+import logging
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Mapping, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from .utils import _read_chebi_tsv
+
+__all__ = [
+    'BlockIndex',
+    'build_block_index',
+    'ensure_block_index',
+    'get_index_path',
+    'read_indexed_rows',
+    'iter_indexed_chunks',
+]
+
+log = logging.getLogger(__name__)
+
+X = TypeVar('X')
+Y = TypeVar('Y')
+
+#: The number of uncompressed bytes after which a block is closed, at the end of the row. The same as BGZF.
+BLOCK_SIZE = 2 ** 16
+
+#: The gzip compression level of the blocks
+COMPRESSLEVEL = 6
+
+#: The version of the format of the index
+INDEX_VERSION = 1
+
+
+def get_index_path(path: str) -> str:
+    """Get the path of the index of the flat file at the given path."""
+    return f'{path}.index.npz'
+
+
+class BlockIndex:
+    """The index of a flat file recompressed by :func:`build_block_index`."""
+
+    def __init__(
+            self,
+            key: str,
+            header: bytes,
+            offsets: np.ndarray,
+            rows: np.ndarray,
+            keys: np.ndarray,
+            key_blocks: np.ndarray,
+            size: int,
+    ) -> None:
+        """Initialize the index.
+
+        :param key: The name of the column the rows are indexed by
+        :param header: The header row of the file
+        :param offsets: The offsets of the blocks in the file, followed by the offset of the end of the last block
+        :param rows: The number of rows in each block
+        :param keys: The identifiers in the key column, sorted
+        :param key_blocks: The block of each row of the sorted identifiers
+        :param size: The size of the file when it was indexed
+        """
+        self.key = key
+        self.header = header
+        self.offsets = offsets
+        self.rows = rows
+        self.keys = keys
+        self.key_blocks = key_blocks
+        self.size = size
+
+    def __len__(self) -> int:
+        """Count the blocks."""
+        return len(self.rows)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['BlockIndex']:
+        """Load the index of the flat file at the given path, or None if it's missing or out of date."""
+        index_path = get_index_path(path)
+        if not os.path.exists(index_path):
+            return
+
+        with np.load(index_path) as data:
+            if int(data['version']) != INDEX_VERSION:
+                log.warning('ignoring index of an older version at %s', index_path)
+                return
+
+            index = cls(
+                key=str(data['key']),
+                header=data['header'].tobytes(),
+                offsets=data['offsets'],
+                rows=data['rows'],
+                keys=data['keys'],
+                key_blocks=data['key_blocks'],
+                size=int(data['size']),
+            )
+
+        if not index._matches(path):
+            log.warning('ignoring outdated index at %s', index_path)
+            return
+
+        return index
+
+    def _matches(self, path: str) -> bool:
+        """Check that the file is the one that was indexed and wasn't replaced, e.g., by a new download."""
+        if os.path.getsize(path) != self.size:
+            return False
+        with open(path, 'rb') as file:
+            try:
+                return zlib.decompress(file.read(int(self.offsets[0])), wbits=31) == self.header
+            except zlib.error:
+                return False
+
+    def save(self, path: str) -> None:
+        """Save the index of the flat file at the given path."""
+        index_path = get_index_path(path)
+        temporary_path = f'{index_path}.{os.getpid()}.tmp.npz'
+        np.savez(
+            temporary_path,
+            version=INDEX_VERSION,
+            key=self.key,
+            header=np.frombuffer(self.header, dtype=np.uint8),
+            offsets=self.offsets,
+            rows=self.rows,
+            keys=self.keys,
+            key_blocks=self.key_blocks,
+            size=self.size,
+        )
+        os.replace(temporary_path, index_path)
+
+    def get_blocks(self, keys: Iterable[int]) -> List[int]:
+        """Get the blocks that hold the rows of the given identifiers, in order."""
+        keys = np.unique(np.asarray(list(keys), dtype=np.int64))
+        starts = np.searchsorted(self.keys, keys, side='left')
+        stops = np.searchsorted(self.keys, keys, side='right')
+        blocks = np.concatenate([self.key_blocks[start:stop] for start, stop in zip(starts, stops)] or [[]])
+        return np.unique(blocks).astype(int).tolist()
+
+    def iter_block_groups(self, chunksize: int) -> Iterable[List[int]]:
+        """Group consecutive blocks into chunks of at least the given number of rows."""
+        group, group_rows = [], 0
+        for block, rows in enumerate(self.rows.tolist()):
+            group.append(block)
+            group_rows += rows
+            if group_rows >= chunksize:
+                yield group
+                group, group_rows = [], 0
+        if group:
+            yield group
+
+    def read_blocks(self, path: str, blocks: Iterable[int]) -> bytes:
+        """Decompress the given blocks of the file, after its header."""
+        parts = [self.header]
+        with open(path, 'rb') as file:
+            for block in blocks:
+                start, stop = int(self.offsets[block]), int(self.offsets[block + 1])
+                file.seek(start)
+                parts.append(zlib.decompress(file.read(stop - start), wbits=31))
+        return b''.join(parts)
+
+
+def _flush(output, block: List[bytes]) -> None:
+    output.write(gzip.compress(b''.join(block), compresslevel=COMPRESSLEVEL, mtime=0))
+
+
+def build_block_index(path: str, key: str, block_size: int = BLOCK_SIZE) -> BlockIndex:
+    """Recompress the gzipped flat file at the given path in independently compressed blocks, and index it.
+
+    The file is replaced atomically, and its index is written to :func:`get_index_path`.
+
+    :param path: The path of a gzipped, tab-separated file with a header
+    :param key: The name of the column of integer identifiers to index the rows by. Rows whose identifiers
+     aren't integers can't be looked up, but are still read in chunks.
+    :param block_size: The number of uncompressed bytes after which a block is closed
+    """
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+
+    offsets, rows, keys, key_blocks = [], [], [], []
+    with gzip.open(path, 'rb') as file, open(temporary_path, 'wb') as output:
+        header = file.readline()
+        column = header.rstrip(b'\r\n').split(b'\t').index(key.encode('utf-8'))
+        _flush(output, [header])  # keeps the file readable as a whole
+
+        block, block_bytes = [], 0
+        for line in file:
+            if not block:
+                offsets.append(output.tell())
+            block.append(line)
+            block_bytes += len(line)
+
+            fields = line.split(b'\t', column + 1)
+            if column < len(fields) and fields[column].strip().isdigit():
+                keys.append(int(fields[column]))
+                key_blocks.append(len(offsets) - 1)
+
+            if block_bytes >= block_size:
+                rows.append(len(block))
+                _flush(output, block)
+                block, block_bytes = [], 0
+
+        if block:
+            rows.append(len(block))
+            _flush(output, block)
+
+        offsets.append(output.tell())
+
+    keys = np.asarray(keys, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    index = BlockIndex(
+        key=key,
+        header=header,
+        offsets=np.asarray(offsets, dtype=np.int64),
+        rows=np.asarray(rows, dtype=np.int64),
+        keys=keys[order],
+        key_blocks=np.asarray(key_blocks, dtype=np.int32)[order],
+        size=os.path.getsize(temporary_path),
+    )
+
+    os.replace(temporary_path, path)
+    index.save(path)
+    log.info('indexed %d blocks of %s by %s', len(index), path, key)
+    return index
+
+
+def ensure_block_index(path: str, key: str) -> BlockIndex:
+    """Load the index of the flat file at the given path, or build it if it's missing or out of date."""
+    return BlockIndex.load(path) or build_block_index(path, key)
+
+
+def read_indexed_rows(
+        path: str,
+        keys: Iterable[int],
+        dtype: Mapping[str, str],
+        index: Optional[BlockIndex] = None,
+        engine: Optional[str] = None,
+        **kwargs
+) -> pd.DataFrame:
+    """Read the rows of the given identifiers, only decompressing the blocks that hold them.
+
+    :param path: The path of a flat file indexed by :func:`build_block_index`
+    :param keys: The identifiers in the key column of the index
+    :param dtype: A dictionary from the names of the columns to keep to their types
+    :param index: The index. Defaults to the index next to the file.
+    :param engine: The parser engine passed to :func:`pandas.read_csv`
+    :param kwargs: Keyword arguments passed to :func:`pandas.read_csv`
+    """
+    index = index or BlockIndex.load(path)
+    if index is None:
+        raise ValueError(f'{path} is not indexed. Index it with build_block_index')
+
+    keys = set(keys)
+    df = _read_blocks_df(path, index, index.get_blocks(keys), dtype, engine=engine, **kwargs)
+    return df[df[index.key].isin(keys)].reset_index(drop=True)
+
+
+def _read_blocks_df(
+        path: str,
+        index: BlockIndex,
+        blocks: List[int],
+        dtype: Mapping[str, str],
+        engine: Optional[str] = None,
+        **kwargs
+) -> pd.DataFrame:
+    kwargs.pop('compression', None)
+    return _read_chebi_tsv(io.BytesIO(index.read_blocks(path, blocks)), dtype, engine=engine, **kwargs)
+
+
+def _map_ordered(function: Callable[[X], Y], values: Iterable[X], workers: int) -> Iterator[Y]:
+    """Apply the function to the values in a thread pool, yielding the results in order.
+
+    Only a few values per thread are in flight at a time, so the results are produced as they're consumed.
+    """
+    if workers < 2:
+        yield from map(function, values)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = deque()
+        for value in values:
+            futures.append(executor.submit(function, value))
+            if len(futures) >= 2 * workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+def iter_indexed_chunks(
+        path: str,
+        dtype: Mapping[str, str],
+        chunksize: int,
+        index: Optional[BlockIndex] = None,
+        engine: Optional[str] = None,
+        workers: Optional[int] = None,
+        **kwargs
+) -> Iterator[pd.DataFrame]:
+    """Read the file in chunks of whole blocks, decompressed and parsed in parallel.
+
+    Decompression and most of the parsing release the GIL, so threads use several cores.
+
+    :param path: The path of a flat file indexed by :func:`build_block_index`
+    :param dtype: A dictionary from the names of the columns to keep to their types
+    :param chunksize: The minimum number of rows per chunk. Chunks hold whole blocks, so they're a bit bigger.
+    :param index: The index. Defaults to the index next to the file.
+    :param engine: The parser engine passed to :func:`pandas.read_csv`
+    :param workers: The number of threads. Defaults to the number of CPUs.
+    :param kwargs: Keyword arguments passed to :func:`pandas.read_csv`
+    """
+    index = index or BlockIndex.load(path)
+    if index is None:
+        raise ValueError(f'{path} is not indexed. Index it with build_block_index')
+
+    def _read(blocks: List[int]) -> pd.DataFrame:
+        return _read_blocks_df(path, index, blocks, dtype, engine=engine, **kwargs)
+
+    yield from _map_ordered(_read, index.iter_block_groups(chunksize), workers or os.cpu_count() or 1)
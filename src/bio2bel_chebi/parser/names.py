@@ -5,9 +5,9 @@ import logging
 import os
 from urllib.request import urlretrieve
 
-import pandas as pd
-
-from ..constants import NAMES_DATA_PATH, NAMES_URL
+from .index import ensure_block_index, read_indexed_rows
+from .utils import read_chebi_tsv
+from ..constants import NAMES_DATA_PATH, NAMES_DTYPES, NAMES_INDEX_KEY, NAMES_URL
 
 log = logging.getLogger(__name__)
 
@@ -15,6 +15,8 @@ log = logging.getLogger(__name__)
 def download_names(force_download=False):
     """Downloads the compound names
 
+    The file is indexed for random access with :func:`bio2bel_chebi.parser.index.build_block_index`.
+
     :param bool force_download: If true, overwrites a previously cached file
     :rtype: str
     """
@@ -24,24 +26,46 @@ def download_names(force_download=False):
         log.info('downloading %s to %s', NAMES_URL, NAMES_DATA_PATH)
         urlretrieve(NAMES_URL, NAMES_DATA_PATH)
 
+    ensure_block_index(NAMES_DATA_PATH, key=NAMES_INDEX_KEY)
     return NAMES_DATA_PATH
 
 
-def get_names_df(url=None, cache=True, force_download=False):
+def get_names_df(url=None, cache=True, force_download=False, engine=None, chunksize=None):
     """Gets the ChEBI names flat file.
 
-    This file contains five columns: ID, COMPOUND_ID, TYPE, SOURCE, NAME, ADAPTED, and LANGUAGE
+    This file contains seven columns: ID, COMPOUND_ID, TYPE, SOURCE, NAME, ADAPTED, and LANGUAGE. ADAPTED is skipped.
 
     :param Optional[str] url: The URL (or file path) to download. Defaults to the ChEBI data.
     :param bool cache: If true, the data is downloaded to the file system, else it is loaded from the internet
     :param bool force_download: If true, overwrites a previously cached file
-    :rtype: pandas.DataFrame
+    :param Optional[str] engine: The parser engine for :func:`pandas.read_csv`, like ``'pyarrow'``
+    :param Optional[int] chunksize: If given, iterate over data frames with this many rows instead
+    :rtype: pandas.DataFrame or Iterable[pandas.DataFrame]
     """
     if url is None and cache:
         url = download_names(force_download=force_download)
 
-    return pd.read_csv(
+    return read_chebi_tsv(
         url or NAMES_URL,
-        sep='\t',
-        compression='gzip'
+        dtype=NAMES_DTYPES,
+        engine=engine,
+        chunksize=chunksize,
+        compression='gzip',
     )
+
+
+def get_names_df_by_compound_ids(ids, url=None, force_download=False, engine=None):
+    """Gets the names of the given compounds, only decompressing the parts of the indexed flat file that hold them.
+
+    :param Iterable[int] ids: The compound identifiers, like 38545 for CHEBI:38545
+    :param Optional[str] url: The path of a names file indexed with
+     :func:`bio2bel_chebi.parser.index.build_block_index`. Defaults to the ChEBI data, which is indexed when it's
+     downloaded.
+    :param bool force_download: If true, overwrites a previously cached file
+    :param Optional[str] engine: The parser engine for :func:`pandas.read_csv`, like ``'pyarrow'``
+    :rtype: pandas.DataFrame
+    """
+    if url is None:
+        url = download_names(force_download=force_download)
+
+    return read_indexed_rows(url, ids, dtype=NAMES_DTYPES, engine=engine)
@@ -5,9 +5,8 @@ import logging
 import os
 from urllib.request import urlretrieve
 
-import pandas as pd
-
-from ..constants import RELATIONS_DATA_PATH, RELATIONS_URL
+from .utils import read_chebi_tsv
+from ..constants import RELATIONS_DATA_PATH, RELATIONS_DTYPES, RELATIONS_URL
 
 log = logging.getLogger(__name__)
 
@@ -27,7 +26,7 @@ def download_relations(force_download=False):
     return RELATIONS_DATA_PATH
 
 
-def get_relations_df(url=None, cache=True, force_download=False):
+def get_relations_df(url=None, cache=True, force_download=False, engine=None, chunksize=None):
     """Gets the ChEBI relations flat file
 
     Columns are: ID, TYPE, INIT_ID, FINAL_ID, STATUS
@@ -35,12 +34,16 @@ def get_relations_df(url=None, cache=True, force_download=False):
     :param Optional[str] url: The URL (or file path) to download. Defaults to the ChEBI data.
     :param bool cache: If true, the data is downloaded to the file system, else it is loaded from the internet
     :param bool force_download: If true, overwrites a previously cached file
-    :rtype: pandas.DataFrame
+    :param Optional[str] engine: The parser engine for :func:`pandas.read_csv`, like ``'pyarrow'``
+    :param Optional[int] chunksize: If given, iterate over data frames with this many rows instead
+    :rtype: pandas.DataFrame or Iterable[pandas.DataFrame]
     """
     if url is None and cache:
         url = download_relations(force_download=force_download)
 
-    return pd.read_csv(
+    return read_chebi_tsv(
         url or RELATIONS_URL,
-        sep='\t',
+        dtype=RELATIONS_DTYPES,
+        engine=engine,
+        chunksize=chunksize,
     )
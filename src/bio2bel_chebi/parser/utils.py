@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for parsing the ChEBI flat files.
+
+Parsed flat files in the data directory (like the downloads) are cached in
+:data:`bio2bel_chebi.constants.PARSED_CACHE_DIRECTORY` in a binary format keyed by the size and modification time
+of the original file and the schema, so unchanged downloads are only parsed once. The cache uses the Feather
+columnar format if :mod:`pyarrow` is installed and falls back to pickles otherwise. Tables whose original files
+were removed are evicted, as are the least recently used ones when the cache grows beyond
+:data:`bio2bel_chebi.constants.PARSED_CACHE_MAX_SIZE`.
+
+Gzipped files can also be indexed for random access and parallel reading with :mod:`bio2bel_chebi.parser.index`.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+from typing import Iterable, Mapping, Optional, Union
+
+import pandas as pd
+
+from ..constants import DATA_DIR, PARSED_CACHE_DIRECTORY, PARSED_CACHE_MAX_SIZE
+
+__all__ = [
+    'read_chebi_tsv',
+]
+
+log = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    _CACHE_EXTENSION = 'pkl'
+else:
+    _CACHE_EXTENSION = 'feather'
+
+#: The extension of the file next to the cached tables of a flat file that holds the flat file's path
+_SOURCE_EXTENSION = 'source'
+
+
+def read_chebi_tsv(
+        path: str,
+        dtype: Mapping[str, str],
+        engine: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        cache_directory: Optional[str] = None,
+        chunksize: Optional[int] = None,
+        **kwargs
+) -> Union[pd.DataFrame, Iterable[pd.DataFrame]]:
+    """Read a ChEBI flat file, keeping only the columns in the schema and giving them the schema's types.
+
+    Identifiers are read as nullable integers, so they don't become floats when some are missing, and columns
+    with only a few distinct values (like statuses, sources, and types) are read as categoricals.
+
+    :param path: The URL (or file path) of the flat file
+    :param dtype: A dictionary from the names of the columns to keep to their types
+    :param engine: The parser engine passed to :func:`pandas.read_csv`. Use ``'pyarrow'`` for the faster,
+     multi-threaded parser if :mod:`pyarrow` is installed.
+    :param use_cache: If true and the path is a local file, use the cached parsed table if the file is unchanged.
+     If None, only files in :data:`bio2bel_chebi.constants.DATA_DIR` are cached, unless a cache directory is given.
+    :param cache_directory: The directory of the cached tables. Defaults to
+     :data:`bio2bel_chebi.constants.PARSED_CACHE_DIRECTORY`.
+    :param chunksize: If given, lazily iterate over data frames with this many rows instead, so files of any size
+     can be read in bounded memory. Chunks aren't cached and can't be read with the ``'pyarrow'`` engine. Files
+     indexed by :func:`bio2bel_chebi.parser.index.build_block_index` are read in chunks of whole blocks that are
+     decompressed and parsed in parallel.
+    :param kwargs: Keyword arguments passed to :func:`pandas.read_csv`
+    """
+    if chunksize is not None:
+        if os.path.isfile(path):
+            from .index import BlockIndex, iter_indexed_chunks
+            index = BlockIndex.load(path)
+            if index is not None:
+                return iter_indexed_chunks(path, dtype, chunksize, index=index, engine=engine, **kwargs)
+        return _read_chebi_tsv(path, dtype, engine=engine, chunksize=chunksize, **kwargs)
+
+    if use_cache is None:
+        use_cache = cache_directory is not None or _is_in_directory(path, DATA_DIR)
+
+    if not use_cache or not os.path.isfile(path):
+        return _read_chebi_tsv(path, dtype, engine=engine, **kwargs)
+
+    cache_directory = cache_directory or PARSED_CACHE_DIRECTORY
+    cache_path = _get_cache_path(path, dtype, cache_directory, **kwargs)
+
+    if os.path.exists(cache_path):
+        log.info('using parsed cache at %s', cache_path)
+        os.utime(cache_path)  # marks it as recently used
+        return _read_cache(cache_path)
+
+    df = _read_chebi_tsv(path, dtype, engine=engine, **kwargs)
+    _evict(path, cache_directory)
+    log.info('caching parsed %s to %s', path, cache_path)
+    _write_cache(df, cache_path, path)
+    _prune(cache_directory, PARSED_CACHE_MAX_SIZE)
+    return df
+
+
+def _is_in_directory(path: str, directory: str) -> bool:
+    """Check if the path is a file in the directory or one of its subdirectories."""
+    if not os.path.isfile(path):
+        return False
+    path, directory = os.path.realpath(path), os.path.realpath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+
+def _read_chebi_tsv(path: str, dtype: Mapping[str, str], engine: Optional[str] = None, **kwargs) -> pd.DataFrame:
+    return pd.read_csv(
+        path,
+        sep='\t',
+        usecols=list(dtype),
+        dtype=dict(dtype),
+        engine=engine,
+        **kwargs
+    )
+
+
+def _get_cache_prefix(path: str, directory: str) -> str:
+    """Get the prefix shared by all cached tables of the file at the given path."""
+    path_md5 = hashlib.md5(os.path.abspath(path).encode('utf-8')).hexdigest()[:8]
+    return os.path.join(directory, f'{os.path.basename(path)}.{path_md5}')
+
+
+def _get_cache_path(path: str, dtype: Mapping[str, str], directory: str, **kwargs) -> str:
+    """Get the path of the cached table, which changes whenever the file or the way it's parsed changes.
+
+    Downloads replace the file, which changes its modification time, so the file doesn't need to be hashed.
+    """
+    stat = os.stat(path)
+    md5 = hashlib.md5(json.dumps([stat.st_size, stat.st_mtime_ns, dtype, kwargs], sort_keys=True, default=str)
+                      .encode('utf-8'))
+    return f'{_get_cache_prefix(path, directory)}.{md5.hexdigest()}.{_CACHE_EXTENSION}'
+
+
+def _iter_cache_paths(directory: str) -> Iterable[str]:
+    return glob.iglob(os.path.join(glob.escape(directory), f'*.{_CACHE_EXTENSION}'))
+
+
+def _evict(path: str, directory: str) -> None:
+    """Remove the cached tables for previous versions of the file."""
+    for cache_path in glob.glob(f'{glob.escape(_get_cache_prefix(path, directory))}.*.{_CACHE_EXTENSION}'):
+        log.info('evicting stale parsed cache at %s', cache_path)
+        os.remove(cache_path)
+
+
+def _get_source(prefix: str) -> Optional[str]:
+    """Get the path of the flat file whose tables are cached with the given prefix, if it's known."""
+    try:
+        with open(f'{prefix}.{_SOURCE_EXTENSION}') as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _prune(directory: str, max_size: int) -> None:
+    """Remove orphaned and least recently used tables from the cache.
+
+    First the tables of flat files that don't exist anymore are removed, then the least recently used tables until
+    the cache is at most the given size in bytes.
+    """
+    entries = []
+    for cache_path in _iter_cache_paths(directory):
+        prefix = cache_path.rsplit('.', 2)[0]
+        source = _get_source(prefix)
+        if source is None or not os.path.exists(source):
+            log.info('evicting orphaned parsed cache at %s', cache_path)
+            os.remove(cache_path)
+            continue
+        stat = os.stat(cache_path)
+        entries.append((stat.st_mtime, stat.st_size, cache_path))
+
+    size = sum(entry_size for _, entry_size, _ in entries)
+    for _, entry_size, cache_path in sorted(entries):
+        if size <= max_size:
+            break
+        log.info('evicting least recently used parsed cache at %s', cache_path)
+        os.remove(cache_path)
+        size -= entry_size
+
+    cache_prefixes = {cache_path.rsplit('.', 2)[0] for cache_path in _iter_cache_paths(directory)}
+    for source_path in glob.glob(os.path.join(glob.escape(directory), f'*.{_SOURCE_EXTENSION}')):
+        if source_path[:-len(_SOURCE_EXTENSION) - 1] not in cache_prefixes:
+            os.remove(source_path)
+
+
+def _read_cache(cache_path: str) -> pd.DataFrame:
+    if cache_path.endswith('.feather'):
+        return pd.read_feather(cache_path)
+    return pd.read_pickle(cache_path)
+
+
+def _write_cache(df: pd.DataFrame, cache_path: str, path: str) -> None:
+    """Write the parsed table of the flat file at the given path, and record the path next to it."""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # write to a temporary file first so concurrent readers never see a partial table
+    temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+    if cache_path.endswith('.feather'):
+        df.to_feather(temporary_path)
+    else:
+        df.to_pickle(temporary_path)
+    os.replace(temporary_path, cache_path)
+
+    with open(f'{cache_path.rsplit(".", 2)[0]}.{_SOURCE_EXTENSION}', 'w') as file:
+        file.write(os.path.abspath(path))
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+
+"""Validation of the ChEBI flat files before they're loaded.
+
+Malformed rows otherwise only surface deep in the loaders, after the tables before them were written.
+:func:`validate_release` reads each flat file once, chunk by chunk, and checks each chunk with vectorized
+:mod:`pandas` and :mod:`numpy` operations for:
+
+1. missing, malformed, and duplicate identifiers, like a ``CHEBI_ACCESSION`` that isn't ``CHEBI:<ID>``
+2. references to compounds that aren't in the compounds file, from parents, relations, names, cross-references,
+   and InChIs
+3. missing names, accession numbers, InChIs, and relation types
+
+Problems of the first kind are errors, since they would break the load or the identifiers of the chemicals.
+The others are warnings, since every ChEBI release has a few of them. Either way, the rows are counted in a
+:class:`ValidationReport` with a few examples each, and :meth:`Validator.validate` drops them from the data frames
+it returns, except that dangling parents are only removed from their compounds.
+
+Populate with ``bio2bel_chebi populate --validate`` to validate before writing anything and load the filtered
+data frames, and add ``--strict`` to stop if there are any errors. ``bio2bel_chebi validate`` only prints the
+report.
+"""
+
+import logging
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import click
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    'ValidationError',
+    'ValidationReport',
+    'Validator',
+    'validate_release',
+    'add_cli_validate',
+    'TABLES',
+]
+
+log = logging.getLogger(__name__)
+
+ERROR = 'error'
+WARNING = 'warning'
+
+#: The tables that are validated, in the order they're loaded
+TABLES = ('compounds', 'inchis', 'relations', 'names', 'accessions')
+
+#: The number of examples kept for each problem
+EXAMPLES = 5
+
+#: The format of the ``CHEBI_ACCESSION`` column of the compounds file
+CHEBI_ACCESSION_PATTERN = r'CHEBI:\d+'
+
+
+class Issue:
+    """The rows of a table with the same problem."""
+
+    def __init__(self, table: str, description: str, severity: str) -> None:
+        """Initialize the issue.
+
+        :param table: One of :data:`TABLES`
+        :param description: What's wrong with the rows
+        :param severity: Either ``'error'`` or ``'warning'``
+        """
+        self.table = table
+        self.description = description
+        self.severity = severity
+        self.count = 0
+        self.examples: List = []
+
+    def __str__(self) -> str:
+        examples = ', '.join(map(str, self.examples))
+        return f'{self.severity}: {self.table}: {self.count} {self.description} (e.g., {examples})'
+
+
+class ValidationReport:
+    """Counts the rows with each problem, over all chunks of all tables."""
+
+    def __init__(self) -> None:
+        """Initialize an empty report."""
+        self.rows: Dict[str, int] = defaultdict(int)
+        self.issues: Dict[str, Issue] = {}
+
+    def add(self, table: str, description: str, severity: str, examples: pd.Series) -> None:
+        """Count the rows with a problem.
+
+        :param table: One of :data:`TABLES`
+        :param description: What's wrong with the rows
+        :param severity: Either ``'error'`` or ``'warning'``
+        :param examples: A value identifying each of the rows, like their identifiers
+        """
+        if not len(examples):
+            return
+
+        key = f'{table}: {description}'
+        issue = self.issues.get(key)
+        if issue is None:
+            issue = self.issues[key] = Issue(table, description, severity)
+
+        issue.count += len(examples)
+        if len(issue.examples) < EXAMPLES:
+            issue.examples.extend(examples.iloc[:EXAMPLES - len(issue.examples)].tolist())
+
+    def count(self, severity: str) -> int:
+        """Count the rows with problems of the given severity. Rows with several problems are counted for each."""
+        return sum(issue.count for issue in self.issues.values() if issue.severity == severity)
+
+    @property
+    def errors(self) -> int:
+        """Count the rows with errors."""
+        return self.count(ERROR)
+
+    @property
+    def warnings(self) -> int:
+        """Count the rows with warnings."""
+        return self.count(WARNING)
+
+    def __str__(self) -> str:
+        rows = ', '.join(f'{count} {table}' for table, count in self.rows.items())
+        lines = [f'validated {rows}: {self.errors} errors and {self.warnings} warnings']
+        lines.extend(
+            f'  {issue}'
+            for issue in sorted(self.issues.values(), key=lambda issue: (issue.severity, issue.table))
+        )
+        return '\n'.join(lines)
+
+    def to_dict(self) -> Mapping[str, Mapping[str, int]]:
+        """Get a dictionary from the tables to the numbers of rows with each of their problems."""
+        rv = defaultdict(dict)
+        for issue in self.issues.values():
+            rv[issue.table][issue.description] = issue.count
+        return dict(rv)
+
+    def raise_for_errors(self) -> None:
+        """Raise a :class:`ValidationError` if there are any errors."""
+        if self.errors:
+            raise ValidationError(self)
+
+
+class ValidationError(ValueError):
+    """Raised when the ChEBI flat files have errors."""
+
+    def __init__(self, report: ValidationReport) -> None:
+        """Initialize the error with the report of the problems."""
+        super().__init__(f'invalid ChEBI flat files\n{report}')
+        self.report = report
+
+
+def _isin_sorted(values: np.ndarray, sorted_values: np.ndarray) -> np.ndarray:
+    """Check which of the values are in the sorted array with a binary search."""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(sorted_values, values).clip(max=len(sorted_values) - 1)
+    return sorted_values[positions] == values
+
+
+def _insert_sorted(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Insert new values into the sorted array, which only copies it once instead of sorting it again."""
+    values = np.sort(values)
+    return np.insert(sorted_values, np.searchsorted(sorted_values, values), values)
+
+
+def _is_empty(values: pd.Series) -> pd.Series:
+    """Check which of the text values are missing or blank."""
+    return values.isna() | (values.astype(object).fillna('').str.strip() == '')
+
+
+class Validator:
+    """Validates the data frames of the ChEBI flat files, chunk by chunk.
+
+    Duplicates are found across chunks, so the chunks of each table should be validated in order and only once
+    per validator.
+    """
+
+    def __init__(self, compound_ids: Optional[Iterable[int]] = None, report: Optional[ValidationReport] = None):
+        """Initialize the validator.
+
+        :param compound_ids: The identifiers of the compounds. If None, references to compounds aren't checked.
+        :param report: The report to add the problems to. Defaults to a new report.
+        """
+        self.compound_ids = None if compound_ids is None else np.unique(np.fromiter(compound_ids, 'int64'))
+        self.report = report or ValidationReport()
+        self._seen: Dict[str, np.ndarray] = defaultdict(lambda: np.empty(0, dtype='int64'))
+
+    def validate(self, table: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Check a chunk of a table, add its problems to the report, and get the rows without problems.
+
+        :param table: One of :data:`TABLES`
+        :param df: A data frame from the table's function in :mod:`bio2bel_chebi.parser`
+        """
+        if table not in TABLES:
+            raise ValueError(f'invalid table: {table}. Use one of {TABLES}')
+
+        self.report.rows[table] += len(df.index)
+        return getattr(self, f'_validate_{table}')(df)
+
+    def _check(self, table: str, df: pd.DataFrame, invalid, description: str, severity: str, column: Optional[str]):
+        """Count the invalid rows, using the values in the given column as examples."""
+        invalid = np.asarray(invalid, dtype=bool)
+        if invalid.any():
+            examples = df.index.to_series() if column is None else df[column]
+            self.report.add(table, description, severity, examples[invalid])
+        return invalid
+
+    def _check_key(self, table: str, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Find missing identifiers and repeats of identifiers in this chunk or the previous ones."""
+        missing = self._check(table, df, df[column].isna(), f'missing {column}', ERROR, None)
+
+        ids = df[column].to_numpy('int64', na_value=-1)
+        duplicate = ~missing & (pd.Series(ids).duplicated().to_numpy() | _isin_sorted(ids, self._seen[table]))
+        self._check(table, df, duplicate, f'duplicate {column}', ERROR, column)
+        self._seen[table] = _insert_sorted(self._seen[table], ids[~(missing | duplicate)])
+
+        return missing | duplicate
+
+    def _check_reference(self, table: str, df: pd.DataFrame, column: str, allow_missing: bool = False):
+        """Find references to compounds that aren't in the compounds file."""
+        missing = df[column].isna().to_numpy()
+        if self.compound_ids is None:
+            dangling = np.zeros(len(df.index), dtype=bool)
+        else:
+            ids = df[column].to_numpy('int64', na_value=-1)
+            dangling = self._check(
+                table, df, ~missing & ~_isin_sorted(ids, self.compound_ids),
+                f'{column} not in compounds', WARNING, column,
+            )
+        if allow_missing:
+            return dangling
+        return self._check(table, df, missing, f'missing {column}', WARNING, None) | dangling
+
+    def _check_empty(self, table: str, df: pd.DataFrame, column: str, key: str) -> np.ndarray:
+        return self._check(table, df, _is_empty(df[column]), f'empty {column}', WARNING, key)
+
+    def _validate_compounds(self, df: pd.DataFrame) -> pd.DataFrame:
+        invalid = self._check_key('compounds', df, 'ID')
+
+        accessions = df['CHEBI_ACCESSION'].astype(object)
+        malformed = ~accessions.str.fullmatch(CHEBI_ACCESSION_PATTERN, na=False).to_numpy(dtype=bool)
+        self._check('compounds', df, malformed, 'malformed CHEBI_ACCESSION', ERROR, 'CHEBI_ACCESSION')
+
+        numbers = pd.to_numeric(accessions.where(~malformed).str.slice(len('CHEBI:')), errors='coerce')
+        ids = df['ID'].to_numpy('float64', na_value=np.nan)
+        mismatched = ~malformed & ~np.isnan(ids) & (numbers.to_numpy('float64') != ids)
+        self._check('compounds', df, mismatched, 'CHEBI_ACCESSION not matching ID', ERROR, 'CHEBI_ACCESSION')
+
+        df = df[~(invalid | malformed | mismatched)]
+
+        dangling = self._check_reference('compounds', df, 'PARENT_ID', allow_missing=True)
+        if dangling.any():
+            df = df.assign(PARENT_ID=df['PARENT_ID'].mask(dangling))
+
+        return df
+
+    def _validate_inchis(self, df: pd.DataFrame) -> pd.DataFrame:
+        invalid = self._check_reference('inchis', df, 'CHEBI_ID')
+        invalid |= self._check_key('inchis', df, 'CHEBI_ID')
+
+        empty = self._check_empty('inchis', df, 'InChI', 'CHEBI_ID')
+        malformed = ~empty & ~df['InChI'].astype(object).str.startswith('InChI=', na=False).to_numpy(dtype=bool)
+        self._check('inchis', df, malformed, 'malformed InChI', ERROR, 'CHEBI_ID')
+
+        return df[~(invalid | empty | malformed)]
+
+    def _validate_relations(self, df: pd.DataFrame) -> pd.DataFrame:
+        invalid = self._check_key('relations', df, 'ID')
+        invalid |= self._check_reference('relations', df, 'INIT_ID')
+        invalid |= self._check_reference('relations', df, 'FINAL_ID')
+        invalid |= self._check_empty('relations', df, 'TYPE', 'ID')
+        invalid |= self._check_empty('relations', df, 'STATUS', 'ID')
+        return df[~invalid]
+
+    def _validate_names(self, df: pd.DataFrame) -> pd.DataFrame:
+        invalid = self._check_key('names', df, 'ID')
+        invalid |= self._check_reference('names', df, 'COMPOUND_ID')
+        invalid |= self._check_empty('names', df, 'NAME', 'ID')
+        return df[~invalid]
+
+    def _validate_accessions(self, df: pd.DataFrame) -> pd.DataFrame:
+        invalid = self._check_key('accessions', df, 'ID')
+        invalid |= self._check_reference('accessions', df, 'COMPOUND_ID')
+        invalid |= self._check_empty('accessions', df, 'ACCESSION_NUMBER', 'ID')
+        return df[~invalid]
+
+
+def _iter_dfs(get_df, url: Optional[str], chunksize: Optional[int]) -> Iterable[pd.DataFrame]:
+    if chunksize is None:
+        return [get_df(url=url)]
+    return get_df(url=url, chunksize=chunksize)
+
+
+def validate_release(
+        inchis_url: Optional[str] = None,
+        compounds_url: Optional[str] = None,
+        relations_url: Optional[str] = None,
+        names_url: Optional[str] = None,
+        accessions_url: Optional[str] = None,
+        chunksize: Optional[int] = None,
+) -> Validator:
+    """Validate all of the flat files, reading each of them once.
+
+    The compounds are validated first, then their parents and the references to them in the other files.
+
+    :param chunksize: Read the flat files this many rows at a time, so memory use doesn't depend on their sizes.
+     If None, each file is read at once.
+    :return: The validator, whose report has the problems and whose compound identifiers are the valid ones.
+     Filter the data frames for a load with a new :class:`Validator` with the same compound identifiers.
+    """
+    from .accession import get_accession_df
+    from .compounds import get_compounds_df
+    from ..constants import COMPOUNDS_URL
+    from .inchis import get_inchis_df
+    from .names import get_names_df
+    from .relation import get_relations_df
+
+    validator = Validator()
+    compound_ids, parents = [], []
+    for df in _iter_dfs(get_compounds_df, compounds_url, chunksize):
+        df = validator.validate('compounds', df)
+        compound_ids.append(df['ID'].to_numpy('int64'))
+        parents.append(df.loc[df['PARENT_ID'].notna(), ['ID', 'PARENT_ID']])
+
+    if not validator.report.rows['compounds']:
+        validator.report.add('compounds', 'empty file', ERROR, pd.Series([compounds_url or COMPOUNDS_URL]))
+
+    # the parents are checked once all of the compounds are read. A file with only a header yields no chunks
+    validator = Validator(
+        compound_ids=np.concatenate(compound_ids) if compound_ids else [],
+        report=validator.report,
+    )
+    if parents:
+        validator._check_reference('compounds', pd.concat(parents), 'PARENT_ID', allow_missing=True)
+
+    for table, get_df, url in [
+        ('inchis', get_inchis_df, inchis_url),
+        ('relations', get_relations_df, relations_url),
+        ('names', get_names_df, names_url),
+        ('accessions', get_accession_df, accessions_url),
+    ]:
+        for df in _iter_dfs(get_df, url, chunksize):
+            validator.validate(table, df)
+
+    if validator.report.errors or validator.report.warnings:
+        log.warning('%s', validator.report)
+    else:
+        log.info('%s', validator.report)
+
+    return validator
+
+
+def add_cli_validate(main: click.Group) -> click.Group:  # noqa: D202
+    """Add a ``validate`` command to main :mod:`click` function."""
+
+    @main.command()
+    @click.option('--chunksize', type=int, help='Read the flat files this many rows at a time to bound memory use')
+    def validate(chunksize):
+        """Validate the ChEBI flat files and report their problems."""
+        report = validate_release(chunksize=chunksize).report
+        click.echo(str(report))
+        if report.errors:
+            sys.exit(1)
+
+    return main
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+
+"""Keep several ChEBI releases side by side and switch between them atomically.
+
+Each release is loaded into its own SQLite database in :data:`bio2bel_chebi.constants.RELEASES_DIRECTORY`.
+A new release is built in a staging file and only renamed into place once it's complete, so a failed load never
+leaves a partial release behind. The current release is recorded in a small pointer file that's replaced
+atomically, so switching to a new release or rolling back to an old one is instant and never blocks readers.
+
+Readers that already opened a release keep reading it after a switch. Since a release's file never changes once
+it's in place, readers open it read-only and immutable, which skips SQLite's locking entirely. Each release also
+keeps its :class:`bio2bel_chebi.lookup.LookupStore` next to its database.
+
+.. code-block:: sh
+
+    bio2bel_chebi releases load
+    bio2bel_chebi releases list
+    bio2bel_chebi releases switch 209
+"""
+
+import logging
+import os
+import re
+import shutil
+from typing import List, Mapping, Optional
+from urllib.request import urlopen, urlretrieve
+
+import click
+
+from .compression import CODECS
+from .constants import ARCHIVE_URL_FMT, COMPOUNDS_INDEX_KEY, NAMES_INDEX_KEY, RELEASES_DIRECTORY, RELEASE_URL
+
+__all__ = [
+    'ReleaseStore',
+    'get_latest_release',
+    'get_release_urls',
+]
+
+log = logging.getLogger(__name__)
+
+#: The file names of the flat files in each release, by the keyword of :meth:`bio2bel_chebi.Manager.populate`
+FILE_NAMES = {
+    'inchis_url': 'chebiId_inchi.tsv',
+    'compounds_url': 'compounds.tsv.gz',
+    'relations_url': 'relation.tsv',
+    'names_url': 'names.tsv.gz',
+    'accessions_url': 'database_accession.tsv',
+}
+
+#: The columns the gzipped flat files are indexed by, by the keyword of :meth:`bio2bel_chebi.Manager.populate`
+INDEX_KEYS = {
+    'compounds_url': COMPOUNDS_INDEX_KEY,
+    'names_url': NAMES_INDEX_KEY,
+}
+
+_RELEASE_RE = re.compile(r'^\w[\w.-]*$')
+_DATA_VERSION_RE = re.compile(r'^data-version:\s*(\S+)')
+
+#: The name of the pointer file that holds the current release
+CURRENT_FILE_NAME = 'CURRENT'
+
+
+def get_latest_release(url: str = RELEASE_URL) -> str:
+    """Get the number of the latest ChEBI release from the ``data-version`` header of the ontology file.
+
+    Only the header is read, not the whole file.
+    """
+    with urlopen(url) as response:
+        for line in response:
+            line = line.decode('utf-8').strip()
+            match = _DATA_VERSION_RE.match(line)
+            if match:
+                return match.group(1)
+            if line.startswith('['):  # the header ends at the first stanza
+                break
+
+    raise ValueError(f'could not find the data-version in the header of {url}')
+
+
+def get_release_urls(release: str) -> Mapping[str, str]:
+    """Get the URLs of the flat files of the given release from the ChEBI archive."""
+    base = ARCHIVE_URL_FMT.format(release=release)
+    return {
+        key: f'{base}/{file_name}'
+        for key, file_name in FILE_NAMES.items()
+    }
+
+
+def _get_release_sort_key(release: str):
+    """Sort numbered releases numerically, before any others."""
+    return (0, int(release), '') if release.isdigit() else (1, 0, release)
+
+
+class ReleaseStore:
+    """A directory of ChEBI releases, each in its own SQLite database."""
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        """Initialize the store.
+
+        :param directory: The directory of the releases. Defaults to
+         :data:`bio2bel_chebi.constants.RELEASES_DIRECTORY`.
+        """
+        self.directory = directory or RELEASES_DIRECTORY
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_path(self, release: str) -> str:
+        """Get the path of the SQLite database of the release."""
+        if not _RELEASE_RE.match(release):
+            raise ValueError(f'invalid release: {release}')
+        return os.path.join(self.directory, f'chebi-{release}.db')
+
+    def get_connection(self, release: str) -> str:
+        """Get the connection string of the release."""
+        return f'sqlite:///{self.get_path(release)}'
+
+    def list_releases(self) -> List[str]:
+        """List the releases that are loaded, oldest first."""
+        releases = [
+            name[len('chebi-'):-len('.db')]
+            for name in os.listdir(self.directory)
+            if name.startswith('chebi-') and name.endswith('.db')
+        ]
+        return sorted(releases, key=_get_release_sort_key)
+
+    def has_release(self, release: str) -> bool:
+        """Check if the release is loaded."""
+        return os.path.exists(self.get_path(release))
+
+    def get_current_release(self) -> Optional[str]:
+        """Get the current release, or None if no release has been switched to yet."""
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE_NAME)) as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_current_release(self, release: str) -> None:
+        """Make the release the current one, atomically."""
+        if not self.has_release(release):
+            raise ValueError(f'release {release} is not loaded')
+
+        path = os.path.join(self.directory, CURRENT_FILE_NAME)
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as file:
+            print(release, file=file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+        log.info('switched to ChEBI release %s', release)
+
+    def get_manager(self, release: Optional[str] = None, read_only: bool = True, **kwargs):
+        """Get a manager for the release.
+
+        :param release: The release. Defaults to the current release.
+        :param read_only: Open the release read-only and immutable
+        :param kwargs: Keyword arguments passed to :class:`bio2bel_chebi.Manager`
+        :rtype: bio2bel_chebi.Manager
+        """
+        from .manager import Manager
+
+        release = release or self.get_current_release()
+        if release is None:
+            raise ValueError(f'no current release in {self.directory}')
+        if not self.has_release(release):
+            raise ValueError(f'release {release} is not loaded')
+
+        if read_only:
+            kwargs.setdefault('immutable', True)
+
+        return Manager(connection=self.get_connection(release), read_only=read_only, **kwargs)
+
+    def load_release(
+            self,
+            release: Optional[str] = None,
+            urls: Optional[Mapping[str, str]] = None,
+            switch: bool = True,
+            force: bool = False,
+            compression: Optional[str] = None,
+    ) -> str:
+        """Load a release into a staging file, then put it in place and optionally switch to it.
+
+        :param release: The release. Defaults to the latest release from :func:`get_latest_release`.
+        :param urls: The URLs (or file paths) of the flat files, keyed like the arguments of
+         :meth:`bio2bel_chebi.Manager.populate`. Defaults to downloading the release's files from the ChEBI archive.
+        :param switch: Make the release the current one once it's loaded
+        :param force: Replace the release if it's already loaded
+        :param compression: Compress the InChIs and definitions with this codec from
+         :data:`bio2bel_chebi.compression.CODECS`
+        :return: The release
+        """
+        from .manager import Manager
+
+        release = release or get_latest_release()
+        path = self.get_path(release)
+
+        if os.path.exists(path) and not force:
+            raise ValueError(f'release {release} is already loaded. Use force to replace it')
+
+        if urls is None:
+            urls = self._download(release)
+
+        staging_path = f'{path}.staging'
+        staging_lookup_path = f'{staging_path}.lookup'
+        if os.path.exists(staging_path):
+            log.warning('removing the staging file of a failed load at %s', staging_path)
+            os.remove(staging_path)
+
+        log.info('loading ChEBI release %s into %s', release, staging_path)
+        manager = Manager(connection=f'sqlite:///{staging_path}', lookup_path=staging_lookup_path)
+        try:
+            manager.create_all()
+            manager.populate(fast=True, release=release, compression=compression, **urls)
+            # bio2bel records a failed populate instead of raising, and a failed fast load leaves no chemicals
+            if not manager.is_populated():
+                raise ValueError(f'failed to load ChEBI release {release}')
+        except Exception:
+            for staging_file in (staging_path, staging_lookup_path):
+                if os.path.exists(staging_file):
+                    os.remove(staging_file)
+            raise
+        finally:
+            manager.session.remove()
+            manager.engine.dispose()
+
+        # the release's database appears last, so a loaded release always has its lookup store
+        os.replace(staging_lookup_path, f'{path}.lookup')
+        os.replace(staging_path, path)
+
+        if switch:
+            self.set_current_release(release)
+
+        return release
+
+    def _download(self, release: str) -> Mapping[str, str]:
+        """Download the flat files of the release from the ChEBI archive, unless they were already downloaded.
+
+        The gzipped files are indexed for random access and parallel reading with
+        :func:`bio2bel_chebi.parser.index.build_block_index`.
+        """
+        from .parser.index import ensure_block_index
+
+        directory = os.path.join(self.directory, release)
+        os.makedirs(directory, exist_ok=True)
+
+        rv = {}
+        for key, url in get_release_urls(release).items():
+            path = rv[key] = os.path.join(directory, FILE_NAMES[key])
+            if os.path.exists(path):
+                log.info('using cached data at %s', path)
+            else:
+                log.info('downloading %s to %s', url, path)
+                urlretrieve(url, f'{path}.tmp')
+                os.replace(f'{path}.tmp', path)
+            if key in INDEX_KEYS:
+                ensure_block_index(path, key=INDEX_KEYS[key])
+        return rv
+
+    def remove_release(self, release: str) -> None:
+        """Remove the release and its downloaded files. The current release can't be removed."""
+        if release == self.get_current_release():
+            raise ValueError(f'can not remove the current release {release}. Switch to another release first')
+
+        path = self.get_path(release)
+        os.remove(path)
+        if os.path.exists(f'{path}.lookup'):
+            os.remove(f'{path}.lookup')
+        shutil.rmtree(os.path.join(self.directory, release), ignore_errors=True)
+
+
+def add_cli_releases(main: click.Group) -> click.Group:  # noqa: D202
+    """Add a ``releases`` command group to main :mod:`click` function."""
+
+    @main.group()
+    @click.option('-d', '--directory', help='The directory of the releases')
+    @click.pass_context
+    def releases(ctx, directory):
+        """Manage side-by-side ChEBI releases."""
+        ctx.obj = ReleaseStore(directory=directory)
+
+    @releases.command(name='list')
+    @click.pass_obj
+    def list_releases(store: ReleaseStore):
+        """List the loaded releases and mark the current one."""
+        current = store.get_current_release()
+        for release in store.list_releases():
+            click.echo(f'{release}\t*' if release == current else release)
+
+    @releases.command()
+    @click.option('-r', '--release', help='The release to load. Defaults to the latest.')
+    @click.option('--no-switch', is_flag=True, help="Don't make the release the current one")
+    @click.option('--force', is_flag=True, help='Replace the release if it is already loaded')
+    @click.option('--compression', type=click.Choice(CODECS), help='Compress the InChIs and definitions')
+    @click.pass_obj
+    def load(store: ReleaseStore, release, no_switch, force, compression):
+        """Load a release next to the current one."""
+        release = store.load_release(release=release, switch=not no_switch, force=force, compression=compression)
+        click.echo(f'loaded release {release}')
+
+    @releases.command()
+    @click.argument('release')
+    @click.pass_obj
+    def switch(store: ReleaseStore, release):
+        """Switch to a loaded release."""
+        store.set_current_release(release)
+
+    @releases.command()
+    @click.argument('release')
+    @click.pass_obj
+    def remove(store: ReleaseStore, release):
+        """Remove a release."""
+        store.remove_release(release)
+
+    return main
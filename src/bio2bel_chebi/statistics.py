@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""Read the statistics table that's filled when populating, with SQLAlchemy and the models alone.
+
+Unlike the manager, this doesn't import Bio2BEL, PyBEL, or pandas, so the ``summarize`` command answers as fast as
+the database does, which is handy in cron jobs and health checks.
+"""
+
+from typing import Dict, Mapping, Optional, Union
+
+import click
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from .models import Accession, Chemical, Relation, Statistic, Synonym
+
+__all__ = [
+    'TOTAL',
+    'STATISTIC_BREAKDOWNS',
+    'get_statistics',
+    'summarize_statistics',
+    'summarize_database',
+    'echo_summary',
+]
+
+#: The category of the statistics that count whole tables, as returned by :meth:`bio2bel_chebi.Manager.summarize`
+TOTAL = 'total'
+
+#: The columns whose values are counted in the statistics, by the categories of their counts
+STATISTIC_BREAKDOWNS = {
+    'chemical_status': Chemical.status,
+    'chemical_stars': Chemical.stars,
+    'synonym_type': Synonym.type,
+    'synonym_language': Synonym.language,
+    'xref_source': Accession.source,
+    'relation_type': Relation.type,
+    'relation_status': Relation.status,
+}
+
+#: The totals in the summary that isn't detailed
+SUMMARY_KEYS = ('chemicals', 'xrefs', 'relations', 'synonyms')
+
+Summary = Mapping[str, Union[int, Mapping[str, int]]]
+
+
+def get_statistics(session: Session) -> Dict[str, Dict[str, int]]:
+    """Get the counts from the statistics table by their categories, or an empty dictionary if it wasn't filled."""
+    rv = {}
+    for category, key, count in session.query(Statistic.category, Statistic.key, Statistic.count):
+        rv.setdefault(category, {})[key] = count
+
+    if rv:
+        for category in STATISTIC_BREAKDOWNS:
+            rv.setdefault(category, {})
+    return rv
+
+
+def summarize_statistics(statistics: Mapping[str, Mapping[str, int]], detailed: bool = False) -> Summary:
+    """Summarize the counts by their categories, like :meth:`bio2bel_chebi.Manager.summarize`."""
+    if not detailed:
+        return {
+            key: statistics[TOTAL][key]
+            for key in SUMMARY_KEYS
+        }
+
+    rv = dict(statistics[TOTAL])
+    rv.update(
+        (category, counts)
+        for category, counts in statistics.items()
+        if category != TOTAL
+    )
+    return rv
+
+
+def summarize_database(connection: str, detailed: bool = False) -> Optional[Summary]:
+    """Summarize the database from its statistics table, or return None if the table wasn't filled."""
+    engine = create_engine(connection)
+    session = Session(bind=engine)
+    try:
+        statistics = get_statistics(session) if engine.has_table(Statistic.__tablename__) else {}
+    finally:
+        session.close()
+        engine.dispose()
+
+    if not statistics or not all(key in statistics.get(TOTAL, {}) for key in SUMMARY_KEYS):
+        return None
+
+    return summarize_statistics(statistics, detailed=detailed)
+
+
+def echo_summary(summary: Summary) -> None:
+    """Print a summary, with the breakdowns by their counts, most common first."""
+    for name, count in sorted(summary.items()):
+        if not isinstance(count, dict):
+            click.echo(f'{name.capitalize()}: {count}')
+            continue
+
+        click.echo(f'{name.capitalize()}:')
+        for key, value in sorted(count.items(), key=lambda item: (-item[1], item[0])):
+            click.echo(f'  {key}: {value}')
@@ -2,13 +2,343 @@
 
 """Utilities for Bio2BEL CHEBI."""
 
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from queue import Empty, Full, Queue
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from pybel.constants import IDENTIFIER, NAME, NAMESPACE
+from pybel.dsl import BaseEntity
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
 from .constants import VERSION
 
 __all__ = [
+    'LRUCache',
     'get_version',
+    'iter_chunks',
+    'iter_prefetched',
+    'get_keyset_neighbors',
+    'sort_keyset_page',
+    'get_chebi_reference',
+    'build_engine',
+    'build_session',
+    'is_sqlite',
+    'set_sqlite_fast_load_pragmas',
 ]
 
+log = logging.getLogger(__name__)
+
+X = TypeVar('X')
+
 
 def get_version() -> str:
     """Return the software version of Bio2BEL CHEBI."""
     return VERSION
+
+
+def iter_chunks(values: Iterable, size: int = 500) -> Iterable[List]:
+    """Split the values into lists of at most the given size, to keep ``IN`` clauses under the database's limits."""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class LRUCache:
+    """A thread-safe cache that keeps the most recently used values, up to a maximum number."""
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize the cache.
+
+        :param maxsize: The maximum number of values to keep
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Count the cached values."""
+        return len(self._data)
+
+    def get(self, key: Hashable, func: Callable[[], X]) -> X:
+        """Get the cached value of the key, or call the function to get it and cache it.
+
+        The function is called outside of the lock, so a slow lookup doesn't block the other threads. None isn't
+        cached, so looking up keys that don't exist doesn't evict the values of the ones that do.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+
+        value = func()
+        if value is None:
+            return value
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+        return value
+
+    def clear(self) -> None:
+        """Remove all of the cached values."""
+        with self._lock:
+            self._data.clear()
+
+
+class _Raised:
+    """Wraps an exception raised while prefetching, so it can be raised again in the consumer's thread."""
+
+    def __init__(self, exception: BaseException) -> None:
+        self.exception = exception
+
+
+_DONE = object()
+
+
+def iter_prefetched(values: Iterable[X], max_buffered: int = 2) -> Iterator[X]:
+    """Iterate over the values in a background thread, keeping at most ``max_buffered`` values ahead.
+
+    This overlaps producing the values, like reading and parsing chunks of a file, with consuming them, like
+    inserting them in the database. The producer blocks while the buffer is full, so memory stays bounded no
+    matter how fast it is. Exceptions from the producer are raised in the consumer.
+
+    :param values: The values, which are iterated in a background thread
+    :param max_buffered: The number of values to hold in the buffer
+    """
+    queue = Queue(maxsize=max_buffered)
+    stop = threading.Event()
+
+    thread = threading.Thread(target=_produce, args=(values, queue, stop), name='iter_prefetched', daemon=True)
+    thread.start()
+
+    try:
+        yield from _consume(queue, thread)
+    finally:
+        # let the producer stop if the consumer stopped early
+        stop.set()
+
+
+def _put(queue: Queue, stop: threading.Event, value) -> bool:
+    """Put the value in the queue, waiting while it's full, unless the consumer stopped. Returns if it was put."""
+    while not stop.is_set():
+        try:
+            queue.put(value, timeout=0.1)
+        except Full:
+            continue
+        return True
+    return False
+
+
+def _produce(values: Iterable[X], queue: Queue, stop: threading.Event) -> None:
+    """Put the values in the queue, followed by the end marker or the exception raised while iterating them."""
+    try:
+        for value in values:
+            if not _put(queue, stop, value):
+                return
+    except BaseException as e:
+        _put(queue, stop, _Raised(e))
+    else:
+        _put(queue, stop, _DONE)
+
+
+def _consume(queue: Queue, thread: threading.Thread) -> Iterator[X]:
+    """Get the values from the queue until the end marker, raising the exceptions from the producer."""
+    while True:
+        try:
+            value = queue.get(timeout=0.1)
+        except Empty:
+            if not thread.is_alive() and queue.empty():  # the producer stopped without finishing
+                return
+            continue
+        if value is _DONE:
+            return
+        if isinstance(value, _Raised):
+            raise value.exception
+        yield value
+
+
+def get_keyset_neighbors(
+        primary_keys: Sequence[int],
+        page_size: int,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+) -> Tuple[Optional[int], Optional[int]]:
+    """Get the ``before`` argument of the previous page and the ``after`` argument of the next page of a keyset page.
+
+    A page read after a key always has a previous page and has a next one if it's full. A page read before a key
+    always has a next page and has a previous one if it's full. The first page has no previous page.
+
+    :param primary_keys: The primary keys of the page, in ascending order
+    :param page_size: The maximum number of rows on a page
+    :param after: The primary key the page was read after
+    :param before: The primary key the page was read before
+    :return: The first primary key of the page if there's a previous page and the last if there's a next page
+    """
+    if not primary_keys:
+        return None, None
+
+    full = len(primary_keys) == page_size
+    has_previous = after is not None or (before is not None and full)
+    has_next = before is not None or full
+
+    return (
+        primary_keys[0] if has_previous else None,
+        primary_keys[-1] if has_next else None,
+    )
+
+
+def sort_keyset_page(rows: Sequence[X], before: Optional[int] = None) -> List[X]:
+    """Put the rows of a keyset page in ascending order, since pages before a key are read in descending order."""
+    if before is not None:
+        return list(rows[::-1])
+    return list(rows)
+
+
+def get_chebi_reference(node: BaseEntity) -> Optional[Tuple[str, str]]:
+    """Get a pair of ``'id'`` or ``'name'`` and the ChEBI identifier or name a BEL node references.
+
+    Nodes in the ``CHEBIID`` namespace have their identifiers as names. Nodes in the ``CHEBI`` namespace are looked
+    up by their identifiers if they have them and by their names otherwise. Returns None for other nodes.
+    """
+    namespace = node.get(NAMESPACE)
+    if not namespace:
+        return
+
+    namespace = namespace.lower()
+    if namespace == 'chebiid' and node.get(NAME) is not None:
+        return 'id', node[NAME]
+
+    if namespace == 'chebi':
+        if node.get(IDENTIFIER) is not None:
+            return 'id', node[IDENTIFIER]
+        if node.get(NAME) is not None:
+            return 'name', node[NAME]
+
+
+def is_sqlite(connection: str) -> bool:
+    """Check if the connection string is for SQLite."""
+    return make_url(connection).drivername.startswith('sqlite')
+
+
+def _get_read_only_sqlite_connection(connection: str, immutable: bool = False) -> str:
+    """Rewrite a SQLite connection string to open the file with a read-only SQLite URI."""
+    path = make_url(connection).database
+
+    if not path or path == ':memory:':
+        raise ValueError(f'can not open an in-memory SQLite database read-only: {connection}')
+
+    rv = f'sqlite:///file:{os.path.abspath(path)}?mode=ro&uri=true'
+    if immutable:
+        rv += '&immutable=1'
+    return rv
+
+
+def build_engine(
+        connection: str,
+        read_only: bool = False,
+        immutable: bool = False,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        pool_pre_ping: bool = False,
+        pool_recycle: Optional[int] = None,
+        echo: bool = False,
+) -> Engine:
+    """Build an engine with explicit connection pool configuration.
+
+    SQLite file databases are opened with a new connection per checkout, so the pool options don't apply to them.
+    Instead, writable SQLite databases are switched to write-ahead logging so readers don't block the writer
+    during population, and read-only ones are opened with ``mode=ro``.
+
+    :param connection: An RFC-1738 database connection string
+    :param read_only: Open a SQLite database read-only
+    :param immutable: Tell SQLite the read-only database file never changes, so it can skip locking entirely.
+     Only safe for snapshots that aren't written to while being served.
+    :param pool_size: The number of connections to keep open in the pool
+    :param max_overflow: The number of connections to allow above the pool size at peak load
+    :param pool_pre_ping: Test connections for liveness when they're checked out of the pool
+    :param pool_recycle: Replace connections after this many seconds
+    :param echo: Turn on echoing SQL
+    """
+    kwargs = dict(echo=echo, pool_pre_ping=pool_pre_ping)
+
+    if is_sqlite(connection):
+        if read_only:
+            connection = _get_read_only_sqlite_connection(connection, immutable=immutable)
+    else:
+        if read_only:
+            log.warning('read only is only enforced for SQLite. Use a read-only database user instead.')
+        if pool_size is not None:
+            kwargs['pool_size'] = pool_size
+        if max_overflow is not None:
+            kwargs['max_overflow'] = max_overflow
+        if pool_recycle is not None:
+            kwargs['pool_recycle'] = pool_recycle
+
+    engine = create_engine(connection, **kwargs)
+
+    if is_sqlite(connection) and not read_only and make_url(connection).database not in {None, '', ':memory:'}:
+        event.listen(engine, 'connect', _set_sqlite_wal)
+
+    _engines.add(engine)
+    return engine
+
+
+#: The engines built by :func:`build_engine` that are still in use, which are disposed in forked processes
+_engines = weakref.WeakSet()
+
+
+def _dispose_engines() -> None:
+    """Empty the pools of the engines in a forked process, since connections can't be shared across processes."""
+    for engine in list(_engines):
+        engine.dispose()
+
+
+if hasattr(os, 'register_at_fork'):
+    # registered once, so engines aren't kept alive by the hook. Forked workers (e.g., gunicorn) start with empty pools.
+    os.register_at_fork(after_in_child=_dispose_engines)
+
+
+def _set_sqlite_wal(dbapi_connection, _) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA busy_timeout=30000')
+    cursor.close()
+
+
+def set_sqlite_fast_load_pragmas(dbapi_connection, _) -> None:
+    """Trade durability for speed on a new SQLite connection while building a database from scratch.
+
+    Listen to an engine's ``connect`` event with this function. If the process dies mid-load, the database file
+    may be corrupt and must be rebuilt, so this should only be used for fresh builds.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=OFF')
+    cursor.execute('PRAGMA synchronous=OFF')
+    cursor.execute('PRAGMA cache_size=-1048576')  # negative means KiB, so 1 GiB
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.close()
+
+
+def build_session(engine: Engine, scopefunc=None) -> scoped_session:
+    """Build a scoped session with the same defaults as :func:`bio2bel.manager.connection_manager.build_engine_session`.
+
+    :param engine: An engine
+    :param scopefunc: Scoped function to pass to :func:`sqlalchemy.orm.scoped_session`. Defaults to thread-local.
+    """
+    session_maker = sessionmaker(
+        bind=engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=True,
+    )
+    return scoped_session(session_maker, scopefunc=scopefunc)
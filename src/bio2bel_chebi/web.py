@@ -6,6 +6,9 @@ use the web extra like:
 .. source-code:: sh
 
     pip install bio2bel_chebi[web]
+
+Besides the Flask-Admin interface, the application serves the read-only JSON API from :mod:`bio2bel_chebi.api`
+under ``/api``.
 """
 
 from bio2bel_chebi.manager import Manager
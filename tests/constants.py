@@ -14,8 +14,20 @@ resources_directory_path = os.path.join(HERE, 'resources')
 inchis = os.path.join(resources_directory_path, 'chebiId_inchi.tsv')
 compounds = os.path.join(resources_directory_path, 'compounds.tsv.gz')
 relations = os.path.join(resources_directory_path, 'relation.tsv')
+names = os.path.join(resources_directory_path, 'names.tsv.gz')
+accessions = os.path.join(resources_directory_path, 'database_accession.tsv')
+
+
+class TemporaryCacheClsMixin(make_temporary_cache_class_mixin(Manager)):
+    """A temporary database that also removes the lookup store built next to it."""
+
+    @classmethod
+    def tearDownClass(cls):
+        lookup_path = cls.manager.lookup_path
+        super().tearDownClass()
+        if lookup_path is not None and os.path.exists(lookup_path):
+            os.remove(lookup_path)
 
-TemporaryCacheClsMixin = make_temporary_cache_class_mixin(Manager)
 
 target_ids = {
     3558,
@@ -35,5 +47,7 @@ class PopulatedDatabaseMixin(TemporaryCacheClsMixin):
             cls.manager,
             inchis_url=inchis,
             compounds_url=compounds,
-            # relations_url=relations,
+            relations_url=relations,
+            names_url=names,
+            accessions_url=accessions,
         )
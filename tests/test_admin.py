@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from bio2bel_chebi.models import Chemical
+from bio2bel_chebi.utils import get_keyset_neighbors, sort_keyset_page
+from tests.constants import PopulatedDatabaseMixin
+
+try:
+    from flask_admin.contrib.sqla.filters import FilterEqual, FilterInList, FilterNotInList
+    from bio2bel_chebi.admin import ChemicalView, KeysetModelView
+except ImportError:  # flask-admin isn't installed or doesn't support this version of SQLAlchemy
+    KeysetModelView = None
+
+
+class TestKeysetPages(unittest.TestCase):
+    """Test linking keyset pages, which doesn't need Flask-Admin."""
+
+    def test_first_page(self):
+        self.assertEqual((None, 4), get_keyset_neighbors([1, 2, 3, 4], page_size=4))
+        self.assertEqual((None, None), get_keyset_neighbors([1, 2, 3], page_size=4), msg='only page')
+        self.assertEqual((None, None), get_keyset_neighbors([], page_size=4), msg='empty table')
+
+    def test_after(self):
+        self.assertEqual((5, 8), get_keyset_neighbors([5, 6, 7, 8], page_size=4, after=4))
+        self.assertEqual((9, None), get_keyset_neighbors([9, 10], page_size=4, after=8), msg='last page')
+        self.assertEqual((None, None), get_keyset_neighbors([], page_size=4, after=10), msg='past the end')
+
+    def test_before(self):
+        self.assertEqual((5, 8), get_keyset_neighbors([5, 6, 7, 8], page_size=4, before=9))
+        self.assertEqual((None, 3), get_keyset_neighbors([1, 2, 3], page_size=4, before=4), msg='first page')
+
+    def test_sort(self):
+        self.assertEqual([1, 2, 3], sort_keyset_page([1, 2, 3]))
+        self.assertEqual([1, 2, 3], sort_keyset_page([1, 2, 3], before=None))
+        self.assertEqual([1, 2, 3], sort_keyset_page([3, 2, 1], before=4), msg='pages before are read backwards')
+
+
+@unittest.skipIf(KeysetModelView is None, 'Flask-Admin SQLAlchemy views are not available')
+class TestAdmin(PopulatedDatabaseMixin):
+
+    def setUp(self):
+        self.app = self.manager.get_flask_admin_app()
+        self.client = self.app.test_client()
+        admin = self.app.extensions['admin'][0]
+        self.views = {
+            view.model.__name__: view
+            for view in admin._views
+            if isinstance(view, KeysetModelView)
+        }
+        self.chemical_view = self.views['Chemical']
+        self.chemical_view.page_size = 4
+
+    def _get_page(self, path):
+        with self.app.test_request_context(path):
+            count, data = self.chemical_view.get_list(0, None, None, None, [])
+            return count, [chemical.id for chemical in data], self.chemical_view.get_keyset_urls(data)
+
+    def test_views(self):
+        self.assertEqual({'Chemical', 'Relation', 'Synonym', 'Accession'}, set(self.views))
+        self.assertIsInstance(self.chemical_view, ChemicalView)
+
+    def test_keyset_pages(self):
+        ids = [chemical_id for chemical_id, in self.manager.session.query(Chemical.id).order_by(Chemical.id)]
+
+        count, first, urls = self._get_page('/chemical/')
+        self.assertEqual(self.manager.count_chemicals(), count, msg='should use the statistics table')
+        self.assertEqual(ids[:4], first)
+        self.assertIsNone(urls['previous'])
+        self.assertIn(f'after={ids[3]}', urls['next'])
+
+        _, second, urls = self._get_page(f'/chemical/?after={ids[3]}')
+        self.assertEqual(ids[4:8], second)
+        self.assertIn(f'before={ids[4]}', urls['previous'])
+
+        _, previous, urls = self._get_page(f'/chemical/?before={ids[4]}')
+        self.assertEqual(first, previous, msg='should be in ascending order')
+        self.assertIsNotNone(urls['next'])
+
+        _, last, urls = self._get_page(f'/chemical/?after={ids[7]}')
+        self.assertEqual(ids[8:], last)
+        self.assertIsNone(urls['next'])
+
+    def test_equality_filters(self):
+        for view in self.views.values():
+            for flt in view._filters:
+                self.assertIsInstance(flt, (FilterEqual, FilterInList))
+                self.assertNotIsInstance(flt, FilterNotInList)
+
+    def test_render(self):
+        for endpoint in ('chemical', 'relation', 'synonym', 'accession'):
+            response = self.client.get(f'/{endpoint}/')
+            self.assertEqual(200, response.status_code, msg=endpoint)
+
+        response = self.client.get('/chemical/?after=0')
+        self.assertEqual(200, response.status_code)
+        self.assertIn(b'before=', response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
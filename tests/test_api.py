@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import unittest
+
+from flask import Flask
+
+from bio2bel_chebi.api import register_api
+from bio2bel_chebi.utils import LRUCache
+from tests.constants import PopulatedDatabaseMixin
+
+
+class TestApi(PopulatedDatabaseMixin):
+
+    def setUp(self):
+        app = Flask(__name__)
+        register_api(app, self.manager)
+        self.client = app.test_client()
+
+    def test_get_chemical(self):
+        response = self.client.get('/api/chemical/38545')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('rosuvastatin', response.get_json()['name'])
+
+        self.assertEqual(404, self.client.get('/api/chemical/0').status_code)
+
+    def test_get_chemical_by_name(self):
+        response = self.client.get('/api/chemical/name/fluvastatin')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('38561', response.get_json()['chebi_id'])
+
+    def test_batch(self):
+        response = self.client.post('/api/batch/chemical', json=['38545', '32020', '0'])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'38545', '32020'}, set(response.get_json()))
+
+        self.assertEqual(400, self.client.post('/api/batch/chemical', json={'38545': 1}).status_code)
+
+    def test_batch_ndjson_gzip(self):
+        response = self.client.post(
+            '/api/batch/chemical?format=ndjson',
+            json=['38545', '0'],
+            headers={'Accept-Encoding': 'gzip'},
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+
+        lines = [json.loads(line) for line in gzip.decompress(response.get_data()).decode('utf-8').splitlines()]
+        self.assertEqual(['38545', '0'], [line['query'] for line in lines])
+        self.assertEqual('rosuvastatin', lines[0]['result']['name'])
+        self.assertIsNone(lines[1]['result'])
+
+    def test_xref(self):
+        response = self.client.get('/api/xref/DB01098')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['38545'], [chemical['chebi_id'] for chemical in response.get_json()])
+
+        response = self.client.get('/api/xref/DB01098?source=KEGG DRUG')
+        self.assertEqual([], response.get_json())
+
+    def test_ancestors(self):
+        response = self.client.get('/api/chemical/38545/ancestors')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['87631'], [chemical['chebi_id'] for chemical in response.get_json()])
+
+        response = self.client.get('/api/chemical/87631/descendants')
+        self.assertEqual(['32020', '38545', '87635'], [chemical['chebi_id'] for chemical in response.get_json()])
+
+        self.assertEqual(404, self.client.get('/api/chemical/0/ancestors').status_code)
+
+    def test_batch_name(self):
+        response = self.client.post('/api/batch/name', json=['fluvastatin', 'nope'])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'fluvastatin': '38561'}, {
+            name: chemical['chebi_id']
+            for name, chemical in response.get_json().items()
+        })
+
+    def test_batch_xref(self):
+        response = self.client.post('/api/batch/xref?source=DrugBank', json=['DB01098', 'D01915'])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'DB01098': ['38545']}, {
+            accession: [chemical['chebi_id'] for chemical in chemicals]
+            for accession, chemicals in response.get_json().items()
+        })
+
+    def test_cache(self):
+        self.manager.json_cache.clear()
+        self.client.get('/api/chemical/38545')
+        self.client.get('/api/chemical/0')
+        self.assertEqual(1, len(self.manager.json_cache), msg='lookups should be cached on their manager, but not 404s')
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        self.assertEqual(1, cache.get('a', lambda: 1))
+        self.assertEqual(2, cache.get('b', lambda: 2))
+        self.assertEqual(1, cache.get('a', lambda: -1), msg='should be cached')
+        self.assertEqual(3, cache.get('c', lambda: 3))
+        self.assertEqual(2, len(cache))
+        self.assertEqual(-2, cache.get('b', lambda: -2), msg='the least recently used value should be evicted')
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+    def test_none(self):
+        cache = LRUCache(2)
+        self.assertIsNone(cache.get('a', lambda: None))
+        self.assertEqual(0, len(cache), msg='missing values should not be cached')
+        self.assertEqual(1, cache.get('a', lambda: 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import unittest
+from unittest import mock
+
+from bio2bel_chebi.async_manager import AsyncManager
+from tests.constants import PopulatedDatabaseMixin
+
+
+class TestAsync(PopulatedDatabaseMixin):
+
+    def setUp(self):
+        self.async_manager = AsyncManager(manager=self.manager, max_workers=2)
+
+    def tearDown(self):
+        self.async_manager.close()
+
+    def test_get_chemical(self):
+        chemical = asyncio.run(self.async_manager.get_chemical_by_chebi_id('38545'))
+        self.assertIsNotNone(chemical)
+        self.assertEqual('rosuvastatin', chemical['name'])
+
+        self.assertIsNone(asyncio.run(self.async_manager.get_chemical_by_chebi_id('0')))
+
+    def test_batch(self):
+        chemicals = asyncio.run(self.async_manager.get_chemicals_by_chebi_ids(['38545', '32020', '0']))
+        self.assertEqual({'38545', '32020'}, set(chemicals))
+        self.assertEqual('pitavastatin', chemicals['32020']['name'])
+
+    def test_coalesce(self):
+        async def main():
+            return await asyncio.gather(*(
+                self.async_manager.get_chemical_by_chebi_id('32020')
+                for _ in range(5)
+            ))
+
+        with mock.patch.object(self.manager, 'get_chemical_by_chebi_id', wraps=self.manager.get_chemical_by_chebi_id) as m:
+            results = asyncio.run(main())
+
+        self.assertEqual(1, m.call_count)
+        self.assertEqual(5, len(results))
+        self.assertTrue(all(result['name'] == 'pitavastatin' for result in results))
+        self.assertEqual({}, self.async_manager._in_flight)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import networkx as nx
+import pybel
+from pybel import BELGraph
+from pybel.dsl import Abundance, Protein
+
+from bio2bel_chebi.batch import annotate_graphs, build_snapshot, get_chebi_nodes
+from bio2bel_chebi.models import Chemical
+from tests.constants import PopulatedDatabaseMixin
+
+hmgcr = Protein(namespace='hgnc', name='HMGCR')
+secondary = Abundance(namespace='chebi', identifier='64906')
+fluvastatin = Abundance(namespace='chebi', name='fluvastatin')
+rosuvastatin = Abundance(namespace='chebiid', name='38545')
+unknown = Abundance(namespace='chebi', name='not a chemical')
+
+anticholesteremic_drug = Abundance(namespace='chebi', name='anticholesteremic drug', identifier='35821')
+
+
+def _make_graphs():
+    first = BELGraph(name='first')
+    first.add_decreases(secondary, hmgcr, citation='1', evidence='e')
+    first.add_decreases(unknown, hmgcr, citation='1', evidence='e')
+
+    second = BELGraph(name='second')
+    second.add_decreases(fluvastatin, hmgcr, citation='2', evidence='e')
+    second.add_decreases(rosuvastatin, hmgcr, citation='2', evidence='e')
+
+    return [first, second]
+
+
+class TestBatch(PopulatedDatabaseMixin):
+
+    def test_get_chebi_nodes(self):
+        first, second = _make_graphs()
+        self.assertEqual({secondary, unknown}, get_chebi_nodes(first))
+        self.assertEqual({fluvastatin, rosuvastatin}, get_chebi_nodes(second))
+
+    def test_snapshot(self):
+        snapshot = build_snapshot(self.manager, [secondary, fluvastatin, rosuvastatin, unknown])
+        self.assertEqual(3, len(snapshot), msg='unknown chemicals should be skipped')
+        self.assertEqual(anticholesteremic_drug, snapshot.nodes[secondary], msg='should resolve the parent')
+        self.assertEqual('38561', snapshot.nodes[fluvastatin].identifier)
+        self.assertEqual('rosuvastatin', snapshot.nodes[rosuvastatin].name)
+
+    def test_hierarchy_edges(self):
+        chemical = self.manager.session.query(Chemical).filter(Chemical.chebi_id == '64906').one()
+        self.assertEqual(
+            {chemical.id: ((secondary, anticholesteremic_drug),)},
+            self.manager.get_hierarchy_edges([chemical]),
+        )
+
+    def _check(self, graphs):
+        first, second = graphs
+        self.assertEqual({anticholesteremic_drug, unknown, hmgcr}, set(first))
+        self.assertEqual(
+            {Abundance(namespace='chebi', name='fluvastatin', identifier='38561'),
+             Abundance(namespace='chebi', name='rosuvastatin', identifier='38545'),
+             Abundance(namespace='chebi', name='statin', identifier='87631'),
+             hmgcr},
+            set(second),
+        )
+        self.assertEqual([], list(nx.selfloop_edges(first)))
+
+    def test_annotate_in_process(self):
+        graphs = _make_graphs()
+        results = list(annotate_graphs(self.manager, graphs, processes=1))
+        self.assertEqual(graphs, [result.graph for result in results], msg='should annotate in place')
+        self._check(graphs)
+
+    def test_annotate_in_pool(self):
+        results = list(annotate_graphs(self.manager, _make_graphs(), processes=2))
+        self.assertTrue(all(0 <= result.seconds for result in results))
+        self._check([result.graph for result in results])
+
+    def test_annotate_paths(self):
+        directory = tempfile.mkdtemp()
+        try:
+            paths = []
+            for graph in _make_graphs():
+                path = os.path.join(directory, f'{graph.name}.json')
+                pybel.to_json_path(graph, path)
+                paths.append(path)
+
+            results = list(annotate_graphs(self.manager, paths, processes=2))
+        finally:
+            shutil.rmtree(directory)
+
+        self._check([result.graph for result in results])
+
+
+if __name__ == '__main__':
+    unittest.main()
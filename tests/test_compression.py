@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from bio2bel_chebi import Manager
+from bio2bel_chebi.compression import TextCodec, decompress, train_dictionary
+from bio2bel_chebi.models import Chemical
+from tests.constants import TemporaryCacheClsMixin, accessions, compounds, inchis, names, relations
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ATORVASTATIN = (
+    'InChI=1S/C33H35FN2O5/c1-21(2)31-30(33(41)35-25-11-7-4-8-12-25)29(22-9-5-3-6-10-22)32(23-13-15-24(34)'
+    '16-14-23)36(31)18-17-26(37)19-27(38)20-28(39)40/h3-16,21,26-27,37-38H,17-20H2,1-2H3,(H,35,41)(H,39,40)'
+    '/t26-,27-/m1/s1'
+)
+FLUVASTATIN = (
+    'InChI=1S/C24H26FNO4/c1-15(2)26-21-6-4-3-5-20(21)24(16-7-9-17(25)10-8-16)22(26)12-11-18(27)13-19(28)'
+    '14-23(29)30/h3-12,15,18-19,27-28H,13-14H2,1-2H3,(H,29,30)/b12-11+'
+)
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_zlib(self):
+        dictionary = train_dictionary([ATORVASTATIN, FLUVASTATIN] * 10, 'zlib')
+        self.assertIsNotNone(dictionary)
+
+        codec = TextCodec('zlib', dictionary=dictionary)
+        plain = TextCodec('zlib')
+        compressed = codec.encode(FLUVASTATIN)
+        self.assertIsInstance(compressed, bytes)
+        self.assertLess(len(compressed), len(plain.encode(FLUVASTATIN)), msg='the dictionary should help')
+        self.assertEqual(FLUVASTATIN, decompress(compressed))
+        self.assertEqual(compressed, codec.encode(FLUVASTATIN), msg='should be deterministic')
+
+    def test_incompressible(self):
+        self.assertEqual('CHEBI', TextCodec('zlib').encode('CHEBI'))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            TextCodec('lzma')
+
+    @unittest.skipIf(zstandard is None, 'zstandard is not installed')
+    def test_zstd(self):
+        codec = TextCodec('zstd', dictionary=train_dictionary([ATORVASTATIN, FLUVASTATIN] * 10, 'zlib'))
+        compressed = codec.encode(ATORVASTATIN)
+        self.assertIsInstance(compressed, bytes)
+        self.assertEqual(ATORVASTATIN, decompress(compressed))
+
+
+class TestCompressedLoad(TemporaryCacheClsMixin):
+    """Test that compressed InChIs and definitions are stored as blobs and decoded when read."""
+
+    @classmethod
+    def populate(cls):
+        cls.manager.populate(
+            inchis_url=inchis,
+            compounds_url=compounds,
+            relations_url=relations,
+            names_url=names,
+            accessions_url=accessions,
+            compression='zlib',
+        )
+
+    def test_stored_compressed(self):
+        types = dict(self.manager.session.execute(
+            'SELECT id, typeof(inchi) FROM chebi_chemical WHERE inchi IS NOT NULL',
+        ).fetchall())
+        self.assertEqual({'blob'}, set(types.values()))
+        self.assertEqual(3, self.manager.count_inchis())
+        self.assertEqual({'definition', 'inchi'}, set(self.manager.codecs))
+
+    def test_decoded(self):
+        chemical = self.manager.get_chemical_by_chebi_id('32020')
+        self.assertTrue(chemical.inchi.startswith('InChI=1S/C25H24FNO4/'))
+        self.assertTrue(chemical.definition.startswith('A dihydroxy monocarboxylic acid that is (6E)-7-[2-cyclopropyl'))
+
+        self.assertEqual(chemical, self.manager.get_chemical_by_inchi(chemical.inchi))
+
+    def test_reopen(self):
+        manager = Manager(connection=str(self.manager.engine.url))
+        self.assertEqual({'definition', 'inchi'}, set(manager.codecs))
+        inchi, = manager.session.query(Chemical.inchi).filter(Chemical.chebi_id == '32020').one()
+        self.assertTrue(inchi.startswith('InChI=1S/C25H24FNO4/'))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.manager._populate_original(compression='lzma')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import os
+import tempfile
+import unittest
+import weakref
+
+from sqlalchemy.exc import OperationalError
+
+from bio2bel_chebi import Manager
+from bio2bel_chebi.models import Chemical, Compression
+from bio2bel_chebi.utils import _dispose_engines, _engines, build_engine
+from tests.constants import PopulatedDatabaseMixin
+
+
+class TestReader(PopulatedDatabaseMixin):
+
+    def test_read_only(self):
+        reader = self.manager.get_reader(pool_pre_ping=True)
+        self.assertTrue(reader.read_only)
+        self.assertIn('mode=ro', str(reader.engine.url))
+
+        chemical = reader.get_chemical_by_chebi_id('38545')
+        self.assertIsNotNone(chemical)
+        self.assertEqual('rosuvastatin', chemical.name)
+
+        reader.session.add(Chemical(chebi_id='1'))
+        with self.assertRaises(OperationalError):
+            reader.session.commit()
+        reader.session.rollback()
+
+        self.assertIsNone(self.manager.get_chemical_by_chebi_id('1'))
+
+
+class TestOldDatabase(unittest.TestCase):
+    """Test opening a database built before the compression table was added, which a reader can't create."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        manager = Manager(connection=f'sqlite:///{self.path}', lookup_path=f'{self.path}.lookup')
+        Compression.__table__.drop(manager.engine)
+        manager.engine.execute(Chemical.__table__.insert(), dict(id=38545, chebi_id='38545', name='rosuvastatin'))
+        manager.engine.dispose()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_read_only(self):
+        manager = Manager(connection=f'sqlite:///{self.path}', read_only=True, lookup_path=f'{self.path}.lookup')
+        self.assertEqual({}, manager.codecs)
+        self.assertEqual('rosuvastatin', manager.get_chemical_by_chebi_id('38545').name)
+        self.assertNotIn(Compression.__tablename__, manager.engine.table_names(), msg='should not be created')
+        manager.engine.dispose()
+
+
+class TestEngines(unittest.TestCase):
+
+    def test_not_kept_alive(self):
+        engine = build_engine('sqlite://', pool_pre_ping=True)
+        self.assertIn(engine, _engines)
+        _dispose_engines()  # what a forked process runs
+
+        reference = weakref.ref(engine)
+        del engine
+        gc.collect()
+        self.assertIsNone(reference(), msg='engines should not be kept alive after they are used')
+
+
+if __name__ == '__main__':
+    unittest.main()
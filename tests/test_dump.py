@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from bio2bel_chebi.dump import JSONLD_CONTEXT, dump_chemicals, iter_chemical_records
+from tests.constants import PopulatedDatabaseMixin
+
+
+class TestDump(PopulatedDatabaseMixin):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_records(self):
+        records = {record['chebi_id']: record for record in iter_chemical_records(self.manager)}
+        self.assertEqual(9, len(records))
+
+        rosuvastatin = records['38545']
+        chemical = self.manager.get_chemical_by_chebi_id('38545')
+        self.assertEqual(chemical.to_json(), {key: rosuvastatin[key] for key in chemical.to_json()})
+        self.assertIsNone(rosuvastatin['parent'])
+        self.assertIn({'source': 'DrugBank', 'type': 'DrugBank accession', 'accession': 'DB01098'},
+                      rosuvastatin['xrefs'])
+        self.assertEqual({synonym.name for synonym in chemical.synonyms},
+                         {synonym['name'] for synonym in rosuvastatin['synonyms']})
+
+        self.assertEqual('35821', records['64906']['parent'])
+        self.assertEqual([], records['64906']['synonyms'])
+
+    def test_ndjson(self):
+        path = os.path.join(self.directory, 'chebi.jsonl.gz')
+        self.assertEqual(9, dump_chemicals(self.manager, path))
+
+        with gzip.open(path, 'rt') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(list(iter_chemical_records(self.manager)), records)
+
+    def test_jsonld(self):
+        path = os.path.join(self.directory, 'chebi.jsonld')
+        self.assertEqual(9, dump_chemicals(self.manager, path, fmt='jsonld'))
+
+        with open(path) as file:
+            document = json.load(file)
+        self.assertEqual(JSONLD_CONTEXT, document['@context'])
+        nodes = {node['@id']: node for node in document['@graph']}
+        self.assertEqual(9, len(nodes))
+        self.assertEqual('CHEBI:35821', nodes['CHEBI:64906']['parent'])
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            dump_chemicals(self.manager, os.path.join(self.directory, 'chebi.xml'), fmt='xml')
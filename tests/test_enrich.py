@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from pybel import BELGraph
+from pybel.constants import IS_A, RELATION
+from pybel.dsl import Abundance, Protein
+
+from bio2bel_chebi.models import Chemical, Relation
+from tests.constants import PopulatedDatabaseMixin
+
+hmgcr = Protein(namespace='hgnc', name='HMGCR')
+
+rosuvastatin = Abundance(namespace='chebi', name='rosuvastatin', identifier='38545')
+pitavastatin = Abundance(namespace='chebi', name='pitavastatin', identifier='32020')
+fluvastatin = Abundance(namespace='chebi', name='fluvastatin', identifier='38561')
+statin = Abundance(namespace='chebi', name='statin', identifier='87631')
+synthetic_statin = Abundance(namespace='chebi', name='statin (synthetic)', identifier='87635')
+organooxygen_compound = Abundance(namespace='chebi', name='organooxygen compound', identifier='36963')
+organic_molecular_entity = Abundance(namespace='chebi', name='organic molecular entity', identifier='50860')
+anticholesteremic_drug = Abundance(namespace='chebi', name='anticholesteremic drug', identifier='35821')
+drug = Abundance(namespace='chebi', name='drug', identifier='23888')
+secondary = Abundance(namespace='chebiid', name='64906')
+secondary_chemical = Abundance(namespace='chebi', identifier='64906')
+
+statin_edges = {
+    (statin, organooxygen_compound),
+    (organooxygen_compound, organic_molecular_entity),
+}
+
+
+def _get_is_a_edges(graph: BELGraph):
+    return {
+        (u, v)
+        for u, v, data in graph.edges(data=True)
+        if data[RELATION] == IS_A
+    }
+
+
+class TestEnrich(PopulatedDatabaseMixin):
+    """Test enriching a graph with a hierarchy that has shared ancestors, a diamond, and a secondary chemical."""
+
+    @classmethod
+    def populate(cls):
+        super().populate()
+
+        cls.manager.session.add_all([
+            Chemical(id=36963, chebi_id='36963', name='organooxygen compound'),
+            Chemical(id=50860, chebi_id='50860', name='organic molecular entity'),
+            Chemical(id=23888, chebi_id='23888', name='drug'),
+        ])
+        cls.manager.session.add_all([
+            Relation(type='is_a', status='C', source_id=source_id, target_id=target_id)
+            for target_id, source_id in [
+                (38545, 87635),  # rosuvastatin is a synthetic statin, which is also a statin
+                (87631, 36963),
+                (36963, 50860),
+                (35821, 23888),
+            ]
+        ])
+        cls.manager.session.commit()
+
+    def _make_graph(self) -> BELGraph:
+        graph = BELGraph()
+        for node in (rosuvastatin, pitavastatin, secondary, Abundance(namespace='chebi', name='not a chemical')):
+            graph.add_decreases(node, hmgcr, citation='1', evidence='e')
+        return graph
+
+    def test_enrich(self):
+        graph = self._make_graph()
+        self.manager.enrich_chemical_hierarchy(graph)
+
+        self.assertEqual(
+            {
+                (rosuvastatin, statin),
+                (rosuvastatin, synthetic_statin),
+                (synthetic_statin, statin),
+                (pitavastatin, statin),
+                (secondary, anticholesteremic_drug),
+                (anticholesteremic_drug, drug),
+            } | statin_edges,
+            _get_is_a_edges(graph),
+        )
+        self.assertEqual(1, graph.number_of_edges(statin, organooxygen_compound), msg='should only add shared edges once')
+
+    def test_enrich_twice(self):
+        graph = self._make_graph()
+        self.manager.enrich_chemical_hierarchy(graph)
+        number_of_edges = graph.number_of_edges()
+        self.manager.enrich_chemical_hierarchy(graph)
+        self.assertEqual(number_of_edges, graph.number_of_edges())
+
+    def test_enrich_without_parents(self):
+        graph = self._make_graph()
+        self.manager.enrich_chemical_hierarchy(graph, include_parents=False)
+        self.assertNotIn((secondary, anticholesteremic_drug), _get_is_a_edges(graph))
+
+    def test_enrich_other_relations(self):
+        """Test that only ``is_a`` relations are followed, and not ``has_role``."""
+        graph = BELGraph()
+        graph.add_node_from_data(fluvastatin)
+
+        self.manager.enrich_chemical_hierarchy(graph)
+        self.assertEqual(0, graph.number_of_edges())
+
+    def test_enrich_by_name(self):
+        """Test that the first edge starts at the node as it's written in the graph."""
+        node = Abundance(namespace='chebi', name='pitavastatin')
+        graph = BELGraph()
+        graph.add_node_from_data(node)
+
+        self.manager.enrich_chemical_hierarchy(graph)
+        self.assertEqual({(node, statin)} | statin_edges, _get_is_a_edges(graph))
+
+    def test_hierarchy_edges(self):
+        chemicals = self.manager.get_chemicals_by_chebi_ids(['38545', '32020', '64906'], collapse_parents=False)
+        hierarchy = self.manager.get_hierarchy_edges(chemicals.values())
+
+        self.assertEqual(
+            ((secondary_chemical, anticholesteremic_drug), (anticholesteremic_drug, drug)),
+            hierarchy[64906],
+        )
+        self.assertEqual({(pitavastatin, statin)} | statin_edges, set(hierarchy[32020]))
+        self.assertLessEqual(statin_edges, set(hierarchy[38545]))
+
+
+if __name__ == '__main__':
+    unittest.main()
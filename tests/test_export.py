@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+import networkx as nx
+
+from bio2bel_chebi.export import get_csr, read_csr, write_csr, write_edgelist, write_graphml, write_nodelink
+from tests.constants import PopulatedDatabaseMixin
+
+try:
+    import scipy
+except ImportError:
+    scipy = None
+
+is_a_edges = {(87635, 87631), (38545, 87631), (32020, 87631)}
+
+
+class TestExport(PopulatedDatabaseMixin):
+
+    def test_edgelist(self):
+        file = StringIO()
+        write_edgelist(self.manager, file, relation_types=['is_a'])
+        lines = file.getvalue().strip().split('\n')
+        self.assertEqual('subject\trelation\tobject', lines[0])
+        self.assertEqual(
+            {(subject, obj) for subject, obj in is_a_edges},
+            {(int(subject), int(obj)) for subject, _, obj in (line.split('\t') for line in lines[1:])},
+        )
+
+    def test_csr(self):
+        arrays = get_csr(self.manager)
+        self.assertEqual([32020, 35821, 38545, 38561, 87631, 87635], arrays['nodes'].tolist())
+        self.assertEqual(4, len(arrays['indices']))
+        self.assertEqual(len(arrays['nodes']) + 1, len(arrays['indptr']))
+
+    @unittest.skipIf(scipy is None, 'scipy is not installed')
+    def test_read_csr(self):
+        fd, path = tempfile.mkstemp(suffix='.npz')
+        os.close(fd)
+        try:
+            write_csr(self.manager, path)
+            matrix, nodes = read_csr(path, relation_type='is_a')
+        finally:
+            os.remove(path)
+
+        index = {node: i for i, node in enumerate(nodes.tolist())}
+        self.assertEqual(3, matrix.nnz)
+        for subject, obj in is_a_edges:
+            self.assertEqual(1, matrix[index[subject], index[obj]])
+
+    def test_graphml(self):
+        file = StringIO()
+        write_graphml(self.manager, file)
+        graph = nx.read_graphml(StringIO(file.getvalue()), node_type=int)
+        self.assertEqual(6, graph.number_of_nodes())
+        self.assertEqual(4, graph.number_of_edges())
+        self.assertEqual('statin', graph.nodes[87631]['name'])
+
+    def test_nodelink(self):
+        file = StringIO()
+        write_nodelink(self.manager, file, relation_types=['is_a'])
+        data = json.loads(file.getvalue())
+        self.assertEqual(4, len(data['nodes']))
+        self.assertEqual(is_a_edges, {(link['source'], link['target']) for link in data['links']})
+
+
+if __name__ == '__main__':
+    unittest.main()
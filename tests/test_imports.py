@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+import time
+import unittest
+
+from bio2bel_chebi.cli import COMMANDS
+
+#: Importing the package itself should be nearly free, in seconds
+IMPORT_TIME_BUDGET = 0.25
+
+#: Running ``python -m bio2bel_chebi --help``, interpreter startup included, in seconds
+HELP_TIME_BUDGET = 1.0
+
+
+def _run(*args: str) -> str:
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stderr
+
+
+def _get_imported(importtime: str):
+    """Get a dictionary from the imported modules' names to their cumulative import times in seconds."""
+    rv = {}
+    for line in importtime.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        rv[name.strip()] = int(cumulative) / 1e6
+    return rv
+
+
+class TestImports(unittest.TestCase):
+
+    def test_package(self):
+        imported = _get_imported(_run('-c', 'import bio2bel_chebi'))
+        self.assertLess(imported['bio2bel_chebi'], IMPORT_TIME_BUDGET)
+        for name in ('bio2bel', 'pybel', 'pandas', 'sqlalchemy', 'flask'):
+            self.assertNotIn(name, imported)
+
+    def test_manager(self):
+        imported = _get_imported(_run('-c', 'from bio2bel_chebi import Manager'))
+        self.assertNotIn('flask', imported)
+        self.assertFalse(any(name.startswith('bio2bel_chebi.parser') for name in imported))
+
+    def test_help(self):
+        start = time.time()
+        subprocess.run([sys.executable, '-m', 'bio2bel_chebi', '--help'], stdout=subprocess.PIPE, check=True)
+        self.assertLess(time.time() - start, HELP_TIME_BUDGET)
+
+        imported = _get_imported(_run('-m', 'bio2bel_chebi', '--help'))
+        for name in ('bio2bel', 'pybel', 'pandas', 'bio2bel_chebi.manager'):
+            self.assertNotIn(name, imported)
+
+    def test_commands(self):
+        """Test the commands listed without importing the manager are the ones it has."""
+        from bio2bel_chebi.manager import Manager
+
+        commands = Manager.get_cli().commands
+        self.assertEqual(set(commands), set(COMMANDS))
+        for name, command in commands.items():
+            self.assertEqual(command.get_short_help_str(limit=1000), COMMANDS[name], msg=name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from bio2bel_chebi.constants import COMPOUNDS_DTYPES
+from bio2bel_chebi.parser.compounds import get_compounds_df, get_compounds_df_by_ids
+from bio2bel_chebi.parser.index import BlockIndex, build_block_index, get_index_path, iter_indexed_chunks
+from bio2bel_chebi.parser.names import get_names_df, get_names_df_by_compound_ids
+from tests.constants import TemporaryCacheClsMixin, accessions, compounds, inchis, names, relations
+
+
+def _concat(dfs):
+    return pd.concat(list(dfs), ignore_index=True)
+
+
+def _assert_same_rows(expected, actual):
+    """Check the values are the same, since concatenated chunks can lose categorical types."""
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False, check_categorical=False)
+
+
+class TestBlockIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.compounds = os.path.join(self.directory, 'compounds.tsv.gz')
+        self.names = os.path.join(self.directory, 'names.tsv.gz')
+        shutil.copy(compounds, self.compounds)
+        shutil.copy(names, self.names)
+        self.compounds_index = build_block_index(self.compounds, 'ID', block_size=500)
+        self.names_index = build_block_index(self.names, 'COMPOUND_ID', block_size=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_blocks(self):
+        self.assertLess(1, len(self.compounds_index))
+        self.assertEqual(9, self.compounds_index.rows.sum())
+        self.assertEqual(10, self.names_index.rows.sum())
+        self.assertEqual(self.compounds_index.size, BlockIndex.load(self.compounds).size)
+
+    def test_still_gzip(self):
+        pd.testing.assert_frame_equal(
+            get_compounds_df(url=compounds, cache=False),
+            get_compounds_df(url=self.compounds, cache=False),
+        )
+
+    def test_chunks(self):
+        chunks = list(get_names_df(url=self.names, chunksize=2))
+        self.assertLess(1, len(chunks))
+        _assert_same_rows(get_names_df(url=names, cache=False), _concat(chunks))
+
+        chunks = iter_indexed_chunks(self.compounds, COMPOUNDS_DTYPES, 1, workers=2, na_values=['null'])
+        _assert_same_rows(get_compounds_df(url=compounds, cache=False), _concat(chunks))
+
+    def test_read_rows(self):
+        df = get_compounds_df_by_ids([38545, 32020, 1], url=self.compounds)
+        self.assertEqual({38545, 32020}, set(df['ID']))
+        self.assertEqual({'rosuvastatin', 'pitavastatin'}, set(df['NAME']))
+        self.assertEqual(str(COMPOUNDS_DTYPES['STAR']), str(df['STAR'].dtype))
+
+        df = get_names_df_by_compound_ids([38561], url=self.names)
+        self.assertEqual({'fluvastatin', 'fluvastatina'}, set(df['NAME']))
+
+        self.assertLess(len(self.names_index.get_blocks([38561])), len(self.names_index))
+
+    def test_outdated(self):
+        shutil.copy(names, self.names)
+        self.assertIsNone(BlockIndex.load(self.names))
+        self.assertTrue(os.path.exists(get_index_path(self.names)))
+
+        chunks = list(get_names_df(url=self.names, chunksize=2))
+        self.assertEqual(5, len(chunks), msg='should fall back to reading the whole file')
+
+        with self.assertRaises(ValueError):
+            get_names_df_by_compound_ids([38561], url=self.names)
+
+
+class TestIndexedLoad(TemporaryCacheClsMixin):
+    """Test that populating in chunks from indexed files gives the same database."""
+
+    @classmethod
+    def populate(cls):
+        cls.directory = tempfile.mkdtemp()
+        indexed_compounds = os.path.join(cls.directory, 'compounds.tsv.gz')
+        indexed_names = os.path.join(cls.directory, 'names.tsv.gz')
+        shutil.copy(compounds, indexed_compounds)
+        shutil.copy(names, indexed_names)
+        build_block_index(indexed_compounds, 'ID', block_size=200)
+        build_block_index(indexed_names, 'COMPOUND_ID', block_size=100)
+
+        cls.manager.populate(
+            inchis_url=inchis,
+            compounds_url=indexed_compounds,
+            relations_url=relations,
+            names_url=indexed_names,
+            accessions_url=accessions,
+            chunksize=2,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.directory)
+
+    def test_counts(self):
+        self.assertEqual(9, self.manager.count_chemicals())
+        self.assertEqual(7, self.manager.count_parent_chemicals())
+        self.assertEqual(9, self.manager.count_synonyms())
+
+    def test_get_compound(self):
+        model = self.manager.get_chemical_by_chebi_id('38561')
+        self.assertEqual('fluvastatin', model.name)
+        self.assertEqual({'fluvastatin', 'fluvastatina'}, {synonym.name for synonym in model.synonyms})
+
+
+if __name__ == '__main__':
+    unittest.main()
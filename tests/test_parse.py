@@ -1,9 +1,45 @@
 # -*- coding: utf-8 -*-
 
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
+from unittest import mock
 
-from bio2bel_chebi.models import Chemical
-from tests.constants import PopulatedDatabaseMixin
+from click.testing import CliRunner
+from sqlalchemy import event, inspect
+
+from bio2bel_chebi.cli import main
+from bio2bel_chebi.constants import COMPOUNDS_DTYPES, RELATIONS_DTYPES
+from bio2bel_chebi.models import CHEMICAL_TABLE_NAME, Chemical
+from bio2bel_chebi.parser.compounds import get_compounds_df
+from bio2bel_chebi.parser.relation import get_relations_df
+from bio2bel_chebi.parser.utils import read_chebi_tsv
+from bio2bel_chebi.statistics import summarize_database
+from bio2bel_chebi.utils import iter_prefetched
+from tests.constants import (
+    PopulatedDatabaseMixin, TemporaryCacheClsMixin, accessions, compounds, inchis, names, relations,
+)
+
+
+class TestParsers(unittest.TestCase):
+
+    def test_compounds_schema(self):
+        df = get_compounds_df(url=compounds)
+        self.assertEqual(list(COMPOUNDS_DTYPES), list(df.columns))
+        self.assertEqual('Int64', str(df['PARENT_ID'].dtype))
+        self.assertEqual('category', str(df['STATUS'].dtype))
+        self.assertEqual(2, df['PARENT_ID'].notna().sum())
+
+    def test_relations_schema(self):
+        df = get_relations_df(url=relations)
+        self.assertEqual(list(RELATIONS_DTYPES), list(df.columns))
+        self.assertEqual(20, len(df.index))
+        self.assertEqual({'has_functional_parent', 'is_a', 'is_conjugate_base_of', 'is_conjugate_acid_of', 'has_role'},
+                         set(df['TYPE'].cat.categories))
 
 
 class TestParse(PopulatedDatabaseMixin):
@@ -26,9 +62,375 @@ class TestParse(PopulatedDatabaseMixin):
     def test_count_inchis(self):
         self.assertEqual(3, self.manager.count_inchis())
 
-    @unittest.skip
+    def test_synonyms(self):
+        self.assertEqual(9, self.manager.count_synonyms(), msg='empty names should be skipped')
+        model = self.manager.get_chemical_by_chebi_id('38561')
+        self.assertEqual({('fluvastatin', 'en'), ('fluvastatina', 'es')},
+                         {(synonym.name, synonym.language) for synonym in model.synonyms})
+
+    def test_xrefs(self):
+        self.assertEqual(7, self.manager.count_xrefs())
+        chemicals = self.manager.get_chemicals_by_xref('DB01098', source='DrugBank')
+        self.assertEqual(['38545'], [chemical.chebi_id for chemical in chemicals])
+
+    def test_get_chemicals_by_chebi_ids(self):
+        """Test the parents of secondary identifiers are loaded in the same query."""
+        statements = []
+
+        def _record(connection, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.manager.engine, 'before_cursor_execute', _record)
+        try:
+            self.manager.session.expire_all()
+            chemicals = self.manager.get_chemicals_by_chebi_ids(['64906', '503465', '38545', '0'])
+            self.assertEqual(
+                {'64906': '35821', '503465': '3558', '38545': '38545'},
+                {chebi_id: chemical.chebi_id for chebi_id, chemical in chemicals.items()},
+            )
+        finally:
+            event.remove(self.manager.engine, 'before_cursor_execute', _record)
+        self.assertEqual(1, len(statements), msg=statements)
+
     def test_relation_count(self):
-        self.assertEqual(16, self.manager.count_relations())
+        self.assertEqual(4, self.manager.count_relations(), msg='relations with unknown chemicals should be dropped')
+
+    def test_hierarchy(self):
+        statin = self.manager.get_chemical_by_chebi_id('87631')
+        self.assertEqual(
+            ['32020', '38545', '87635'],
+            [chemical.chebi_id for chemical in self.manager.get_descendants(statin)],
+        )
+
+        rosuvastatin = self.manager.get_chemical_by_chebi_id('38545')
+        self.assertEqual(['87631'], [chemical.chebi_id for chemical in self.manager.get_ancestors(rosuvastatin)])
+
+    def test_statistics(self):
+        self.assertEqual(self.manager.count_statistics(), self.manager.get_statistics(), msg='should be stored')
+
+        summary = self.manager.summarize(detailed=True)
+        self.assertEqual(9, summary['chemicals'])
+        self.assertEqual(7, summary['parent_chemicals'])
+        self.assertEqual(3, summary['inchis'])
+        self.assertEqual({'BRAND NAME': 3, 'INN': 3, 'IUPAC NAME': 1, 'SYNONYM': 2}, summary['synonym_type'])
+        self.assertEqual({'en': 8, 'es': 1}, summary['synonym_language'])
+        self.assertEqual({'CAS': 1, 'DrugBank': 4, 'KEGG DRUG': 2}, summary['xref_source'])
+        self.assertEqual({'has_role': 1, 'is_a': 3}, summary['relation_type'])
+        self.assertEqual({'3': 9}, summary['chemical_stars'])
+
+        self.assertEqual(dict(chemicals=9, xrefs=7, relations=4, synonyms=9), self.manager.summarize())
+
+    def test_summarize_database(self):
+        """Test the statistics table is summarized without the manager, like by the manager."""
+        self.assertEqual(self.manager.summarize(), summarize_database(self.connection))
+        self.assertEqual(self.manager.summarize(detailed=True), summarize_database(self.connection, detailed=True))
+
+        with mock.patch('bio2bel_chebi.manager.Manager.__init__') as init:
+            result = CliRunner().invoke(main, ['-c', self.connection, 'summarize', '--detailed'])
+        self.assertEqual(0, result.exit_code, msg=result.output)
+        init.assert_not_called()
+        self.assertIn('Chemicals: 9\n', result.output)
+        self.assertIn('Synonym_language:\n  en: 8\n  es: 1\n', result.output)
+
+    def test_summarize_database_empty(self):
+        """Test a database without the statistics table isn't summarized, so the manager counts it instead."""
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            self.assertIsNone(summarize_database('sqlite:///' + path))
+        finally:
+            os.remove(path)
+
+
+class TestParsedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'relation.tsv')
+        self.cache_directory = os.path.join(self.directory, 'parsed')
+        shutil.copy(relations, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _read(self, path=None):
+        return read_chebi_tsv(path or self.path, RELATIONS_DTYPES, cache_directory=self.cache_directory)
+
+    def _list_cache(self):
+        return [name for name in os.listdir(self.cache_directory) if not name.endswith('.source')]
+
+    def test_cache(self):
+        df = self._read()
+        self.assertEqual(1, len(self._list_cache()))
+
+        with mock.patch('pandas.read_csv') as read_csv:
+            cached_df = self._read()
+        read_csv.assert_not_called()
+        self.assertTrue(df.equals(cached_df))
+        self.assertEqual('category', str(cached_df['TYPE'].dtype))
+
+        with open(self.path, 'a') as file:
+            print('1\tis_a\t32020\t38545\tC', file=file)
+
+        df = self._read()
+        self.assertEqual(21, len(df.index))
+        self.assertEqual(1, len(self._list_cache()), msg='stale cache was not evicted')
+
+    def test_evict_orphans(self):
+        temporary_path = os.path.join(self.directory, 'temporary.tsv')
+        shutil.copy(relations, temporary_path)
+        self._read(temporary_path)
+        os.remove(temporary_path)
+
+        self._read()
+        self.assertEqual(1, len(self._list_cache()), msg='the cache of a removed file was not evicted')
+        self.assertEqual(1, len(os.listdir(self.cache_directory)) - len(self._list_cache()))
+
+    def test_max_size(self):
+        other_path = os.path.join(self.directory, 'other.tsv')
+        shutil.copy(relations, other_path)
+        self._read(other_path)
+
+        with mock.patch('bio2bel_chebi.parser.utils.PARSED_CACHE_MAX_SIZE', 1):
+            self._read()
+        self.assertEqual([], self._list_cache(), msg='the cache should be capped')
+
+    def test_not_cached_outside_data_dir(self):
+        with mock.patch('bio2bel_chebi.parser.utils._write_cache') as write_cache:
+            get_relations_df(url=relations)
+            read_chebi_tsv(self.path, RELATIONS_DTYPES)
+        write_cache.assert_not_called()
+
+        with mock.patch('bio2bel_chebi.parser.utils.DATA_DIR', self.directory):
+            with mock.patch('bio2bel_chebi.parser.utils.PARSED_CACHE_DIRECTORY', self.cache_directory):
+                read_chebi_tsv(self.path, RELATIONS_DTYPES)
+        self.assertEqual(1, len(self._list_cache()), msg='files in the data directory should be cached')
+
+
+class TestFastLoad(TemporaryCacheClsMixin):
+
+    @classmethod
+    def populate(cls):
+        cls.manager.populate(
+            inchis_url=inchis,
+            compounds_url=compounds,
+            relations_url=relations,
+            names_url=names,
+            accessions_url=accessions,
+            fast=True,
+        )
+
+    def test_compound_count(self):
+        self.assertEqual(9, self.manager.count_chemicals())
+        self.assertEqual(3, self.manager.count_inchis())
+
+    def test_synonyms(self):
+        self.assertEqual(9, self.manager.count_synonyms())
+        self.assertEqual(7, self.manager.count_xrefs())
+        self.assertEqual(4, self.manager.count_relations())
+
+    def test_indexes_restored(self):
+        indexes = inspect(self.manager.engine).get_indexes(CHEMICAL_TABLE_NAME)
+        self.assertIn(['chebi_id'], [index['column_names'] for index in indexes])
+
+    def test_refuse_populated(self):
+        with self.assertRaises(ValueError):
+            self.manager._populate_original(inchis_url=inchis, compounds_url=compounds, fast=True)
+
+
+class TestFailedFastLoad(TemporaryCacheClsMixin):
+    """Test that the indexes are recreated when a fast load fails."""
+
+    def _get_indexes(self):
+        return sorted(
+            (index['name'], index['column_names'])
+            for index in inspect(self.manager.engine).get_indexes(CHEMICAL_TABLE_NAME)
+        )
+
+    def test_indexes_restored(self):
+        indexes = self._get_indexes()
+        self.assertNotEqual([], indexes)
+
+        kwargs = dict(
+            inchis_url=inchis,
+            compounds_url=compounds,
+            relations_url=relations,
+            names_url=names,
+            accessions_url=accessions,
+            fast=True,
+        )
+        with mock.patch.object(self.manager, '_populate_tables', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                self.manager._populate_original(**kwargs)
+        self.assertEqual(indexes, self._get_indexes())
+        self.assertFalse(self.manager.is_populated())
+
+        self.manager._populate_original(**kwargs)
+        self.assertEqual(indexes, self._get_indexes())
+        self.assertEqual(9, self.manager.count_chemicals())
+
+
+class TestFastLoadPragmas(TemporaryCacheClsMixin):
+    """Test that the connection that runs the fast load has durability turned off."""
+
+    @classmethod
+    def populate(cls):
+        cls.pragmas = {}
+        populate_compounds = cls.manager._populate_compounds
+
+        def _populate_compounds(**kwargs):
+            for pragma in ('synchronous', 'journal_mode'):
+                cls.pragmas[pragma] = cls.manager.session.execute(f'PRAGMA {pragma}').scalar()
+            populate_compounds(**kwargs)
+
+        cls.manager._populate_compounds = _populate_compounds
+        cls.manager.populate(
+            inchis_url=inchis,
+            compounds_url=compounds,
+            relations_url=relations,
+            names_url=names,
+            accessions_url=accessions,
+            fast=True,
+        )
+
+    def test_pragmas(self):
+        self.assertEqual({'synchronous': 0, 'journal_mode': 'off'}, self.pragmas)
+        self.assertEqual(9, self.manager.count_chemicals())
+
+    def test_restored(self):
+        self.assertEqual(2, self.manager.session.execute('PRAGMA synchronous').scalar())
+
+
+class TestPlaceholders(TemporaryCacheClsMixin):
+    """Test that synonyms and cross-references of unknown compounds get placeholder chemicals."""
+
+    @classmethod
+    def populate(cls):
+        cls.manager._populate_names(url=names)
+        cls.manager._populate_accession(url=accessions)
+
+    def test_placeholders(self):
+        self.assertEqual(5, self.manager.count_chemicals())
+        self.assertEqual(9, self.manager.count_synonyms())
+        self.assertEqual(7, self.manager.count_xrefs())
+
+        model = self.manager.get_chemical_by_chebi_id('3558')
+        self.assertIsNone(model.name)
+        self.assertEqual(3558, model.id)
+        self.assertEqual({'Baycol'}, {synonym.name for synonym in model.synonyms})
+
+    def test_statistics_not_stored(self):
+        summary = self.manager.summarize(detailed=True)
+        self.assertEqual(5, summary['chemicals'])
+        self.assertEqual({}, summary['chemical_status'], msg='placeholders have no status')
+
+
+class TestChunkedLoad(TemporaryCacheClsMixin):
+    """Test that loading the flat files in chunks gives the same database as loading them at once."""
+
+    @classmethod
+    def populate(cls):
+        cls.manager.populate(
+            inchis_url=inchis,
+            compounds_url=compounds,
+            relations_url=relations,
+            names_url=names,
+            accessions_url=accessions,
+            chunksize=2,
+        )
+
+    def test_counts(self):
+        self.assertEqual(9, self.manager.count_chemicals())
+        self.assertEqual(7, self.manager.count_parent_chemicals())
+        self.assertEqual(3, self.manager.count_inchis())
+        self.assertEqual(9, self.manager.count_synonyms())
+        self.assertEqual(7, self.manager.count_xrefs())
+        self.assertEqual(4, self.manager.count_relations())
+
+    def test_get_compound(self):
+        model = self.manager.get_chemical_by_chebi_id('38561')
+        self.assertEqual('fluvastatin', model.name)
+        self.assertEqual({'fluvastatin', 'fluvastatina'}, {synonym.name for synonym in model.synonyms})
+
+
+#: Loads the names file given as the first argument in chunks of the size given as the third (or 0 for all at once), with
+#: the address space capped at its size after importing plus the fourth argument in bytes, then prints the count of the
+#: synonyms and the peak resident memory in kilobytes before and after loading
+_LOAD_NAMES_SCRIPT = """
+import resource, sys
+from bio2bel_chebi import Manager
+import bio2bel_chebi.parser.names
+
+path, connection, chunksize, headroom = sys.argv[1], sys.argv[2], int(sys.argv[3]) or None, int(sys.argv[4])
+with open('/proc/self/statm') as file:
+    limit = int(file.read().split()[0]) * resource.getpagesize() + headroom
+resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+manager = Manager(connection=connection)
+manager.create_all()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+manager._populate_names(url=path, chunksize=chunksize)
+print(manager.count_synonyms(), before, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+@unittest.skipUnless(os.path.exists('/proc/self/statm'), 'needs the resource module and procfs')
+class TestBoundedMemory(unittest.TestCase):
+    """Test that loading in chunks keeps the peak memory under a cap that loading the whole file goes over."""
+
+    #: The number of synonyms, which take about 55 MB more to load at once than in chunks of 10,000
+    size = 200_000
+
+    #: The cap on the growth of the peak resident memory while loading, in kilobytes
+    max_growth = 40 * 1024
+
+    #: The cap on the growth of the address space, in bytes, so a load that doesn't stream fails quickly
+    headroom = 512 * 1024 * 1024
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'names.tsv.gz')
+        with gzip.open(self.path, 'wt', compresslevel=1) as file:
+            print('ID\tCOMPOUND_ID\tTYPE\tSOURCE\tNAME\tADAPTED\tLANGUAGE', file=file)
+            for i in range(1, self.size + 1):
+                print(f'{i}\t{i % 1000 + 1}\tSYNONYM\tChEBI\tsynonym {i} with a name of average length\tF\ten',
+                      file=file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_chunked(self):
+        output = subprocess.check_output(
+            [
+                sys.executable, '-c', _LOAD_NAMES_SCRIPT, self.path,
+                'sqlite:///' + os.path.join(self.directory, 'chebi.db'), '10000', str(self.headroom),
+            ],
+            stderr=subprocess.DEVNULL,
+        )
+        count, before, after = map(int, output.split())
+        self.assertEqual(self.size, count, msg='every synonym should be loaded')
+        self.assertLess(after - before, self.max_growth, msg=f'the peak memory grew by {(after - before) // 1024} MB')
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_order(self):
+        self.assertEqual(list(range(100)), list(iter_prefetched(range(100), max_buffered=3)))
+
+    def test_raise(self):
+        def _values():
+            yield 1
+            raise ValueError
+
+        values = iter_prefetched(_values())
+        self.assertEqual(1, next(values))
+        with self.assertRaises(ValueError):
+            next(values)
+
+    def test_stop_early(self):
+        values = iter_prefetched(iter(range(100)), max_buffered=1)
+        self.assertEqual(0, next(values))
+        values.close()
 
 
 if __name__ == '__main__':
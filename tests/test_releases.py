@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from bio2bel_chebi.models import Release
+from bio2bel_chebi.releases import ReleaseStore, get_release_urls
+from tests.constants import TemporaryCacheClsMixin, accessions, compounds, inchis, names, relations
+
+urls = dict(
+    inchis_url=inchis,
+    compounds_url=compounds,
+    relations_url=relations,
+    names_url=names,
+    accessions_url=accessions,
+)
+
+
+class TestReleases(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = ReleaseStore(directory=self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_release_urls(self):
+        self.assertEqual(
+            'ftp://ftp.ebi.ac.uk/pub/databases/chebi/archive/rel209/Flat_file_tab_delimited/compounds.tsv.gz',
+            get_release_urls('209')['compounds_url'],
+        )
+
+    def test_load_and_switch(self):
+        self.assertIsNone(self.store.get_current_release())
+
+        self.store.load_release('99', urls=urls)
+        self.store.load_release('100', urls=urls, switch=False)
+        self.assertEqual(['99', '100'], self.store.list_releases())
+        self.assertEqual('99', self.store.get_current_release(), msg='should not switch')
+
+        old_manager = self.store.get_manager()
+        self.assertEqual('99', old_manager.get_release())
+        self.assertIsNotNone(old_manager.lookup)
+        self.assertEqual(9, old_manager.count_chemicals())
+
+        self.store.set_current_release('100')
+        manager = self.store.get_manager()
+        self.assertEqual('100', manager.get_release())
+        self.assertEqual('99', old_manager.get_release(), msg='open readers should keep their release')
+
+        with self.assertRaises(ValueError):
+            self.store.remove_release('100')
+
+        self.store.remove_release('99')
+        self.assertEqual(['100'], self.store.list_releases())
+        self.assertFalse(os.path.exists(f'{self.store.get_path("99")}.lookup'))
+
+    def test_already_loaded(self):
+        self.store.load_release('99', urls=urls)
+        with self.assertRaises(ValueError):
+            self.store.load_release('99', urls=urls)
+        self.store.load_release('99', urls=urls, force=True)
+
+    def test_failed_load(self):
+        self.store.load_release('99', urls=urls)
+
+        with self.assertRaises(ValueError):
+            self.store.load_release('100', urls=dict(urls, compounds_url=os.path.join(self.directory, 'nope.tsv.gz')))
+
+        self.assertEqual(['99'], self.store.list_releases())
+        self.assertEqual('99', self.store.get_current_release())
+        self.assertEqual(
+            ['CURRENT', 'chebi-99.db', 'chebi-99.db.lookup'],
+            sorted(os.listdir(self.directory)),
+            msg='should clean up staging',
+        )
+
+    def test_switch_to_missing(self):
+        with self.assertRaises(ValueError):
+            self.store.set_current_release('1')
+
+    def test_invalid_release(self):
+        with self.assertRaises(ValueError):
+            self.store.get_path('../1')
+
+
+class TestStoreRelease(TemporaryCacheClsMixin):
+
+    def test_reload(self):
+        """Test populating a release that's already recorded updates its record instead of failing."""
+        loaded_on = datetime.datetime(2000, 1, 1)
+        self.manager.session.add(Release(release='99', loaded_on=loaded_on))
+        self.manager.session.commit()
+
+        self.manager.populate(release='99', **urls)
+        self.assertTrue(self.manager.is_populated())
+        self.assertEqual('99', self.manager.get_release())
+
+        releases = self.manager.session.query(Release).all()
+        self.assertEqual(1, len(releases))
+        self.assertLess(loaded_on, releases[0].loaded_on)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from bio2bel_chebi import Manager
+from bio2bel_chebi.constants import COMPOUNDS_DTYPES, INCHIS_DTYPES, NAMES_DTYPES
+from bio2bel_chebi.parser.validation import ValidationError, Validator, validate_release
+from tests.constants import TemporaryCacheClsMixin, accessions, compounds, inchis, names, relations
+
+HEADER = 'ID\tSTATUS\tCHEBI_ACCESSION\tSOURCE\tPARENT_ID\tNAME\tDEFINITION\tMODIFIED_ON\tCREATED_BY\tSTAR'
+
+
+def _make_df(rows, dtype):
+    return pd.DataFrame(rows, columns=list(dtype)).astype(dtype)
+
+
+def _make_compounds_df(rows):
+    return _make_df(
+        [
+            (compound_id, 'C', accession, 'ChEBI', parent_id, 'name', None, 3)
+            for compound_id, accession, parent_id in rows
+        ],
+        COMPOUNDS_DTYPES,
+    )
+
+
+class TestValidator(unittest.TestCase):
+
+    def test_compounds(self):
+        validator = Validator(compound_ids=[1, 2, 3, 5])
+        df = validator.validate('compounds', _make_compounds_df([
+            (1, 'CHEBI:1', None),
+            (2, 'CHEBI:2', 1),
+            (3, 'CHEBI:3', 4),
+            (4, 'CHEBI:5', None),
+            (5, '5', None),
+            (None, 'CHEBI:6', None),
+        ]))
+        self.assertEqual([1, 2, 3], df['ID'].tolist())
+        self.assertEqual(1, df['PARENT_ID'].iloc[1])
+        self.assertTrue(pd.isna(df['PARENT_ID'].iloc[2]), msg='dangling parents should be removed')
+
+        df = validator.validate('compounds', _make_compounds_df([(2, 'CHEBI:2', None), (7, 'CHEBI:7', None)]))
+        self.assertEqual([7], df['ID'].tolist(), msg='duplicates should be found across chunks')
+
+        self.assertEqual(
+            {
+                'compounds': {
+                    'missing ID': 1,
+                    'duplicate ID': 1,
+                    'malformed CHEBI_ACCESSION': 1,
+                    'CHEBI_ACCESSION not matching ID': 1,
+                    'PARENT_ID not in compounds': 1,
+                },
+            },
+            validator.report.to_dict(),
+        )
+        self.assertEqual(4, validator.report.errors)
+        self.assertEqual(1, validator.report.warnings)
+        self.assertEqual(8, validator.report.rows['compounds'])
+
+        with self.assertRaises(ValidationError) as context:
+            validator.report.raise_for_errors()
+        self.assertIn('compounds: 1 malformed CHEBI_ACCESSION (e.g., 5)', str(context.exception))
+
+    def test_references(self):
+        validator = Validator(compound_ids=[1, 2])
+        df = validator.validate('names', _make_df(
+            [(1, 1, 'SYNONYM', 'ChEBI', 'a', 'en'), (2, 3, 'SYNONYM', 'ChEBI', 'b', 'en'),
+             (3, 2, 'SYNONYM', 'ChEBI', ' ', 'en'), (4, None, 'SYNONYM', 'ChEBI', 'c', 'en')],
+            NAMES_DTYPES,
+        ))
+        self.assertEqual([1], df['ID'].tolist())
+
+        df = validator.validate('inchis', _make_df(
+            [(1, 'InChI=1S/CH4/h1H4'), (2, 'CH4'), (1, 'InChI=1S/CH4/h1H4'), (3, 'InChI=1S/CH4/h1H4')],
+            INCHIS_DTYPES,
+        ))
+        self.assertEqual([1], df['CHEBI_ID'].tolist())
+
+        self.assertEqual(
+            {
+                'names': {'COMPOUND_ID not in compounds': 1, 'missing COMPOUND_ID': 1, 'empty NAME': 1},
+                'inchis': {'CHEBI_ID not in compounds': 1, 'duplicate CHEBI_ID': 1, 'malformed InChI': 1},
+            },
+            validator.report.to_dict(),
+        )
+
+    def test_invalid_table(self):
+        with self.assertRaises(ValueError):
+            Validator().validate('chemicals', pd.DataFrame())
+
+
+class TestValidateRelease(unittest.TestCase):
+
+    def test_release(self):
+        expected = {
+            'relations': {'INIT_ID not in compounds': 13, 'FINAL_ID not in compounds': 3},
+            'names': {'empty NAME': 1},
+        }
+        for chunksize in (None, 2):
+            with self.subTest(chunksize=chunksize):
+                validator = validate_release(
+                    inchis_url=inchis,
+                    compounds_url=compounds,
+                    relations_url=relations,
+                    names_url=names,
+                    accessions_url=accessions,
+                    chunksize=chunksize,
+                )
+                self.assertEqual(expected, validator.report.to_dict())
+                self.assertEqual(0, validator.report.errors)
+                self.assertEqual(9, len(validator.compound_ids))
+
+    def test_empty_compounds(self):
+        """Test a compounds file with only a header is reported instead of crashing, even in chunks."""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'compounds.tsv.gz')
+            with gzip.open(path, 'wt') as file:
+                print(HEADER, file=file)
+
+            for chunksize in (None, 2):
+                with self.subTest(chunksize=chunksize):
+                    validator = validate_release(
+                        inchis_url=inchis,
+                        compounds_url=path,
+                        relations_url=relations,
+                        names_url=names,
+                        accessions_url=accessions,
+                        chunksize=chunksize,
+                    )
+                    self.assertEqual(1, validator.report.to_dict()['compounds']['empty file'])
+                    self.assertEqual(1, validator.report.errors)
+                    self.assertEqual(0, len(validator.compound_ids))
+                    self.assertEqual(20, validator.report.to_dict()['relations']['INIT_ID not in compounds'])
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestValidatedLoad(TemporaryCacheClsMixin):
+    """Test populating with validation skips the rows with problems and stops on errors before writing."""
+
+    @classmethod
+    def populate(cls):
+        cls.manager.populate(
+            inchis_url=inchis,
+            compounds_url=compounds,
+            relations_url=relations,
+            names_url=names,
+            accessions_url=accessions,
+            chunksize=3,
+            validate=True,
+        )
+
+    def test_counts(self):
+        self.assertEqual(9, self.manager.count_chemicals())
+        self.assertEqual(9, self.manager.count_synonyms())
+        self.assertEqual(7, self.manager.count_xrefs())
+        self.assertEqual(3, self.manager.count_inchis())
+        self.assertEqual(4, self.manager.count_relations())
+
+    def test_strict(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'compounds.tsv.gz')
+            with gzip.open(path, 'wt') as file:
+                print(HEADER, file=file)
+                print('1\tC\tCHEBI:1\tChEBI\t\tmethane\t\t\t\t3', file=file)
+                print('2\tC\t\tChEBI\t\tethane\t\t\t\t3', file=file)
+
+            kwargs = dict(
+                inchis_url=inchis,
+                compounds_url=path,
+                relations_url=relations,
+                names_url=names,
+                accessions_url=accessions,
+                strict=True,
+            )
+
+            manager = Manager(connection='sqlite://')
+            with self.assertRaises(ValidationError):
+                manager._populate_original(**kwargs)
+            self.assertEqual(0, manager.count_chemicals(), msg='nothing should be written')
+
+            # bio2bel's wrapper records the failure instead of raising it, so the errors have to be logged
+            with self.assertLogs('bio2bel_chebi.manager', level='ERROR') as logs:
+                manager.populate(**kwargs)
+            self.assertIn('1 malformed CHEBI_ACCESSION', '\n'.join(logs.output))
+            self.assertEqual(0, manager.count_chemicals(), msg='nothing should be written')
+        finally:
+            shutil.rmtree(directory)
+
+    def test_reuse_validation(self):
+        """Test that a validation passed to populate is used instead of reading the files again."""
+        kwargs = dict(
+            inchis_url=inchis,
+            compounds_url=compounds,
+            relations_url=relations,
+            names_url=names,
+            accessions_url=accessions,
+        )
+        validation = validate_release(**kwargs)
+
+        manager = Manager(connection='sqlite://')
+        with mock.patch('bio2bel_chebi.parser.validation.validate_release') as mock_validate_release:
+            manager._populate_original(validation=validation, strict=True, **kwargs)
+        mock_validate_release.assert_not_called()
+        self.assertEqual(9, manager.count_chemicals())
+        self.assertEqual(4, manager.count_relations(), msg='the rows with problems should be skipped')
+
+
+if __name__ == '__main__':
+    unittest.main()